@@ -0,0 +1,158 @@
+"""
+Generate synthetic tweets in snscrape json lines format, to benchmark graphgenerator at a given scale
+
+Tweets are posted by a pool of accounts whose activity follows a power law (a few accounts post most of the
+tweets). Each tweet is either an original tweet, a retweet or a quote. Retweeted and quoted tweets are chosen with a
+preferential attachment process (Simon's model): a tweet is chosen with a probability proportional to the number of
+times it was already retweeted or quoted, so the number of retweets per tweet follows a power law. Quotes can be
+retweeted and quoted in turn
+
+    python -m benchmarks.generate_tweets 100000 --output_path="tweets_100000.jsonl"
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import click
+
+from graphgenerator.config import tz
+
+# kinds of generated tweets
+ORIGINAL, RETWEET, QUOTE = 0, 1, 2
+
+
+def generate_account(i, rnd):
+    """
+    Returns account i in snscrape format (fields used by graphgenerator and botfinder)
+    """
+    return {
+        "username": f"account_{i}",
+        "id": 10 ** 9 + i,
+        "displayname": f"Account {i}",
+        "description": " ".join(rnd.choice(["news", "politics", "sport", "tech", "music", "bot"]) for _ in range(rnd.randint(0, 8))),
+        "verified": rnd.random() < 0.01,
+        "created": (datetime(2008, 1, 1, tzinfo=tz) + timedelta(days=rnd.randint(0, 5000))).isoformat(),
+        "followersCount": int(rnd.paretovariate(1.2) * 50),
+        "friendsCount": rnd.randint(0, 5000),
+        "statusesCount": int(rnd.paretovariate(1.1) * 500),
+        "favouritesCount": rnd.randint(0, 20000),
+        "listedCount": rnd.randint(0, 100),
+        "mediaCount": rnd.randint(0, 500),
+        "location": "",
+        "protected": False,
+        "profileImageUrl": "https://pbs.twimg.com/profile_images/default.png",
+    }
+
+
+def generate_timeline(n_tweets, n_accounts, retweet_rate=0.75, quote_rate=0.1, seed=0):
+    """
+    Returns the structure of n_tweets tweets in chronological order: kinds, accounts, source tweets (index of the
+    retweeted or quoted tweet, -1 for original tweets) and number of retweets of each tweet
+        Parameters:
+            n_tweets (int): number of tweets
+            n_accounts (int): number of accounts posting tweets
+            retweet_rate (float): share of retweets in tweets
+            quote_rate (float): share of quotes in tweets (the other tweets are original tweets)
+            seed (int): seed of the random generator
+    """
+    rnd = random.Random(seed)
+    activity = [1 / (i + 1) ** 0.9 for i in range(n_accounts)]
+    cumulated_activity = []
+    total = 0
+    for weight in activity:
+        total += weight
+        cumulated_activity.append(total)
+    kinds = [ORIGINAL] * n_tweets
+    accounts = rnd.choices(range(n_accounts), cum_weights=cumulated_activity, k=n_tweets)
+    sources = [-1] * n_tweets
+    retweet_counts = [0] * n_tweets
+    # each tweet appears once when it can be retweeted (original tweets and quotes) and once more each time it is
+    # retweeted or quoted, so that a uniform choice in this list is a choice proportional to popularity
+    popular = []
+    for i in range(n_tweets):
+        draw = rnd.random()
+        if popular and draw < retweet_rate + quote_rate:
+            source = popular[rnd.randrange(len(popular))]
+            # accounts don't retweet their own tweets
+            if accounts[i] == accounts[source]:
+                accounts[i] = rnd.randrange(n_accounts)
+            kinds[i] = RETWEET if draw < retweet_rate else QUOTE
+            sources[i] = source
+            popular.append(source)
+            if kinds[i] == RETWEET:
+                retweet_counts[source] += 1
+            else:
+                popular.append(i)
+        else:
+            popular.append(i)
+    return kinds, accounts, sources, retweet_counts
+
+
+def generate_tweets(path, n_tweets, n_accounts=None, retweet_rate=0.75, quote_rate=0.1, days=6, seed=0, end=None):
+    """
+    Write n_tweets synthetic tweets in snscrape json lines format (most recent tweet first, as snscrape does)
+        Parameters:
+            path (str): path of the json lines file
+            n_tweets (int): number of tweets
+            n_accounts (int): number of accounts posting tweets, if None one account for 5 tweets
+            retweet_rate (float): share of retweets in tweets
+            quote_rate (float): share of quotes in tweets (the other tweets are original tweets)
+            days (int): number of days before end over which tweets are posted
+            seed (int): seed of the random generator
+            end (datetime): date of the most recent tweet, if None one minute ago
+    """
+    n_accounts = n_accounts or max(1, n_tweets // 5)
+    kinds, accounts, sources, retweet_counts = generate_timeline(n_tweets, n_accounts, retweet_rate, quote_rate, seed)
+    rnd = random.Random(seed)
+    profiles = [generate_account(i, rnd) for i in range(n_accounts)]
+    end = end or datetime.now(tz=tz).replace(microsecond=0) - timedelta(minutes=1)
+    start = end - timedelta(days=days)
+    step = (end - start) / max(1, n_tweets)
+    first_id = 1500000000000000000
+
+    def to_snscrape(i, with_source=True):
+        account = profiles[accounts[i]]
+        tweet_id = first_id + 1000 * i
+        source = sources[i] if with_source else -1
+        return {
+            "url": f"https://twitter.com/{account['username']}/status/{tweet_id}",
+            "date": (start + step * i).isoformat(),
+            "content": "synthetic tweet #benchmark",
+            "renderedContent": "synthetic tweet #benchmark",
+            "id": tweet_id,
+            "user": account,
+            "replyCount": 0,
+            "retweetCount": retweet_counts[i],
+            "likeCount": 0,
+            "quoteCount": 0,
+            "conversationId": tweet_id,
+            "lang": "en",
+            "source": "Twitter Web App",
+            "media": None,
+            "retweetedTweet": to_snscrape(source, kinds[i] == RETWEET) if source >= 0 and kinds[i] == RETWEET else None,
+            "quotedTweet": to_snscrape(source, False) if source >= 0 and kinds[i] == QUOTE else None,
+            "mentionedUsers": None,
+        }
+
+    with open(path, "w") as file:
+        for i in reversed(range(n_tweets)):
+            file.write(json.dumps(to_snscrape(i)) + "\n")
+
+
+@click.command()
+@click.argument("n_tweets", type=int)
+@click.option("--output_path", default=None, help="Path of the json lines file, default is tweets_<n_tweets>.jsonl")
+@click.option("--n_accounts", default=None, type=int, help="Number of accounts posting tweets, default is one account for 5 tweets")
+@click.option("--retweet_rate", default=0.75, help="Share of retweets in tweets", show_default=True)
+@click.option("--quote_rate", default=0.1, help="Share of quotes in tweets", show_default=True)
+@click.option("--seed", default=0, help="Seed of the random generator", show_default=True)
+def main(n_tweets, output_path, n_accounts, retweet_rate, quote_rate, seed):
+    """
+    Generate N_TWEETS synthetic tweets in snscrape json lines format
+    """
+    generate_tweets(output_path or f"tweets_{n_tweets}.jsonl", n_tweets, n_accounts, retweet_rate, quote_rate, seed=seed)
+
+
+if __name__ == "__main__":
+    main()
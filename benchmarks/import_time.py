@@ -0,0 +1,72 @@
+"""
+Check the startup time of graphgenerator: modules of the package are imported in a new python process with
+`python -X importtime`, their cumulated import time is measured and heavy dependencies which should only be imported
+when they are used (matplotlib, networkx, snscrape, botfinder...) must not be imported
+
+    python -m benchmarks.import_time --max_time=1
+
+The command fails (exit code 1) if a heavy dependency is imported or if an import takes more than max_time seconds
+"""
+
+import json
+import subprocess
+import sys
+
+import click
+
+# modules imported at startup, by the command line and by scripts using GraphBuilder
+checked_modules = ["graphgenerator.cli", "graphgenerator.custom_classes.GraphBuilder"]
+
+# dependencies which should only be imported when they are used
+lazy_modules = ["matplotlib", "networkx", "community", "snscrape", "botfinder", "sklearn", "shap"]
+
+
+def measure_import_time(module):
+    """
+    Returns the import time of module (in seconds, including its dependencies) and the list of lazy modules it
+    imports, module is imported in a new python process
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulated, name = line.split("|")
+        if cumulated.strip().isdigit():
+            import_times[name.strip()] = int(cumulated) / 1e6
+    imported_lazy_modules = sorted({name.split(".")[0] for name in import_times} & set(lazy_modules))
+    return import_times.get(module), imported_lazy_modules
+
+
+@click.command()
+@click.option("--max_time", default=None, type=float, help="Maximal import time of each module in seconds")
+@click.option("--output_path", default=None, help="Path to json file where import times are saved")
+def main(max_time, output_path):
+    """
+    Measure import times of graphgenerator and check that heavy dependencies are imported lazily
+    """
+    results = {}
+    failed = False
+    for module in checked_modules:
+        import_time, imported_lazy_modules = measure_import_time(module)
+        results[module] = {"import_time": import_time, "lazy_modules_imported": imported_lazy_modules}
+        print(f"{module}: {import_time:.3f}s")
+        if imported_lazy_modules:
+            print(f"    imports {', '.join(imported_lazy_modules)} which should be imported when they are used")
+            failed = True
+        if max_time is not None and import_time > max_time:
+            print(f"    takes more than {max_time}s to import")
+            failed = True
+    if output_path:
+        with open(output_path, "w") as file:
+            json.dump(results, file, indent=4)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark graphgenerator on synthetic snscrape outputs: the whole pipeline (collect_tweets, clean_nodes_edges,
+create_graph, find_communities, export_json_output) is run for each number of tweets, layout algorithm and community
+algorithm, and the wall time and the peak memory of each stage are saved in a json file
+
+    python -m benchmarks.run_benchmarks -n 10000 -n 100000 -a spring -a multilevel -c louvain -c parallel_louvain
+
+Reading snscrape outputs with several processes (option --snscrape_workers of graphgenerator) can be compared with a
+single process with -w (e.g. -w 1 -w 4 on a machine with 4 cores)
+
+Stages are measured by the metrics of GraphBuilder (see StageMetrics): wall time, CPU time and counts of each stage,
+and peak memory measured with tracemalloc, which is the peak of memory allocated by python (and numpy) during the
+stage, including memory already used before it (memory of processes started by a stage, e.g. snscrape workers, is not
+counted). Tracing memory slows the pipeline down, use --no_memory to only measure wall times
+"""
+
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+
+import click
+
+from graphgenerator.version import __version__
+from graphgenerator.config import tz
+from graphgenerator.custom_classes.GraphBuilder import GraphBuilder
+from graphgenerator.utils.graph_files import replace_file
+from benchmarks.generate_tweets import generate_tweets
+from benchmarks.import_time import checked_modules, measure_import_time
+
+# benchmarked stages, in the order of the pipeline
+stages = ["collect_tweets", "clean_nodes_edges", "create_graph", "find_communities", "export_json_output"]
+
+
+def run_pipeline(
+    snscrape_json_path, layout_algo, community_algo, output_dir, trace_memory=True, snscrape_workers=1, **kwargs
+):
+    """
+    Run the whole pipeline on a snscrape output and returns the size of the graph and the metrics of each stage
+        Parameters:
+            snscrape_json_path (str): path to snscrape json output
+            layout_algo (str): layout algorithm
+            community_algo (str): community algorithm
+            output_dir (str): directory where the graph is exported
+            trace_memory (bool): should the peak memory of each stage be measured
+            snscrape_workers (int): number of processes used to read the snscrape output
+            kwargs: other arguments of GraphBuilder (e.g. dim, community_threads)
+    """
+    NB = GraphBuilder(
+        search="unknown as taken from snscrape output", since="2004-01-01", trace_memory=trace_memory, **kwargs
+    )
+    NB.collect_tweets(snscrape_json_path=snscrape_json_path, snscrape_workers=snscrape_workers)
+    NB.clean_nodes_edges({})
+    NB.create_graph(layout_algo)
+    NB.find_communities(community_algo)
+    NB.export_json_output(os.path.join(output_dir, "output.json"))
+    metrics = NB.metrics.to_dict()
+    records = {record["stage"]: record for record in metrics["stages"] if record["depth"] == 0}
+    return {
+        "n_nodes": len(NB.nodes),
+        "n_edges": len(NB.edges_clean),
+        "stages": {stage: records[stage] for stage in stages},
+        "wall_time": sum(records[stage]["wall_time"] for stage in stages),
+        "memory_peak": max(records[stage]["memory_peak"] for stage in stages) if trace_memory else None,
+        "max_rss": metrics["max_rss"],
+    }
+
+
+def git_commit():
+    """
+    Returns the commit of the benchmarked code, None if it is not in a git repository
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.command()
+@click.option("-n", "--n_tweets", multiple=True, type=int, help="Number of generated tweets, can be repeated  [default: 10000]")
+@click.option("-a", "--layout_algo", multiple=True, help="Layout algorithm, can be repeated  [default: spring, multilevel]")
+@click.option("-c", "--community_algo", multiple=True, help="Community algorithm, can be repeated  [default: louvain, parallel_louvain]")
+@click.option("-d", "--dim", default=2, help="The number of dimension of the layout", show_default=True)
+@click.option("-w", "--snscrape_workers", multiple=True, type=int, help="Number of processes reading the snscrape output, can be repeated  [default: 1]")
+@click.option("--community_threads", default=1, help="Number of threads used by `parallel_louvain`", show_default=True)
+@click.option("--layout_time_budget", default=None, type=float, help="Number of seconds after which the `multilevel` layout stops iterating")
+@click.option("--n_accounts_ratio", default=5, help="Number of tweets per account in generated tweets", show_default=True)
+@click.option("--seed", default=0, help="Seed of the generator of tweets", show_default=True)
+@click.option("--data_dir", default="benchmark_data", help="Directory where generated tweets are saved, existing files are reused", show_default=True)
+@click.option("--output_path", default="benchmark.json", help="Path to json file where results are saved", show_default=True)
+@click.option("--memory/--no_memory", default=True, help="Measure peak memory of each stage (it slows the pipeline down)", show_default=True)
+def main(
+    n_tweets,
+    layout_algo,
+    community_algo,
+    dim,
+    snscrape_workers,
+    community_threads,
+    layout_time_budget,
+    n_accounts_ratio,
+    seed,
+    data_dir,
+    output_path,
+    memory,
+):
+    """
+    Run benchmarks of graphgenerator on synthetic tweets and save results in a json file
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    benchmark = {
+        "version": __version__,
+        "commit": git_commit(),
+        "date": datetime.now(tz=tz).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "memory_traced": memory,
+        "import_time": {module: measure_import_time(module)[0] for module in checked_modules},
+        "results": [],
+    }
+    for n in n_tweets or [10000]:
+        snscrape_json_path = os.path.join(data_dir, f"tweets_{n}_{n_accounts_ratio}_{seed}.jsonl")
+        if not os.path.exists(snscrape_json_path):
+            print(f"Generating {n} tweets in {snscrape_json_path}")
+            replace_file(
+                snscrape_json_path,
+                lambda path: generate_tweets(path, n, max(1, n // n_accounts_ratio), seed=seed),
+            )
+        for layout in layout_algo or ["spring", "multilevel"]:
+            for community in community_algo or ["louvain", "parallel_louvain"]:
+                for workers in snscrape_workers or [1]:
+                    print(f"{n} tweets, layout {layout}, communities {community}, {workers} snscrape workers")
+                    with tempfile.TemporaryDirectory() as output_dir:
+                        result = run_pipeline(
+                            snscrape_json_path,
+                            layout,
+                            community,
+                            output_dir,
+                            memory,
+                            workers,
+                            dim=dim,
+                            community_threads=community_threads,
+                            layout_time_budget=layout_time_budget,
+                        )
+                    result = dict(
+                        n_tweets=n, layout_algo=layout, community_algo=community, snscrape_workers=workers, **result
+                    )
+                    print(", ".join(f"{stage}: {result['stages'][stage]['wall_time']:.2f}s" for stage in stages))
+                    benchmark["results"].append(result)
+
+                    # results are saved after each run so that they are kept if a run fails
+                    def write_results(path):
+                        with open(path, "w") as file:
+                            json.dump(benchmark, file, indent=4)
+
+                    replace_file(output_path, write_results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 from graphgenerator.version import __version__
 
-# load only once modules are installed, to avoid error during installation of the package
-try:
-    from graphgenerator.custom_classes.GraphBuilder import GraphBuilder
-except ModuleNotFoundError:
-    pass
+
+def __getattr__(name):
+    """
+    GraphBuilder is imported when it is first used, so that importing the package (e.g. to get its version, or during
+    its installation when dependencies are not installed yet) does not import its dependencies
+    """
+    if name == "GraphBuilder":
+        from graphgenerator.custom_classes.GraphBuilder import GraphBuilder
+
+        return GraphBuilder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,18 +7,33 @@ Created on Thu Nov 24 17:22:29 2021
 
 import click
 from datetime import datetime, timedelta
-import json
 from dateutil import parser
 import dateutil
 
 from graphgenerator.version import __version__
-from graphgenerator.custom_classes.GraphBuilder import GraphBuilder
 from graphgenerator.config import column_names, tz
-from graphgenerator.utils.tweet_extraction import return_last_tweet_snscrape
+from graphgenerator.config.config_image import image_size
 
 
 @click.command()
 @click.argument("search", default="")
+@click.option(
+    "--searches_file",
+    default=None,
+    help="Path to text file containing one search per line (empty lines are ignored), searches are scraped at the same time and added to `search` if given, one graph is exported per search (the search is added to `json_path`) unless `merge_searches` is used",
+    show_default=True,
+)
+@click.option(
+    "--search_workers",
+    default=4,
+    help="Maximal number of searches scraped at the same time (only used with `searches_file`)",
+    show_default=True,
+)
+@click.option(
+    "--merge_searches",
+    is_flag=True,
+    help="Export a single graph with tweets of all searches of `searches_file` (a tweet found by several searches is counted once)",
+)
 @click.option(
     "-r",
     "--minretweets",
@@ -29,14 +44,25 @@ from graphgenerator.utils.tweet_extraction import return_last_tweet_snscrape
     "-f",
     "--input_graph_json_path",
     default=None,
-    help="Path to json file containing graph built thanks to graphgenerator command, can be used with option `snscrape_json_path` to enrich it or alone to enrich it with tweets published in the last 7 days",
+    help="Path to json file (or directory in parquet format) containing graph built thanks to graphgenerator command, can be used with option `snscrape_json_path` to enrich it or alone to enrich it with tweets published in the last 7 days",
     show_default=True,
 )
 @click.option(
     "-s",
     "--snscrape_json_path",
-    default=None,
-    help="Path to snscrape json output from which to import tweets that will be used to build network, can be used with `input_graph_json_path` to enrich it",
+    multiple=True,
+    help="Path to snscrape json output from which to import tweets that will be used to build network, can be used with `input_graph_json_path` to enrich it. The option can be repeated and wildcards can be used to import several files (e.g. daily outputs)",
+)
+@click.option(
+    "--snscrape_workers",
+    default=1,
+    help="Number of processes reading snscrape json outputs (opt-in, worth it for large files on several cores), files are split in parts whose edges and nodes are aggregated in parallel",
+    show_default=True,
+)
+@click.option(
+    "--time_slices",
+    default=1,
+    help="Number of time slices the search period is split in, slices are scraped at the same time (not used with `snscrape_json_path`)",
     show_default=True,
 )
 @click.option(
@@ -57,10 +83,22 @@ from graphgenerator.utils.tweet_extraction import return_last_tweet_snscrape
     "-a",
     "--layout_algo",
     default="spring",
-    type=click.Choice(["circular", "kamada_kawai", "spring", "random", "spiral"]),
-    help="The layout algorithm to use to draw the graph",
+    type=click.Choice(["circular", "kamada_kawai", "spring", "random", "spiral", "multilevel"]),
+    help="The layout algorithm to use to draw the graph, `multilevel` is suited to large graphs",
+    show_default=True,
+)
+@click.option(
+    "--layout_time_budget",
+    default=None,
+    type=float,
+    help="Number of seconds after which the layout algorithm stops iterating (only used by `multilevel` layout)",
     show_default=True,
 )
+@click.option(
+    "--pin_positions",
+    is_flag=True,
+    help="Keep positions of the nodes of the input graph unchanged when updating it (only new nodes are moved)",
+)
 @click.option(
     "-c",
     "--community_algo",
@@ -72,11 +110,23 @@ from graphgenerator.utils.tweet_extraction import return_last_tweet_snscrape
             "girvan_newman",
             "label_propagation",
             "louvain",
+            "parallel_louvain",
         ]
     ),
-    help="The algorithm used to identify communities in the graph",
+    help="The algorithm used to identify communities in the graph, `parallel_louvain` is suited to large graphs",
+    show_default=True,
+)
+@click.option(
+    "--community_threads",
+    default=1,
+    help="Number of threads used to identify communities (only used by `parallel_louvain`)",
     show_default=True,
 )
+@click.option(
+    "--community_fast_update",
+    is_flag=True,
+    help="When updating a graph (or with incremental batches), only optimise again communities touched by new edges (only used by `louvain`)",
+)
 @click.option(
     "-d",
     "--dim",
@@ -97,6 +147,13 @@ from graphgenerator.utils.tweet_extraction import return_last_tweet_snscrape
     help="Path where to export the final Json containing nodes and hedges information",
     show_default=True,
 )
+@click.option(
+    "--output_format",
+    default="json",
+    type=click.Choice(["json", "parquet"]),
+    help="Format of the exported graph, with `parquet` the graph is exported in a directory named after json_path with a .parquet extension (e.g. output.parquet) where nodes and edges are saved in parquet files (and metadata in a json file), it can be used as input graph (requires pyarrow)",
+    show_default=True,
+)
 @click.option(
     "-i",
     "--img_path",
@@ -104,24 +161,131 @@ from graphgenerator.utils.tweet_extraction import return_last_tweet_snscrape
     help="Path where to export graph png file, if not specified then no graph is exported",
     show_default=True,
 )
+@click.option(
+    "--img_renderer",
+    default="networkx",
+    type=click.Choice(["networkx", "raster"]),
+    help="Renderer of the png file, `raster` draws nodes (coloured by community) and edges in an array of pixels, it is suited to large graphs and the image is exported while the json is written",
+    show_default=True,
+)
+@click.option(
+    "--img_size",
+    default=image_size,
+    help="Width and height in pixels of the png file (only used by `raster` renderer)",
+    show_default=True,
+)
+@click.option(
+    "--img_labels",
+    default=20,
+    help="Number of largest nodes labelled in the png file (only used by `raster` renderer)",
+    show_default=True,
+)
 @click.option("-v", "--version", is_flag=True, help="Get version of the package")
 @click.option("-b", "--compute_botscore", is_flag=True, help="Compute botscore for each user")
+@click.option(
+    "-bc",
+    "--botscore_cache_path",
+    default=None,
+    help="Path to SQLite database where to save botscores, so that accounts already classified in a previous run are not classified again",
+    show_default=True,
+)
+@click.option(
+    "--botscore_cache_max_age",
+    default=30.0,
+    help="Number of days after which a botscore saved in `botscore_cache_path` is computed again",
+    show_default=True,
+)
+@click.option(
+    "--botscore_workers",
+    default=0,
+    help="Number of processes used to compute botscores, if set to 0, all cores are used",
+    show_default=True,
+)
+@click.option(
+    "--botscore_batch_size",
+    default=100,
+    help="Number of accounts classified at once by a process when computing botscores",
+    show_default=True,
+)
+@click.option(
+    "--checkpoint_path",
+    default=None,
+    help="Path to directory where collected tweets and the state of the collection are saved while tweets are scraped, so that the collection can be resumed with `resume` if it stops (rows extracted from collected tweets are spilled to the checkpoint instead of being kept in memory until the graph is built, can't be used with `incremental_batch`)",
+    show_default=True,
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume the collection saved in `checkpoint_path` after its last analysed tweet (a new collection is started if there is no checkpoint)",
+)
+@click.option(
+    "--metrics_path",
+    default=None,
+    help="Path to json file where to export metrics of each stage of the program (wall time, CPU time, peak memory, number of tweets, nodes and edges...), with `searches_file` the search is added to the path",
+    show_default=True,
+)
+@click.option(
+    "--metrics_in_output",
+    is_flag=True,
+    help="Add metrics of each stage of the program to the metadata of the exported graph",
+)
+@click.option(
+    "--trace_memory",
+    is_flag=True,
+    help="Measure the peak of memory allocated during each stage with tracemalloc (it slows the program down), memory is not measured while several searches are collected at the same time",
+)
+@click.option(
+    "--profile_path",
+    default=None,
+    help="Path to file where to save cProfile statistics of the stages of the program (not used with `searches_file`)",
+    show_default=True,
+)
 @click.option("-bs", "--batch_size", default=0, help="Size of the batch, if set to 0, the programm uses a single batch")
+@click.option(
+    "-ib",
+    "--incremental_batch",
+    is_flag=True,
+    help="Only process tweets collected since the previous batch when saving a batch: accounts and edges changed by the batch are appended to a file named after `json_path` (output.batches.jsonl), the graph and the image are only built and exported at the end of the data collection",
+)
 def main(
     version,
     search,
+    searches_file,
+    search_workers,
+    merge_searches,
     json_path,
+    output_format,
     snscrape_json_path,
+    snscrape_workers,
     minretweets,
+    time_slices,
     since,
     maxresults,
     layout_algo,
+    layout_time_budget,
+    pin_positions,
     img_path,
+    img_renderer,
+    img_size,
+    img_labels,
     community_algo,
+    community_fast_update,
+    community_threads,
     input_graph_json_path,
     dim,
     compute_botscore,
-    batch_size
+    botscore_cache_path,
+    botscore_cache_max_age,
+    botscore_workers,
+    botscore_batch_size,
+    checkpoint_path,
+    resume,
+    metrics_path,
+    metrics_in_output,
+    trace_memory,
+    profile_path,
+    batch_size,
+    incremental_batch
 ):
     """
     Command line utility that export the json of a graph built from a hashtag or expression
@@ -130,18 +294,63 @@ def main(
         - clean data
         - create the graph object
         - export into json
+    Modules building graphs are imported once arguments are checked, so that the command starts fast
     """
     if version:
         print(__version__)
-    elif search == "" and input_graph_json_path is None and snscrape_json_path == None:
+    elif search == "" and input_graph_json_path is None and not snscrape_json_path and searches_file is None:
         print(__version__)
+    elif searches_file is not None:
+        from graphgenerator.custom_classes.MultiSearchBuilder import MultiSearchBuilder
+
+        if input_graph_json_path or snscrape_json_path:
+            raise Exception("Several searches can't be used with `input_graph_json_path` or `snscrape_json_path`")
+        if dim == "3" and img_path != "no_img_file":
+            raise Exception("graphgenerator can't create a 3D graph in png file. Change dimension to 2D or do not export an image.")
+        if profile_path:
+            raise Exception("Several searches can't be profiled, use `metrics_path` to get metrics of each search")
+        start = datetime.now()
+        print(start)
+        searches = [search] if search else []
+        with open(searches_file, "r") as file:
+            searches += [line.strip() for line in file if line.strip()]
+        MB = MultiSearchBuilder(
+            searches,
+            since,
+            n_workers=search_workers,
+            merge=merge_searches,
+            minretweets=minretweets,
+            maxresults=maxresults,
+            dim=int(dim),
+            compute_botscore=compute_botscore,
+            botscore_cache_path=botscore_cache_path,
+            botscore_cache_max_age=botscore_cache_max_age,
+            botscore_workers=botscore_workers or None,
+            botscore_batch_size=botscore_batch_size,
+            layout_time_budget=layout_time_budget,
+            community_threads=community_threads,
+            output_format=output_format,
+            time_slices=time_slices,
+            trace_memory=trace_memory,
+            metrics_in_output=metrics_in_output,
+            img_renderer=img_renderer,
+            img_size=img_size,
+            img_labels=img_labels,
+        )
+        MB.collect_tweets()
+        print("Data collection ended, time of execution is:", datetime.now() - start)
+        MB.build_graphs(layout_algo, community_algo, json_path, img_path, start, metrics_path)
+        print("The time of execution of the whole program is :", datetime.now() - start)
     else:
+        from graphgenerator.custom_classes.GraphBuilder import GraphBuilder
+        from graphgenerator.utils.tweet_extraction import return_last_tweet_snscrape
+        from graphgenerator.utils.graph_files import read_input_graph
+
         start = datetime.now()
         print(start)
         if input_graph_json_path:
-            # load json
-            with open(input_graph_json_path, "r") as file:
-                input_json = json.load(file)
+            # load json (or graph in parquet format)
+            input_json = read_input_graph(input_graph_json_path)
             data_collection_date = parser.parse(
                 input_json["metadata"][column_names.metadata_data_collection_date]
             )
@@ -181,12 +390,32 @@ def main(
             maxresults=maxresults,
             since_id=since_id,
             dim=int(dim),
-            compute_botscore=compute_botscore
+            compute_botscore=compute_botscore,
+            botscore_cache_path=botscore_cache_path,
+            botscore_cache_max_age=botscore_cache_max_age,
+            botscore_workers=botscore_workers or None,
+            botscore_batch_size=botscore_batch_size,
+            layout_time_budget=layout_time_budget,
+            pin_positions=pin_positions,
+            community_fast_update=community_fast_update,
+            community_threads=community_threads,
+            output_format=output_format,
+            time_slices=time_slices,
+            checkpoint_path=checkpoint_path,
+            trace_memory=trace_memory,
+            profile_path=profile_path,
+            metrics_in_output=metrics_in_output,
+            img_renderer=img_renderer,
+            img_size=img_size,
+            img_labels=img_labels,
         )
         execution_time = datetime.now()-start
         NB.collect_tweets(
             snscrape_json_path=snscrape_json_path, 
+            snscrape_workers=snscrape_workers,
             batch_size=batch_size, 
+            incremental_batch=incremental_batch,
+            resume=resume,
             input_json=input_json, 
             layout_algo=layout_algo, 
             community_algo=community_algo, 
@@ -201,9 +430,11 @@ def main(
         NB.find_communities(community_algo)
         print("Communities algo ended, time of execution is:", datetime.now() - start)
         if img_path != "no_img_file":
-            NB.export_img_graph(img_path)
+            NB.export_img_graph(img_path, background=True)
         execution_time = datetime.now()-start
         NB.export_json_output(json_path, execution_time)
+        NB.wait_img_export()
+        NB.export_metrics(metrics_path)
         print("The time of execution of the whole program is :", execution_time)
 
 
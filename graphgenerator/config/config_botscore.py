@@ -0,0 +1,13 @@
+# fields of the user profile used by botfinder to compute the botscore
+botscore_profile_fields = [
+    "username",
+    "displayname",
+    "description",
+    "verified",
+    "created",
+    "followersCount",
+    "friendsCount",
+    "statusesCount",
+    "favouritesCount",
+    "listedCount",
+]
@@ -0,0 +1,9 @@
+# files of a collection checkpoint directory
+checkpoint_files = {
+    "rows": "rows.jsonl",
+    "cursor": "cursor.json",
+}
+
+# number of analysed tweets after which a checkpoint is saved, rows extracted from them are spilled to the checkpoint
+# so that only rows of the last checkpoint_every analysed tweets are kept in memory
+checkpoint_every = 1000
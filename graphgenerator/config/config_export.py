@@ -50,3 +50,36 @@ nodes_columns_export = {
         column_names.nodes_community,
     ]
 }
+
+# columns of edges and nodes of a batch delta (see write_batch_delta()), weights and ids of edges, sizes, positions and
+# communities of nodes depend on the whole graph and are only exported at the end of the collection
+batch_edges_columns_export = [
+    column_names.edge_source,
+    column_names.edge_target,
+    column_names.edge_type,
+    column_names.edge_size,
+    column_names.edge_url_label,
+    column_names.edge_metadata,
+]
+
+batch_nodes_columns_export = [
+    column_names.node_id,
+    column_names.node_label,
+    column_names.node_type_tweet,
+    column_names.node_metadata,
+]
+
+batch_nodes_columns_metadata = [
+    column_names.node_date,
+    column_names.node_url_tweet,
+    column_names.node_url_quoted,
+    column_names.node_url_RT,
+    column_names.node_botscore,
+]
+
+# files of a graph exported in parquet format (the graph is a directory)
+parquet_graph_files = {
+    "nodes": "nodes.parquet",
+    "edges": "edges.parquet",
+    "metadata": "metadata.json",
+}
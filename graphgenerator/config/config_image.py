@@ -0,0 +1,44 @@
+# raster images of graphs (see utils/raster.py)
+
+# width and height of images in pixels
+image_size = 3000
+
+# share of the image left blank around the graph
+image_margin = 0.03
+
+# radius in pixels of the smallest and of the largest nodes (radius grows as the square root of the size of nodes)
+node_radius = (2, 14)
+
+# opacity of nodes and of a single edge (opacity of overlapping edges accumulates)
+node_alpha = 0.85
+edge_alpha = 0.06
+
+# number of edges pixels drawn at once, it bounds the memory used to draw edges
+edge_pixels_chunk_size = 2000000
+
+# height of labels in pixels, as a share of image_size
+label_height = 0.006
+
+# colours of communities (a community gets the colour of its id modulo the number of colours)
+community_colours = [
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+    "#aec7e8",
+    "#ffbb78",
+    "#98df8a",
+    "#ff9896",
+    "#c5b0d5",
+    "#c49c94",
+    "#f7b6d2",
+    "#c7c7c7",
+    "#dbdb8d",
+    "#9edae5",
+]
@@ -0,0 +1,106 @@
+import json
+import os
+
+import numpy as np
+
+from graphgenerator.config.config_checkpoint import checkpoint_files
+from graphgenerator.utils.graph_files import replace_file
+
+
+class CollectionCheckpoint:
+    """
+    Class to save a data collection on disk while it runs, so that it can be resumed if it stops before its end
+    A checkpoint is a directory containing:
+    - a spill file where rows extracted from collected tweets are appended: each line is a chunk of rows of the tweet
+    store (see TweetStore.to_arrays()) in json format, with profiles of their accounts if botscores are computed
+    - a cursor file with the state of the collection (last analysed tweet, counters...) and the number of bytes of
+    the spill file it refers to, it is replaced atomically
+    Lines of the spill file written after the last saved cursor are dropped when the collection is resumed
+    As rows are spilled, the tweet store only keeps rows extracted since the last saved cursor, rows are read back
+    from the spill file when the graph is built
+    """
+
+    def __init__(self, path):
+        """
+        Init function of class CollectionCheckpoint
+            Parameters:
+                path (str): path of the checkpoint directory
+        """
+        self.path = path
+        self.rows_path = os.path.join(path, checkpoint_files["rows"])
+        self.cursor_path = os.path.join(path, checkpoint_files["cursor"])
+        self.rows_file = None
+
+    def exists(self):
+        """
+        Returns True if a cursor has been saved in the checkpoint directory
+        """
+        return os.path.exists(self.cursor_path)
+
+    def start(self):
+        """
+        Start a new checkpoint, previous files of the directory are overwritten
+        """
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self.cursor_path):
+            os.remove(self.cursor_path)
+        self.rows_file = open(self.rows_path, "wb")
+
+    def resume(self):
+        """
+        Returns the saved cursor, rows saved after it are dropped and the spill file is reopened to append rows
+        """
+        with open(self.cursor_path, "r") as file:
+            cursor = json.load(file)
+        with open(self.rows_path, "r+b") as file:
+            file.truncate(cursor["n_bytes"])
+        self.rows_file = open(self.rows_path, "ab")
+        return cursor
+
+    def saved_chunks(self):
+        """
+        Yield chunks saved in the spill file, dictionnaries with the rows of the tweet store ("store", see
+        TweetStore.to_arrays(), numeric columns are lists) and profiles of their accounts ("profiles")
+        """
+        with open(self.rows_path, "rb") as file:
+            for line in file:
+                yield json.loads(line)
+
+    def add(self, arrays, profiles=[]):
+        """
+        Append a chunk of rows of the tweet store to the spill file
+            Parameters:
+                arrays (dict): rows of the tweet store in compact arrays (see TweetStore.to_arrays())
+                profiles (list): profiles of the accounts of the rows, used to compute botscores of the accounts
+                again when the collection is resumed
+        """
+        chunk = {
+            "store": {
+                column: values.tolist() if isinstance(values, np.ndarray) else values
+                for column, values in arrays.items()
+            },
+            "profiles": profiles,
+        }
+        self.rows_file.write(json.dumps(chunk).encode("utf-8") + b"\n")
+
+    def save(self, cursor):
+        """
+        Flush the spill file to disk then save cursor (dictionnary with the state of the collection)
+        """
+        self.rows_file.flush()
+        os.fsync(self.rows_file.fileno())
+        cursor = dict(cursor, n_bytes=self.rows_file.tell())
+
+        def write_cursor(temporary_path):
+            with open(temporary_path, "w") as file:
+                json.dump(cursor, file)
+
+        replace_file(self.cursor_path, write_cursor)
+
+    def close(self):
+        """
+        Close the spill file
+        """
+        if self.rows_file is not None:
+            self.rows_file.close()
+            self.rows_file = None
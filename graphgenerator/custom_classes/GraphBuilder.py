@@ -1,23 +1,51 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime, timedelta
-import json
-import networkx as nx
-import snscrape.modules.twitter as sntwitter
-import matplotlib.pyplot as plt
+import time
+import numpy as np
+import pandas as pd
 from dateutil import parser
 from math import sqrt, log
 
 from graphgenerator.data_cleaning.edges import clean_edges
-from graphgenerator.data_cleaning.nodes import concat_clean_nodes
-from graphgenerator.data_cleaning.export import create_json_output
+from graphgenerator.data_cleaning.nodes import (
+    concat_clean_nodes,
+    input_graph_json2communities,
+    input_graph_json2positions,
+)
+from graphgenerator.data_cleaning.export import write_batch_delta, write_json_output, write_parquet_output
+from graphgenerator.data_cleaning.shards import (
+    aggregate_shard_edges,
+    aggregate_shard_nodes,
+    merge_shard_edges,
+    merge_shard_nodes,
+)
+from graphgenerator.custom_classes.CollectionCheckpoint import CollectionCheckpoint
+from graphgenerator.custom_classes.IncrementalBatch import IncrementalBatch
+from graphgenerator.custom_classes.SparseGraph import SparseGraph
+from graphgenerator.custom_classes.StageMetrics import StageMetrics, measured_stage
+from graphgenerator.custom_classes.TweetStore import TweetStore
 from graphgenerator.utils.tweet_extraction import (
-    edge_from_tweet,
-    node_original,
-    node_RT_quoted,
     return_type_source_tweet,
     return_source_tweet,
+    tweet2json,
+)
+from graphgenerator.utils.toolbox import layout_functions, community_functions, load_function
+from graphgenerator.utils.layout import place_new_nodes
+from graphgenerator.utils.graph_files import batch_delta_path, input_graph_column, parquet_graph_path
+from graphgenerator.utils.pipeline import iter_pipeline
+from graphgenerator.utils.communities import edges_weights, find_touched_nodes, remap_communities
+from graphgenerator.utils.raster import export_raster_image
+from graphgenerator.utils.snscrape_reader import (
+    expand_paths,
+    iter_snscrape_tweets,
+    sort_snscrape_files,
+    split_files,
 )
-from graphgenerator.utils.toolbox import layout_functions, community_functions
 from graphgenerator.config import tz, column_names
+from graphgenerator.config.config_checkpoint import checkpoint_every
+from graphgenerator.config.config_image import image_size
 
 
 class GraphBuilder:
@@ -27,7 +55,36 @@ class GraphBuilder:
     accounts mentioning this topic
     """
 
-    def __init__(self, search, since, minretweets=1, maxresults=None, since_id=None, dim=2, compute_botscore=False):
+    def __init__(
+        self,
+        search,
+        since,
+        minretweets=1,
+        maxresults=None,
+        since_id=None,
+        dim=2,
+        compute_botscore=False,
+        botscore_cache_path=None,
+        botscore_cache_max_age=30,
+        botscore_workers=None,
+        botscore_batch_size=100,
+        layout_time_budget=None,
+        pin_positions=False,
+        community_fast_update=False,
+        community_threads=1,
+        output_format="json",
+        botscore_scorer=None,
+        time_slices=1,
+        since_time=None,
+        until_time=None,
+        checkpoint_path=None,
+        trace_memory=False,
+        profile_path=None,
+        metrics_in_output=False,
+        img_renderer="networkx",
+        img_size=image_size,
+        img_labels=20,
+    ):
         """
         Init function of class GraphBuilder
             Parameters:
@@ -38,6 +95,38 @@ class GraphBuilder:
                 maxresults (int): maximum number of RT and quotes to include in the graph
                 dim (int): dimension
                 compute_botscore (bool): should botscore at the account level be computed or not
+                botscore_cache_path (str): path to SQLite database where to save botscores to reuse them from one run
+                to the other, if None botscores are only cached during the run
+                botscore_cache_max_age (float): number of days after which a saved botscore is computed again
+                botscore_workers (int): number of processes used to compute botscores, if None all cores are used
+                botscore_batch_size (int): number of accounts classified at once by a process
+                layout_time_budget (float): number of seconds after which the layout algorithm stops iterating (if the
+                layout algorithm allows it)
+                pin_positions (bool): should nodes of the input graph keep their positions when it is updated (if the
+                layout algorithm allows it)
+                community_fast_update (bool): when communities start from previous ones, should only communities
+                touched by new edges be optimised again (if the community algorithm allows it)
+                community_threads (int): number of threads used to find communities (if the community algorithm allows
+                it)
+                output_format (str): format of the exported graph, either "json" (json file) or "parquet" (directory
+                with nodes and edges in parquet files and metadata in a json file)
+                botscore_scorer (BotscoreScorer): scorer shared with other graph builders (used if compute_botscore is
+                True), it is not closed at the end of the data collection, if None a new scorer is created
+                time_slices (int): number of time slices the search period is split in, slices are scraped at the same
+                time and their tweets are merged as if they had been collected by a single search
+                since_time (int): unix timestamp from which to search tweets (added to the since date)
+                until_time (int): unix timestamp until which to search tweets
+                checkpoint_path (str): path to directory where to save collected tweets and the state of the collection
+                while tweets are scraped, so that the collection can be resumed if it stops (see scrape_tweets())
+                trace_memory (bool): should the peak of memory allocated during each stage be measured (see
+                StageMetrics), it slows the program down
+                profile_path (str): path where to save cProfile statistics of the stages (see export_metrics()), if
+                None stages are not profiled
+                metrics_in_output (bool): should metrics of the stages be added to the metadata of the exported graph
+                img_renderer (str): renderer of exported images, either "networkx" (networkx drawing with a label for
+                each node) or "raster" (nodes and edges drawn in an array of pixels, suited to large graphs)
+                img_size (int): width and height in pixels of images of the raster renderer
+                img_labels (int): number of largest nodes labelled by the raster renderer
         """
         self.search = search
         self.minretweets = int(minretweets)
@@ -47,18 +136,61 @@ class GraphBuilder:
         self.since = since
         self.since_id = since_id
         self.dim = dim
+        self.layout_time_budget = layout_time_budget
+        self.pin_positions = pin_positions
+        self.community_fast_update = community_fast_update
+        self.community_threads = community_threads
+        self.output_format = output_format
+        self.time_slices = int(time_slices)
+        self.since_time = since_time
+        self.until_time = until_time
+        self.checkpoint_path = checkpoint_path
+        self.max_id = None
+        self.metrics = StageMetrics(trace_memory, profile_path)
+        self.metrics_in_output = metrics_in_output
+        self.extraction_time = 0
+        self.img_renderer = img_renderer
+        self.img_size = img_size
+        self.img_labels = img_labels
+        self.img_export = None
         self.compute_botscore = compute_botscore
+        self.shared_botscore_scorer = botscore_scorer is not None
+        if compute_botscore and botscore_scorer is None:
+            # botfinder (and scikit-learn) are only imported when botscores are computed
+            from graphgenerator.utils.botscore import BotscoreCache, BotscoreScorer
+
+            botscore_scorer = BotscoreScorer(
+                cache=BotscoreCache(db_path=botscore_cache_path, max_age_days=botscore_cache_max_age),
+                n_workers=botscore_workers,
+                batch_size=botscore_batch_size,
+            )
+        self.botscore_scorer = botscore_scorer if compute_botscore else None
         self.get_valid_date()
-        self.nodes_original = []
-        self.nodes_RT_quoted = []
-        self.nodes_original_done = []
+        self.store = TweetStore()
+        # edges and nodes aggregated by snscrape workers (see collect_snscrape_tweets())
+        self.shard_edges = []
+        self.shard_nodes = []
+        self.n_shard_interactions = 0
+        # number of RT and quotes spilled to the checkpoint and profiles of the accounts of rows not spilled yet (first
+        # profile of each account), see scrape_tweets()
+        self.n_spilled_interactions = 0
+        self.window_profiles = None
         self.type_search = "include:nativeretweets"
-        self.edges = []
         self.edges_clean = []
         self.nodes = []
-        self.G = []
+        self.graph = None
+        self.previous_nodes = None
         self.positions = []
-        self.communities = {}
+        self.layout_scale = 1
+        self.input_positions = pd.DataFrame()
+        self.input_scale = 1
+        self.communities = []
+        self.previous_edges = {}
+        self.input_communities = pd.Series(dtype=np.int64)
+        self.input_edges = {}
+        self.input_graph_loaded = False
+        self.incremental_batch = None
+        self.n_valid_tweet_saved = 0
         self.last_collected_tweet = ""
         self.most_recent_tweet = ""
         self.data_collection_date = ""
@@ -67,6 +199,8 @@ class GraphBuilder:
         self.community_algo = ""
         self.n_valid_tweet = 0
         self.n_analysed_tweets = 0
+        # positions of valid tweets among analysed tweets, only recorded for time slices (see collect_time_slices())
+        self.valid_tweet_positions = None
         self.data_collected = False
         self.data_cleaned = False
         self.graph_created = False
@@ -126,34 +260,124 @@ class GraphBuilder:
             search_final += f" since:{self.min_date}"
         if self.since_id:
             search_final += f" since_id:{self.since_id}"
+        if self.since_time:
+            search_final += f" since_time:{self.since_time}"
+        if self.until_time:
+            search_final += f" until_time:{self.until_time}"
         return search_final
 
+    def create_time_slices(self):
+        """
+        Returns list of (since_time, until_time) unix timestamps splitting the search period (from the valid since date
+        to now) in time_slices slices of the same length, from the most recent to the oldest slice
+        The most recent slice has no until_time and the oldest one no since_time (it starts at the since date of the
+        search), so that slices cover exactly the tweets of the search
+        """
+        start = self.min_date_dt.timestamp()
+        length = (self.data_collection_date.timestamp() - start) / self.time_slices
+        bounds = [None] + [int(start + i * length) for i in range(1, self.time_slices)] + [None]
+        return [(bounds[i], bounds[i + 1]) for i in reversed(range(self.time_slices))]
+
+    def collect_time_slices(self):
+        """
+        Collect tweets of the search by time slices (see create_time_slices()), each slice is scraped by a thread with
+        its own GraphBuilder, then slices are merged from the most recent to the oldest one
+        If maxresults is reached, tweets of older slices are dropped (and the slice in which it is reached is cut) so
+        that the most recent valid tweets are kept as when a single search is scraped
+        """
+        builders = []
+        for since_time, until_time in self.create_time_slices():
+            NB = GraphBuilder(
+                search=self.search,
+                since=self.since,
+                minretweets=self.minretweets,
+                maxresults=self.maxresults,
+                since_id=self.since_id,
+                compute_botscore=self.compute_botscore,
+                botscore_scorer=self.botscore_scorer,
+                since_time=since_time,
+                until_time=until_time,
+            )
+            # all slices use the same cutoff date for source tweets
+            NB.min_date = self.min_date
+            NB.min_date_dt = self.min_date_dt
+            NB.valid_tweet_positions = array("q")
+            builders.append(NB)
+        with ThreadPoolExecutor(max_workers=self.time_slices) as executor:
+            futures = [executor.submit(NB.collect_tweets) for NB in builders]
+            for future in futures:
+                future.result()
+        n_tweets = 0
+        for NB in builders:
+            if NB.most_recent_tweet == "":
+                continue
+            if n_tweets == 0:
+                self.most_recent_tweet = NB.most_recent_tweet
+            store = NB.store
+            if self.maxresults and self.n_valid_tweet + NB.n_valid_tweet >= self.maxresults:
+                n_kept = self.maxresults - self.n_valid_tweet
+                store = store.head(n_kept)
+                # tweets analysed after the one reaching maxresults are not counted, as when a single search is scraped
+                n_tweets += NB.valid_tweet_positions[n_kept - 1]
+                self.last_collected_tweet = store.tweet_id[-1]
+                self.last_collected_date = store.date[-1]
+            else:
+                n_tweets += NB.n_analysed_tweets + 1
+                if NB.last_collected_tweet:
+                    self.last_collected_tweet = NB.last_collected_tweet
+                    self.last_collected_date = NB.last_collected_date
+            self.store.extend(store)
+            self.n_valid_tweet += len(store)
+            self.extraction_time += NB.extraction_time
+            if self.maxresults and self.n_valid_tweet >= self.maxresults:
+                break
+        self.n_analysed_tweets = max(n_tweets - 1, 0)
+
     def extract_info_from_tweet(self, tweet, from_snscrape):
         """
-        Extract information from a tweet and add to edges and nodes files
+        Extract information from a tweet and add it to the tweet store, which then feeds edges and nodes files
             Parameters:
                 tweet (dict): a tweet in dictionnary format
                 from_snscrape (str): path to snscrape path if relevant
         """
+        start = time.perf_counter()
         is_RT_or_quoted = return_type_source_tweet(tweet)
         if is_RT_or_quoted:
             source_tweet = return_source_tweet(tweet)
             if self.is_valid_tweet(tweet, source_tweet, from_snscrape):
-                self.edges.append(edge_from_tweet(tweet, source_tweet))
-                self.nodes_RT_quoted.append(node_RT_quoted(tweet, source_tweet, self.compute_botscore))
-                if source_tweet["id"] not in self.nodes_original_done:
-                    self.nodes_original.append(
-                        node_original(tweet, source_tweet, self.compute_botscore)
-                    )
-                    self.nodes_original_done.append(source_tweet["id"])
+                self.store.add_interaction(tweet, source_tweet, is_RT_or_quoted == "has quoted")
+                self.add_profile(tweet["user"])
+                if not self.store.has_original(source_tweet["id"]):
+                    self.store.add_original(tweet, source_tweet)
+                    self.add_profile(source_tweet["user"])
                 self.n_valid_tweet += 1
             self.last_collected_tweet = tweet["id"]
             self.last_collected_date = tweet["date"]
+        self.extraction_time += time.perf_counter() - start
+
+    def add_profile(self, user_info):
+        """
+        Add the profile of an account to the botscore scorer if botscores are computed, it is also kept with the rows
+        not spilled yet if a checkpoint is saved (see scrape_tweets())
+        """
+        if self.botscore_scorer:
+            self.botscore_scorer.add(user_info)
+            if self.window_profiles is not None:
+                self.window_profiles.setdefault(user_info["username"], user_info)
 
     def save_batch(self, input_json, layout_algo, community_algo, img_path, json_path, execution_time):
         """
+        Build the graph from data collected so far and export it, so that intermediate results are available during
+        data collection
+        If batches are incremental, only data collected since the previous batch is cleaned and the accounts and edges
+        it changed are appended to a file of deltas (see export_batch_delta()), the graph is only built at the end of
+        the collection
         """
         self.data_collected = True
+        self.n_valid_tweet_saved = self.n_valid_tweet
+        if self.incremental_batch is not None:
+            self.export_batch_delta(json_path, execution_time)
+            return
         self.clean_nodes_edges(input_json)
         self.create_graph(layout_algo)
         self.find_communities(community_algo)
@@ -161,40 +385,185 @@ class GraphBuilder:
             self.export_img_graph(img_path)
         self.export_json_output(json_path, execution_time)
 
-    def collect_tweets(self, snscrape_json_path=None, batch_size=0, **kwargs):
+    @measured_stage("export_batch_delta")
+    def export_batch_delta(self, json_path="output.json", execution_time=float('nan')):
         """
-        Collect and save tweets in nodes and edges files, for each tweet, the source tweet is also collected
-        data collection stopped when their ist no longer tweet to collect or if the maximum number of tweets to collect
-        is reached
-        Tweets are saved in lists depending on the type of tweets (Retweet, quote or source tweet)
-        Here we do not use snscrape cli command but directly its associated package through the TwitterSearchScraper
-        module, thus the maxresults is not the same as in the cli command, here it refers to the maximum number of
-        valid tweets (see the .is_valid_tweet() method to get a definition of valid tweet)
-        Tweets can also be directy imported from output of snscrape command using arg `snscrape_json_path`
+        Fold data collected since the previous batch into the tables of the incremental batches and append the
+        accounts and edges it changed to the file of deltas named after json_path (see batch_delta_path()), so that
+        the cost of a batch only depends on the tweets it collected: columns depending on the whole graph (weights,
+        positions, communities...) are not in deltas
             Parameters:
-                snscrape_json_path (str): path to snscrape json output from which to import tweets that will be used to build network, default is None
+                json_path (str): path where the graph is exported at the end of the collection
+                execution_time (datetime): execution time of the whole program
         """
-        if not self.data_collected:
-            self.data_collection_date = datetime.now(tz=tz)
-            if snscrape_json_path:
-                with open(snscrape_json_path, "r") as f:
-                    for i,tweet in enumerate(f):
-                        tweet_json = json.loads(tweet)
-                        if i == 0:
-                            self.most_recent_tweet = tweet_json["id"]
-                        self.extract_info_from_tweet(tweet_json, snscrape_json_path)
-                        self.n_analysed_tweets = i
-            else:
-                search = self.create_search()
-                print(search)
-                for i, tweet in enumerate(sntwitter.TwitterSearchScraper(search).get_items()):
-                    tweet_json = json.loads(tweet.json())
+        botscores = self.botscore_scorer.result() if self.botscore_scorer else None
+        edges, nodes = self.incremental_batch.fold(self.store, self.last_collected_date, botscores)
+        write_batch_delta(
+            batch_delta_path(json_path),
+            nodes,
+            edges,
+            self.return_metadata_json(execution_time),
+            append=self.incremental_batch.n_batches > 1,
+        )
+
+    def is_batch_complete(self, batch_size):
+        """
+        Returns True if batch_size new valid tweets have been collected since the last saved batch
+        """
+        return (
+            batch_size > 0
+            and self.n_valid_tweet > self.n_valid_tweet_saved
+            and self.n_valid_tweet % batch_size == 0
+        )
+
+    def collect_snscrape_tweets(self, snscrape_json_path, snscrape_workers=1):
+        """
+        Collect tweets from snscrape json outputs, files are read from the most recent to the oldest one as if they
+        were a single snscrape output
+        If snscrape_workers is above 1, files are split in byte ranges (shards) read by a pool of processes, each
+        process aggregates edges and nodes of its shard (see collect_shard()), they are merged when data is cleaned so
+        that the result is the same as if files were read by a single process
+            Parameters:
+                snscrape_json_path (str or list): path(s) to snscrape json outputs, wildcards can be used
+                snscrape_workers (int): number of processes used to read files
+        """
+        paths = sort_snscrape_files(expand_paths(snscrape_json_path))
+        if snscrape_workers > 1:
+            shards = split_files(paths, snscrape_workers * 4)
+            n_tweets = 0
+            with ProcessPoolExecutor(max_workers=snscrape_workers) as executor:
+                futures = [
+                    executor.submit(collect_shard, self.minretweets, self.compute_botscore, path, start, end)
+                    for path, start, end in shards
+                ]
+                for future in futures:
+                    shard = future.result()
+                    if shard["n_tweets"] and n_tweets == 0:
+                        self.most_recent_tweet = shard["most_recent_tweet"]
+                    if shard["last_collected_tweet"]:
+                        self.last_collected_tweet = shard["last_collected_tweet"]
+                        self.last_collected_date = shard["last_collected_date"]
+                    if shard["n_interactions"]:
+                        self.shard_edges.append(shard["edges"])
+                        self.shard_nodes.append(shard["nodes"])
+                        self.n_shard_interactions += shard["n_interactions"]
+                    if self.botscore_scorer:
+                        for profile in shard["profiles"].values():
+                            self.botscore_scorer.add(profile)
+                    self.n_valid_tweet += shard["n_valid_tweet"]
+                    self.extraction_time += shard["extraction_time"]
+                    n_tweets += shard["n_tweets"]
+            self.n_analysed_tweets = max(n_tweets - 1, 0)
+        else:
+            i = 0
+            for path in paths:
+                for tweet_json in iter_snscrape_tweets(path, with_profile=self.compute_botscore):
+                    if i == 0:
+                        self.most_recent_tweet = tweet_json["id"]
+                    self.extract_info_from_tweet(tweet_json, path)
+                    self.n_analysed_tweets = i
+                    i += 1
+
+    def scrape_tweets(self, batch_size=0, resume=False, **kwargs):
+        """
+        Collect tweets of the search with snscrape scraper, if checkpoint_path is set, rows of the tweet store and the
+        state of the collection are saved in the checkpoint directory every checkpoint_every analysed tweets (and when
+        the collection stops): rows are spilled to the checkpoint and removed from the tweet store, so that memory
+        used by the collection is bounded, they are read back when data is cleaned (see collected_store())
+        If resume is True and a checkpoint has been saved, the collection starts again after the last analysed tweet
+        of the checkpoint, spilled rows are not read back: only ids of their source tweets and profiles of their
+        accounts (if botscores are computed) are read
+            Parameters:
+                batch_size (int): number of valid tweets after which the graph is built and exported (see
+                collect_tweets())
+                resume (bool): should the collection be resumed from the checkpoint
+                kwargs: arguments of save_batch() (see collect_tweets())
+        """
+        checkpoint = CollectionCheckpoint(self.checkpoint_path) if self.checkpoint_path else None
+        start = 0
+        complete = False
+        if checkpoint and resume and checkpoint.exists():
+            cursor = checkpoint.resume()
+            self.min_date = cursor["min_date"]
+            self.min_date_dt = parser.parse(cursor["min_date_dt"])
+            if cursor["search"] != self.create_search():
+                raise Exception(f"The checkpoint was saved for search {cursor['search']}, it can't be resumed")
+            self.data_collection_date = parser.parse(cursor["data_collection_date"])
+            for chunk in checkpoint.saved_chunks():
+                self.store.original_ids.update(chunk["store"]["original_tweet_id"])
+                self.n_spilled_interactions += len(chunk["store"]["tweet_id"])
+                if self.botscore_scorer:
+                    for profile in chunk["profiles"]:
+                        self.botscore_scorer.add(profile)
+            self.most_recent_tweet = cursor["most_recent_tweet"]
+            self.n_analysed_tweets = cursor["n_analysed_tweets"]
+            self.n_valid_tweet = cursor["n_valid_tweet"]
+            self.last_collected_tweet = cursor["last_collected_tweet"]
+            self.last_collected_date = cursor["last_collected_date"]
+            self.extraction_time = cursor["extraction_time"]
+            if cursor["last_analysed_tweet"]:
+                self.max_id = int(cursor["last_analysed_tweet"]) - 1
+                start = self.n_analysed_tweets + 1
+            complete = cursor["complete"]
+            print(f"Collection resumed after {start} analysed tweets")
+        elif checkpoint:
+            checkpoint.start()
+        if checkpoint and self.botscore_scorer:
+            self.window_profiles = {}
+        last_analysed_tweet = self.max_id + 1 if self.max_id else ""
+
+        def save_checkpoint(complete):
+            if len(self.store):
+                checkpoint.add(self.store.to_arrays(), list((self.window_profiles or {}).values()))
+                self.n_spilled_interactions += len(self.store)
+                self.store.clear()
+                if self.window_profiles:
+                    self.window_profiles.clear()
+            checkpoint.save(
+                {
+                    "search": self.create_search(),
+                    "min_date": self.min_date,
+                    "min_date_dt": self.min_date_dt.isoformat(),
+                    "data_collection_date": self.data_collection_date.isoformat(),
+                    "most_recent_tweet": self.most_recent_tweet,
+                    "last_analysed_tweet": last_analysed_tweet,
+                    "n_analysed_tweets": self.n_analysed_tweets,
+                    "n_valid_tweet": self.n_valid_tweet,
+                    "last_collected_tweet": self.last_collected_tweet,
+                    "last_collected_date": self.last_collected_date,
+                    "extraction_time": self.extraction_time,
+                    "complete": complete,
+                }
+            )
+
+        if complete:
+            checkpoint.close()
+            return
+        # snscrape is only imported when tweets are scraped (not when they are read from snscrape outputs)
+        import snscrape.modules.twitter as sntwitter
+
+        search = self.create_search()
+        if self.max_id:
+            search += f" max_id:{self.max_id}"
+        print(search)
+        # scraping and conversion of tweets run in their own threads, botscores are computed by the processes
+        # of the botscore scorer, so that network waits do not block extraction (and the other way round)
+        tweets = iter_pipeline(
+            sntwitter.TwitterSearchScraper(search).get_items(),
+            [lambda tweet: tweet2json(tweet, self.compute_botscore)],
+        )
+        try:
+            with closing(tweets):
+                for i, tweet_json in enumerate(tweets, start):
                     if i == 0:
                         self.most_recent_tweet = tweet_json["id"]
-                    self.extract_info_from_tweet(tweet_json, snscrape_json_path)
+                    self.extract_info_from_tweet(tweet_json, None)
+                    if self.valid_tweet_positions is not None and self.n_valid_tweet > len(self.valid_tweet_positions):
+                        self.valid_tweet_positions.append(i)
+                    last_analysed_tweet = tweet_json["id"]
                     if self.maxresults and self.n_valid_tweet >= self.maxresults:
                         break
-                    if batch_size>0 and self.n_valid_tweet%batch_size==0:
+                    if self.is_batch_complete(batch_size):
                         self.save_batch(
                             kwargs["input_json"], 
                             kwargs["layout_algo"], 
@@ -204,6 +573,62 @@ class GraphBuilder:
                             kwargs["execution_time"]
                         )
                     self.n_analysed_tweets = i
+                    if checkpoint and (i + 1) % checkpoint_every == 0:
+                        save_checkpoint(False)
+            complete = True
+        finally:
+            if checkpoint:
+                save_checkpoint(complete)
+                checkpoint.close()
+
+    @measured_stage("collect_tweets")
+    def collect_tweets(
+        self,
+        snscrape_json_path=None,
+        batch_size=0,
+        incremental_batch=False,
+        snscrape_workers=1,
+        resume=False,
+        **kwargs
+    ):
+        """
+        Collect and save tweets in nodes and edges files, for each tweet, the source tweet is also collected
+        data collection stopped when their ist no longer tweet to collect or if the maximum number of tweets to collect
+        is reached
+        Tweets are saved in lists depending on the type of tweets (Retweet, quote or source tweet)
+        Here we do not use snscrape cli command but directly its associated package through the TwitterSearchScraper
+        module, thus the maxresults is not the same as in the cli command, here it refers to the maximum number of
+        valid tweets (see the .is_valid_tweet() method to get a definition of valid tweet)
+        Tweets can also be directy imported from output of snscrape command using arg `snscrape_json_path`
+            Parameters:
+                snscrape_json_path (str or list): path(s) to snscrape json outputs from which to import tweets that will be used to build network, wildcards can be used, default is None
+                batch_size (int): number of valid tweets after which the graph is built and exported, if set to 0 a single batch is used
+                incremental_batch (bool): should each batch only process tweets collected since the previous one
+                snscrape_workers (int): number of processes used to read snscrape json outputs
+                resume (bool): should the collection be resumed from the checkpoint saved in checkpoint_path (see
+                scrape_tweets())
+        """
+        if not self.data_collected:
+            self.data_collection_date = datetime.now(tz=tz)
+            if incremental_batch and batch_size > 0:
+                self.incremental_batch = IncrementalBatch(kwargs["input_json"])
+            if snscrape_json_path:
+                self.collect_snscrape_tweets(snscrape_json_path, snscrape_workers)
+            elif self.time_slices > 1:
+                if batch_size > 0:
+                    raise Exception("Batches can't be saved when tweets are collected by time slices")
+                if self.checkpoint_path:
+                    raise Exception("Checkpoints can't be saved when tweets are collected by time slices")
+                self.collect_time_slices()
+            else:
+                if self.incremental_batch and self.checkpoint_path:
+                    raise Exception(
+                        "Incremental batches can't be used with checkpoints, rows of the tweet store are spilled to the"
+                        " checkpoint"
+                    )
+                self.scrape_tweets(batch_size, resume, **kwargs)
+            if self.botscore_scorer and not self.shared_botscore_scorer:
+                self.botscore_scorer.close()
             self.data_collected = True
             self.status = "DONE"
         else:
@@ -212,6 +637,7 @@ class GraphBuilder:
                 "parameter"
             )
 
+    @measured_stage("clean_nodes_edges")
     def clean_nodes_edges(self, input_graph_json={}):
         """
         Clean node and edges files and delete old files that are not usefull anymore, to save memory
@@ -222,19 +648,47 @@ class GraphBuilder:
                 input_graph_json (dict): graph in json format, output of grapgenerator command
         """
         if self.data_collected:
-            if len(self.edges):
-                self.edges_clean = clean_edges(
-                    self.edges, self.last_collected_date, input_graph_json
+            if input_graph_json and not self.input_graph_loaded:
+                # positions, communities and edges of the input graph are only read once (not at each batch)
+                self.input_graph_loaded = True
+                self.input_positions = input_graph_json2positions(input_graph_json, self.dim)
+                if len(self.input_positions):
+                    self.input_scale = np.abs(self.input_positions.to_numpy()).max() or 1
+                self.input_communities = input_graph_json2communities(input_graph_json)
+                self.input_edges = edges_weights(
+                    zip(
+                        *[
+                            input_graph_column(input_graph_json, "edges", column)
+                            for column in [column_names.edge_source, column_names.edge_target, column_names.edge_size]
+                        ]
+                    )
                 )
+            botscores = self.botscore_scorer.result() if self.botscore_scorer else None
+            if self.incremental_batch:
+                self.incremental_batch.fold(self.store, self.last_collected_date, botscores)
+            if self.n_interactions():
+                store = self.collected_store()
+                if self.shard_edges:
+                    self.edges_clean = merge_shard_edges(self.shard_edges, self.last_collected_date, input_graph_json)
+                elif self.incremental_batch:
+                    self.edges_clean = self.incremental_batch.edges_snapshot()
+                else:
+                    self.edges_clean = clean_edges(store.edges_dataframe(), self.last_collected_date, input_graph_json)
                 if len(self.edges_clean) or input_graph_json:
-                    self.nodes = concat_clean_nodes(
-                        self.nodes_RT_quoted,
-                        self.nodes_original,
-                        self.last_collected_date,
-                        input_graph_json,
-                    )
-                    #del self.nodes_original
-                    #del self.nodes_RT_quoted
+                    if self.shard_nodes:
+                        self.nodes = merge_shard_nodes(
+                            self.shard_nodes, self.last_collected_date, input_graph_json, botscores
+                        )
+                    elif self.incremental_batch:
+                        self.nodes = self.incremental_batch.nodes_snapshot()
+                    else:
+                        self.nodes = concat_clean_nodes(
+                            store.nodes_RT_quoted_dataframe(),
+                            store.nodes_original_dataframe(),
+                            self.last_collected_date,
+                            input_graph_json,
+                            botscores,
+                        )
                     self.data_cleaned = True
                     self.enough_data = True
                 else:
@@ -242,7 +696,7 @@ class GraphBuilder:
                         raise Exception("No new data to add to existing graph")
                     else:
                         self.enough_data = False
-            elif input_graph_json and len(self.edges) == 0:
+            elif input_graph_json:
                 raise Exception("No new data to add to existing graph")
             else:
                 self.enough_data = False
@@ -251,67 +705,232 @@ class GraphBuilder:
                 "Data has not yet been collected, run .collect_tweets() before"
             )
 
-    def create_graph(self, layout_algo="spring"):
+    def n_interactions(self):
+        """
+        Returns number of RT and quotes collected, in the tweet store, in shards read by snscrape workers or spilled to
+        the checkpoint
+        """
+        return len(self.store) + self.n_shard_interactions + self.n_spilled_interactions
+
+    def collected_store(self):
+        """
+        Returns a tweet store with all RT and quotes collected: rows spilled to the checkpoint (see scrape_tweets())
+        are read back chunk by chunk and followed by the rows of the tweet store, the tweet store itself if no row has
+        been spilled
+        """
+        if not self.n_spilled_interactions:
+            return self.store
+        store = TweetStore()
+        for chunk in CollectionCheckpoint(self.checkpoint_path).saved_chunks():
+            store.extend_arrays(chunk["store"])
+        store.extend(self.store)
+        return store
+
+    @property
+    def G(self):
+        """
+        Graph in networkx format, it is built from the graph core (see SparseGraph) when it is needed
+        """
+        return self.graph.to_networkx() if self.graph is not None else []
+
+    @measured_stage("create_graph")
+    def create_graph(self, layout_algo="spring", warm_start=False):
         """
-        Create graph object using networkx library and calculate positions of nodes using layout_algo
+        Create graph object (accounts are given integer ids and edges are stored in a sparse matrix, see SparseGraph)
+        and calculate positions of nodes using layout_algo
             Parameters:
                 layout_algo (str): algorithm to use to create graph layout
-                must be in ['circular', 'kamada_kawai', 'spring', 'random', 'spiral'])
+                must be in ['circular', 'kamada_kawai', 'spring', 'random', 'spiral', 'multilevel'])
+                warm_start (bool): should the layout start from positions of the previous graph (if the layout
+                algorithm allows it)
+        When an input graph is updated, the layout starts from positions of its nodes (if the layout algorithm allows
+        it), new nodes are placed next to their neighbours and only a few iterations are run
+        Layout algorithms of networkx get the graph in networkx format, positions are then stored in an array following
+        the ids of nodes
         """
         self.layout_algo = layout_algo
         if self.enough_data:
             if self.data_cleaned:
-                self.G = nx.from_pandas_edgelist(
-                    self.edges_clean,
-                    source=column_names.edge_source,
-                    target=column_names.edge_target,
-                    edge_attr=column_names.edge_size,
-                )
-                position_function = layout_functions[layout_algo]["function"]
-                self.positions = position_function(
-                    self.G, dim=self.dim, k=1/sqrt(self.G.number_of_nodes()), scale=200 + log(self.G.number_of_nodes())*300, **layout_functions[layout_algo]["args"]
+                if self.graph is not None:
+                    self.previous_edges = edges_weights(self.graph.named_edges())
+                    self.previous_nodes = self.graph.nodes
+                self.graph = SparseGraph(
+                    self.edges_clean[column_names.edge_source],
+                    self.edges_clean[column_names.edge_target],
+                    self.edges_clean[column_names.edge_size],
+                    weight=column_names.edge_size,
                 )
+                graph_core = layout_functions[layout_algo].get("graph_core", False)
+                position_function = load_function(layout_functions[layout_algo]["function"])
+                layout_args = dict(layout_functions[layout_algo]["args"])
+                pinned_nodes = None
+                if "warm_start_args" in layout_functions[layout_algo]:
+                    initial_positions = self.initial_positions(warm_start)
+                    if initial_positions is not None:
+                        initial_positions = place_new_nodes(self.graph, initial_positions)
+                        layout_args.update(layout_functions[layout_algo]["warm_start_args"])
+                        if self.pin_positions:
+                            input_nodes = self.graph.index(self.input_positions.index)
+                            pinned_nodes = np.zeros(len(self.graph), dtype=bool)
+                            pinned_nodes[input_nodes[input_nodes >= 0]] = True
+                            if not pinned_nodes.any():
+                                pinned_nodes = None
+                        if graph_core:
+                            layout_args["pos"] = initial_positions
+                        else:
+                            placed = ~np.isnan(initial_positions).any(axis=1)
+                            layout_args["pos"] = dict(
+                                zip(self.graph.nodes[placed].tolist(), initial_positions[placed])
+                            )
+                            if pinned_nodes is not None:
+                                pinned_nodes = self.graph.nodes[pinned_nodes].tolist()
+                if self.layout_time_budget and "time_budget_arg" in layout_functions[layout_algo]:
+                    layout_args[layout_functions[layout_algo]["time_budget_arg"]] = self.layout_time_budget
+                graph = self.graph if graph_core else self.G
+                n_nodes = self.graph.number_of_nodes()
+                if pinned_nodes is not None:
+                    # positions are not rescaled by layout algorithms when nodes are fixed, the scale of the input
+                    # graph is kept so that its nodes do not move
+                    self.layout_scale = self.input_scale
+                    positions = position_function(
+                        graph, dim=self.dim, k=1/sqrt(n_nodes), fixed=pinned_nodes, **layout_args
+                    )
+                    scale = 2 * self.layout_scale
+                else:
+                    self.layout_scale = 200 + log(n_nodes)*300
+                    positions = position_function(
+                        graph, dim=self.dim, k=1/sqrt(n_nodes), scale=self.layout_scale, **layout_args
+                    )
+                    scale = 1
+                if not graph_core:
+                    positions = self.graph.from_dict(positions).reshape(n_nodes, self.dim)
+                self.positions = positions * scale if scale != 1 else positions
                 self.graph_created = True
             else:
                 raise Exception(
                     "data must be cleaned thanks to .clean_nodes_edges() before creating the graph"
                 )
 
-    def find_communities(self, community_algo="louvain"):
+    def initial_positions(self, warm_start):
+        """
+        Returns positions from which the layout starts (array following the ids of nodes, rows of nodes without
+        position are NaN), scaled back to a box of size 1 as used by layout algorithms (the exported layout is in a box
+        of size 2 * scale): positions of the previous batch if warm_start is True, otherwise positions of the input
+        graph, None if no node has a position
+        """
+        if warm_start and len(self.positions):
+            positions = pd.DataFrame(self.positions, index=self.previous_nodes)
+            scale = self.layout_scale
+        else:
+            positions, scale = self.input_positions, self.input_scale
+        if not len(positions):
+            return None
+        positions = positions.reindex(self.graph.nodes).to_numpy() / (2 * scale)
+        if np.isnan(positions).any(axis=1).all():
+            return None
+        return positions
+
+    @measured_stage("find_communities")
+    def find_communities(self, community_algo="louvain", warm_start=False):
         """
         Find communities in graph using a community algorithm
             Parameters:
                 community_algo (str): algorithm to use to find communities in the graph
-                must be in ['greedy_modularity', 'asyn_lpa_communities', 'girvan_newman', 'label_propagation', 'louvain']
+                must be in ['greedy_modularity', 'asyn_lpa_communities', 'girvan_newman', 'label_propagation', 'louvain',
+                'parallel_louvain']
+                warm_start (bool): should the algorithm start from communities of the previous graph (if the
+                community algorithm allows it)
+        When an input graph is updated, the algorithm starts from communities of its nodes (if the community
+        algorithm allows it). In both cases communities keep the ids of the previous communities they overlap the most
+        with, so that ids are stable from one run to the other
+        Communities are stored in an array following the ids of nodes
         """
         self.community_algo = community_algo
         if self.enough_data:
             if self.graph_created:
-                community_function = community_functions[community_algo]["function"]
+                graph_core = community_functions[community_algo].get("graph_core", False)
+                community_function = load_function(community_functions[community_algo]["function"])
                 cleaning_function = community_functions[community_algo]["cleaning"]
+                community_args = dict(community_functions[community_algo]["args"])
+                if "threads_arg" in community_functions[community_algo]:
+                    community_args[community_functions[community_algo]["threads_arg"]] = self.community_threads
+                if warm_start and len(self.communities):
+                    previous_communities = pd.Series(self.communities, index=self.previous_nodes)
+                    previous_edges = self.previous_edges
+                else:
+                    previous_communities, previous_edges = self.input_communities, self.input_edges
+                if len(previous_communities):
+                    next_community = int(previous_communities.max()) + 1
+                    previous_communities = previous_communities.reindex(self.graph.nodes).to_numpy(dtype=float)
+                if len(previous_communities) and "warm_start_arg" in community_functions[community_algo]:
+                    # new nodes start in their own community
+                    new_nodes = np.isnan(previous_communities)
+                    initial_communities = np.where(new_nodes, 0, previous_communities).astype(np.int64)
+                    initial_communities[new_nodes] = next_community + np.arange(new_nodes.sum())
+                    if not graph_core:
+                        initial_communities = self.graph.to_dict(initial_communities.tolist())
+                    community_args[community_functions[community_algo]["warm_start_arg"]] = initial_communities
+                    if self.community_fast_update and "local_update_function" in community_functions[community_algo]:
+                        community_function = load_function(community_functions[community_algo]["local_update_function"])
+                        community_args["touched_nodes"] = find_touched_nodes(self.graph.named_edges(), previous_edges)
                 communities = community_function(
-                    self.G, **community_functions[community_algo]["args"]
+                    self.graph if graph_core else self.G, **community_args
                 )
-                self.communities = cleaning_function(communities)
+                communities = cleaning_function(communities)
+                self.communities = communities if graph_core else self.graph.from_dict(communities)
+                if len(previous_communities):
+                    self.communities = remap_communities(self.communities, previous_communities, next_community)
                 self.communities_detected = True
             else:
                 raise Exception(
                     "graph needs to be created thanks to .creat_graph() before using this command"
                 )
 
-    def export_img_graph(self, img_path="Graph.png"):
+    @measured_stage("export_img_graph")
+    def export_img_graph(self, img_path="Graph.png", background=False):
         """
         Export an image (png file) of the network
         It is a very basic image here you can juste visualise the connection between the nodes
+        With the raster renderer, nodes are coloured by community, their size follows their number of RT and quotes
+        and only the img_labels largest nodes are labelled (see export_raster_image())
             Parameters:
                  img_path (str): path where to export img file of the graph
+                 background (bool): should the image be exported by a background thread (only with the raster
+                 renderer), wait_img_export() waits for the end of the export, the rendering is then measured as stage
+                 render_img (see StageMetrics.measure_background())
         """
         if self.enough_data:
-            if self.graph_created:
+            if self.graph_created and self.img_renderer == "raster":
+                self.wait_img_export()
+                sources, targets, _ = self.graph.unique_edges()
+                sizes = np.bincount(
+                    self.graph.index(self.edges_clean[column_names.edge_target]),
+                    weights=self.edges_clean[column_names.edge_size],
+                    minlength=len(self.graph),
+                )
+                # a node id can appear in several rows of nodes (e.g. with several botscores)
+                unique_nodes = self.nodes.drop_duplicates(column_names.node_id)
+                labels = (
+                    pd.Series(unique_nodes[column_names.node_label].to_numpy(), index=unique_nodes[column_names.node_id])
+                    .reindex(self.graph.nodes)
+                    .to_numpy()
+                )
+                communities = self.communities if self.communities_detected else np.zeros(len(self.graph), dtype=np.int64)
+                args = (img_path, self.positions, sources, targets, communities, sizes, labels, self.img_size)
+                if background:
+                    executor = ThreadPoolExecutor(max_workers=1)
+                    self.img_export = executor.submit(self.render_img, args, self.stage_counts("render_img", {}))
+                    executor.shutdown(wait=False)
+                else:
+                    export_raster_image(*args, n_labels=self.img_labels)
+            elif self.graph_created:
+                import matplotlib.pyplot as plt
+                import networkx as nx
+
                 plt.figure(figsize=(30, 30))
                 nx.draw_networkx(
                     self.G,
-                    pos=self.positions,
+                    pos=self.graph.to_dict(self.positions),
                     arrows=True,
                     with_labels=True,
                     font_size=5,
@@ -324,6 +943,27 @@ class GraphBuilder:
                     "graph needs to be created thanks to .creat_graph() before using this command"
                 )
 
+    def render_img(self, args, counts):
+        """
+        Export the raster image of the graph in a background thread (see export_img_graph()), the rendering is measured
+        as stage render_img
+            Parameters:
+                args (tuple): arguments of export_raster_image()
+                counts (dict): counts of the stage, computed when the export starts
+        """
+        with self.metrics.measure_background("render_img") as record:
+            export_raster_image(*args, n_labels=self.img_labels)
+            record.update(counts)
+
+    def wait_img_export(self):
+        """
+        Wait for the end of the image exported in a background thread (see export_img_graph()), an exception raised
+        by the export is raised again, the record of the rendering is then in the metrics
+        """
+        if self.img_export is not None:
+            img_export, self.img_export = self.img_export, None
+            img_export.result()
+
     def return_metadata_json(self, execution_time):
         """
         Create metadata dictionnary to be included in final json to export
@@ -349,33 +989,123 @@ class GraphBuilder:
                 column_names.metadata_n_collected_tweets: self.n_valid_tweet,
                 column_names.metadata_n_analysed_tweets : self.n_analysed_tweets,
                 column_names.metadata_status : self.status,
+                **({column_names.metadata_metrics: self.metrics.to_dict()} if self.metrics_in_output else {}),
             }    
 
+    @measured_stage("export_json_output")
     def export_json_output(self, json_path="output.json", execution_time=float('nan')):
         """
-        Create a clean json output containing the nodes, the edges and some other information (in metadata)
+        Create a clean json output containing the nodes, the edges and some other information (in metadata), in json
+        or parquet format depending on output_format
             Parameters:
-                json_path (str): path where to export the json
+                json_path (str): path where to export the json, in parquet format the graph is exported in a directory
+                named after it (see parquet_graph_path())
                 execution_time (datetime): execution time of the whole program 
         """
+        write_output = write_json_output
+        if self.output_format == "parquet":
+            write_output = write_parquet_output
+            json_path = parquet_graph_path(json_path)
         if self.enough_data:
             if self.communities_detected:
-                json_output = create_json_output(
-                    self.nodes, self.edges_clean, self.positions, self.communities, self.dim
+                write_output(
+                    json_path,
+                    self.nodes,
+                    self.edges_clean,
+                    pd.DataFrame(self.positions, index=pd.Index(self.graph.nodes, name=column_names.node_id)),
+                    pd.Series(self.communities, index=self.graph.nodes),
+                    self.dim,
+                    self.return_metadata_json(execution_time),
                 )
-                json_output["metadata"] = self.return_metadata_json(execution_time)
-                with open(json_path, "w") as outfile:
-                    json.dump(json_output, outfile)
             else:
                 raise Exception(
                     "Before exporting json of the graph you must have run all functions to build it up:"
                     "collect_tweets(), clean_nodes_edges(), create_graph() and find_communities()"
                 )
         else:
-            json_output = {
-                "edges": [],
-                "nodes": []
+            write_output(json_path, None, None, None, None, self.dim, self.return_metadata_json(execution_time))
+
+    def stage_counts(self, stage, record):
+        """
+        Returns counts of a stage added to its metrics (see StageMetrics): analysed and valid tweets, time spent to
+        extract information from tweets and number of tweets analysed per second (time spent saving batches is not
+        counted) for the data collection, number of nodes and edges (and communities) for other stages
+            Parameters:
+                stage (str): name of the stage (name of the method)
+                record (dict): metrics of the run of the stage
+        """
+        if stage == "collect_tweets":
+            n_tweets = self.n_analysed_tweets + 1 if self.most_recent_tweet != "" else 0
+            collection_time = record["wall_time"] - record.get("inner_time", 0)
+            return {
+                "n_analysed_tweets": n_tweets,
+                "n_valid_tweets": self.n_valid_tweet,
+                "extraction_time": self.extraction_time,
+                "tweets_per_second": n_tweets / collection_time if collection_time > 0 else None,
+            }
+        if stage == "export_batch_delta":
+            return {
+                "n_nodes": self.incremental_batch.n_changed_nodes,
+                "n_edges": self.incremental_batch.n_changed_edges,
             }
-            json_output["metadata"] = self.return_metadata_json(execution_time)
-            with open(json_path, "w") as outfile:
-                json.dump(json_output, outfile)
+        counts = {
+            "n_nodes": len(self.nodes),
+            "n_edges": len(self.edges_clean),
+        }
+        if stage == "clean_nodes_edges":
+            counts["n_interactions"] = self.n_interactions()
+        elif stage == "create_graph":
+            counts["layout_algo"] = self.layout_algo
+        elif stage == "find_communities":
+            counts["n_communities"] = len(np.unique(self.communities))
+            counts["community_algo"] = self.community_algo
+        return counts
+
+    def export_metrics(self, metrics_path=None):
+        """
+        Export metrics of the stages in a json file (see StageMetrics) and save cProfile statistics of the stages in
+        profile_path if it is set
+            Parameters:
+                metrics_path (str): path where to export the json of metrics, if None metrics are not exported
+        """
+        if metrics_path:
+            self.metrics.write(metrics_path)
+        self.metrics.dump_profile()
+
+
+def collect_shard(minretweets, with_profile, path, start, end):
+    """
+    Collect tweets of a byte range of a snscrape json output, function run by worker processes of
+    GraphBuilder.collect_snscrape_tweets(), edges and nodes of the collected tweets are returned aggregated (see
+    aggregate_shard_edges() and aggregate_shard_nodes())
+        Parameters:
+            minretweets (int): minimal number of retweets a tweet should have to be collected
+            with_profile (bool): should profiles of accounts be collected to compute their botscore
+            path (str): path to snscrape json output
+            start (int): byte from which lines are read
+            end (int): byte up to which lines are read
+    """
+    NB = GraphBuilder(search="", since="2004-01-01", minretweets=minretweets)
+    if with_profile:
+        # botfinder (and scikit-learn) are only imported when botscores are computed
+        from graphgenerator.utils.botscore import ProfileCollector
+
+        NB.botscore_scorer = ProfileCollector()
+    n_tweets = 0
+    for tweet_json in iter_snscrape_tweets(path, with_profile, start, end):
+        if n_tweets == 0:
+            NB.most_recent_tweet = tweet_json["id"]
+        NB.extract_info_from_tweet(tweet_json, path)
+        n_tweets += 1
+    return {
+        "edges": aggregate_shard_edges(NB.store.edges_dataframe()),
+        "nodes": aggregate_shard_nodes(NB.store.nodes_RT_quoted_dataframe(), NB.store.nodes_original_dataframe()),
+        "n_interactions": len(NB.store),
+        "profiles": NB.botscore_scorer.profiles if with_profile else {},
+        "most_recent_tweet": NB.most_recent_tweet,
+        "last_collected_tweet": NB.last_collected_tweet,
+        "last_collected_date": NB.last_collected_date,
+        "n_valid_tweet": NB.n_valid_tweet,
+        "extraction_time": NB.extraction_time,
+        "n_tweets": n_tweets,
+    }
@@ -0,0 +1,162 @@
+import pandas as pd
+
+from graphgenerator.config import column_names
+from graphgenerator.data_cleaning.batches import (
+    aggregated_edges_columns,
+    aggregated_nodes_columns,
+    fold_edges,
+    fold_nodes,
+    split_pending_rows,
+)
+from graphgenerator.data_cleaning.edges import complete_edges, input_graph_json2edge_df
+from graphgenerator.data_cleaning.export import dataframe2records
+from graphgenerator.data_cleaning.nodes import (
+    clean_nodes_RT_quoted,
+    clean_nodes_tweet,
+    input_graph_json2node_df,
+    join_botscores,
+    label_type_tweet,
+)
+
+
+class IncrementalBatch:
+    """
+    Class to keep edges and nodes aggregated from one batch to the other, so that a batch checkpoint only has to
+    process tweets collected since the previous one instead of all tweets collected so far
+    Aggregated rows are kept in dictionnaries (edges by source, target and type, nodes by account), a batch only
+    takes out and aggregates again the rows of the edges and accounts it touches, the dataframes of all edges and
+    nodes are only built when the graph is exported (see edges_snapshot() and nodes_snapshot())
+    Rows whose source tweet is older than the last collected tweet are kept pending until a later batch (see
+    clean_edges() for the reason why), only their row in the tweet store is kept (see split_pending_rows())
+    """
+
+    def __init__(self, input_graph_json={}):
+        """
+        Init function of class IncrementalBatch
+            Parameters:
+                input_graph_json (dict): graph in json format, output of grapgenerator command, its nodes are folded
+                once at the beginning and its edges are read once
+        """
+        self.input_graph_json = input_graph_json
+        self.edges = {}
+        self.nodes = {}
+        self.input_edges = None
+        self.pending_interactions = []
+        self.pending_originals = []
+        self.n_interactions_done = 0
+        self.n_originals_done = 0
+        self.n_batches = 0
+        self.n_changed_edges = 0
+        self.n_changed_nodes = 0
+        if input_graph_json:
+            self.put_nodes(fold_nodes(None, input_graph_json2node_df(input_graph_json)))
+            self.input_edges = input_graph_json2edge_df(input_graph_json)
+
+    def fold(self, store, limit_date, botscores=None):
+        """
+        Fold rows added to the tweet store since the previous call (and pending rows which can now be used) into the
+        aggregated tables, returns the edges and the nodes changed by the batch (dataframes aggregated at the edge
+        level and at the user level, nodes are labelled by label_type_tweet())
+            Parameters:
+                store (TweetStore): store containing all tweets collected so far
+                limit_date (str): date of the last collected tweet
+                botscores (dict): botscores at the user level, if None botscores are not computed
+        """
+        rows = split_pending_rows(
+            self.pending_interactions,
+            store.source_date[self.n_interactions_done:],
+            self.n_interactions_done,
+            limit_date,
+        )
+        original_rows = split_pending_rows(
+            self.pending_originals,
+            store.original_date[self.n_originals_done:],
+            self.n_originals_done,
+            limit_date,
+        )
+        self.n_interactions_done = len(store)
+        self.n_originals_done = store.n_originals()
+        self.n_batches += 1
+        batch = store.take_interactions(rows, original_rows)
+        edges = pd.DataFrame(columns=aggregated_edges_columns)
+        nodes = pd.DataFrame(columns=aggregated_nodes_columns)
+        if len(rows):
+            new_edges = batch.edges_dataframe()
+            edges = fold_edges(self.take_edges(new_edges), new_edges)
+            self.put_edges(edges)
+        if len(rows) or len(original_rows):
+            new_nodes = pd.concat(
+                [
+                    clean_nodes_tweet(batch.nodes_original_dataframe(), limit_date) if len(original_rows) else None,
+                    clean_nodes_RT_quoted(batch.nodes_RT_quoted_dataframe(), limit_date) if len(rows) else None,
+                ]
+            )
+            if len(new_nodes):
+                new_nodes = join_botscores(new_nodes, botscores)
+                nodes = fold_nodes(self.take_nodes(new_nodes), new_nodes)
+                self.put_nodes(nodes)
+        self.n_changed_edges, self.n_changed_nodes = len(edges), len(nodes)
+        return edges, label_type_tweet(nodes)
+
+    def take_edges(self, new_edges):
+        """
+        Remove from the aggregated edges the ones with the same source, target and type as new_edges and returns
+        them in a dataframe (None if there is none)
+        """
+        keys = set(
+            zip(
+                new_edges[column_names.edge_source],
+                new_edges[column_names.edge_target],
+                new_edges[column_names.edge_type],
+            )
+        )
+        rows = [self.edges.pop(key) for key in keys if key in self.edges]
+        return pd.DataFrame(rows, columns=aggregated_edges_columns) if rows else None
+
+    def put_edges(self, edges):
+        """
+        Add edges aggregated at the edge level to the aggregated edges
+        """
+        for row in dataframe2records(edges, aggregated_edges_columns):
+            self.edges[
+                (row[column_names.edge_source], row[column_names.edge_target], row[column_names.edge_type])
+            ] = tuple(row.values())
+
+    def take_nodes(self, new_nodes):
+        """
+        Remove from the aggregated nodes the accounts of new_nodes and returns their rows in a dataframe (None if
+        there is none)
+        """
+        accounts = set(new_nodes[column_names.node_id])
+        rows = [row for account in accounts if account in self.nodes for row in self.nodes.pop(account)]
+        return pd.DataFrame(rows, columns=aggregated_nodes_columns) if rows else None
+
+    def put_nodes(self, nodes):
+        """
+        Add nodes aggregated at the user level to the aggregated nodes, an account has several rows if it has several
+        labels or botscores
+        """
+        for row in dataframe2records(nodes, aggregated_nodes_columns):
+            self.nodes.setdefault(row[column_names.node_id], []).append(tuple(row.values()))
+
+    def edges_snapshot(self):
+        """
+        Returns clean edges dataframe of all edges, similar to the output of clean_edges()
+        """
+        edges = pd.DataFrame(list(self.edges.values()), columns=aggregated_edges_columns)
+        edges = edges.sort_values(
+            [column_names.edge_source, column_names.edge_target, column_names.edge_type]
+        ).reset_index(drop=True)
+        return complete_edges(edges, self.input_graph_json, self.input_edges)
+
+    def nodes_snapshot(self):
+        """
+        Returns clean nodes dataframe of all nodes, similar to the output of concat_clean_nodes()
+        """
+        nodes = pd.DataFrame(
+            [row for rows in self.nodes.values() for row in rows], columns=aggregated_nodes_columns
+        )
+        nodes = nodes.sort_values(
+            [column_names.node_id, column_names.node_label, column_names.node_botscore]
+        ).reset_index(drop=True)
+        return label_type_tweet(nodes)
@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import os
+import re
+
+from graphgenerator.custom_classes.GraphBuilder import GraphBuilder
+
+
+class MultiSearchBuilder:
+    """
+    Class to collect tweets of several searches at the same time (each search is scraped by a thread of a pool) and
+    build either one graph per search or a single graph merging all searches
+    Each search has its own GraphBuilder (and thus its own since_id, most recent tweet and last collected tweet),
+    accounts are given a botscore only once even if they appear in several searches
+    """
+
+    def __init__(
+        self,
+        searches,
+        since,
+        n_workers=4,
+        merge=False,
+        compute_botscore=False,
+        botscore_cache_path=None,
+        botscore_cache_max_age=30,
+        botscore_workers=None,
+        botscore_batch_size=100,
+        **kwargs
+    ):
+        """
+        Init function of class MultiSearchBuilder
+            Parameters:
+                searches (list): searches to perform on Twitter
+                since (str): date in format %Y-%m-%d from where to start searches (see GraphBuilder)
+                n_workers (int): maximal number of searches scraped at the same time
+                merge (bool): should a single graph be built with tweets of all searches (otherwise one graph is built
+                per search)
+                compute_botscore (bool): should botscore at the account level be computed or not
+                botscore_cache_path (str): path to SQLite database where to save botscores
+                botscore_cache_max_age (float): number of days after which a saved botscore is computed again
+                botscore_workers (int): number of processes used to compute botscores, if None all cores are used
+                botscore_batch_size (int): number of accounts classified at once by a process
+                kwargs: other arguments of GraphBuilder (e.g. minretweets, maxresults, dim), they are used for all
+                searches
+        """
+        self.searches = list(dict.fromkeys(searches))
+        self.since = since
+        self.n_workers = n_workers
+        self.merge = merge
+        self.compute_botscore = compute_botscore
+        self.kwargs = kwargs
+        self.botscore_scorer = None
+        if compute_botscore:
+            # botfinder (and scikit-learn) are only imported when botscores are computed
+            from graphgenerator.utils.botscore import BotscoreCache, BotscoreScorer
+
+            self.botscore_scorer = BotscoreScorer(
+                cache=BotscoreCache(db_path=botscore_cache_path, max_age_days=botscore_cache_max_age),
+                n_workers=botscore_workers,
+                batch_size=botscore_batch_size,
+            )
+        self.graph_builders = {
+            search: GraphBuilder(
+                search=search,
+                since=since,
+                compute_botscore=compute_botscore,
+                botscore_scorer=self.botscore_scorer,
+                **kwargs,
+            )
+            for search in self.searches
+        }
+
+    def collect_tweets(self):
+        """
+        Collect tweets of all searches, at most n_workers searches are scraped at the same time
+        Memory is not traced while searches are collected: tracemalloc traces the whole process, so the peak of a
+        search would include memory allocated by the other searches (see StageMetrics), memory of the following stages
+        is traced as they run one search after the other
+        """
+        trace_memory = {search: NB.metrics.trace_memory for search, NB in self.graph_builders.items()}
+        for NB in self.graph_builders.values():
+            NB.metrics.trace_memory = False
+        try:
+            with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+                futures = [executor.submit(NB.collect_tweets) for NB in self.graph_builders.values()]
+                for future in futures:
+                    future.result()
+        finally:
+            for search, NB in self.graph_builders.items():
+                NB.metrics.trace_memory = trace_memory[search]
+        if self.botscore_scorer:
+            self.botscore_scorer.close()
+
+    def merged_graph_builder(self):
+        """
+        Returns a GraphBuilder with tweets collected by all searches (a tweet collected by several searches is kept
+        once), its search is the union of the searches
+        Only source tweets more recent than the last tweet collected by every search are kept when cleaning data, so
+        that all their RT and quotes have been collected whatever the search
+        """
+        builders = list(self.graph_builders.values())
+        NB = GraphBuilder(
+            search=" OR ".join(f"({search})" for search in self.searches),
+            since=self.since,
+            compute_botscore=self.compute_botscore,
+            botscore_scorer=self.botscore_scorer,
+            **self.kwargs,
+        )
+        for builder in builders:
+            NB.store.extend(builder.store.without_known_tweets(NB.store))
+        most_recent_tweets = [int(builder.most_recent_tweet) for builder in builders if builder.most_recent_tweet]
+        NB.most_recent_tweet = max(most_recent_tweets) if most_recent_tweets else ""
+        last_builders = [builder for builder in builders if builder.last_collected_date]
+        if last_builders:
+            last_builder = max(last_builders, key=lambda builder: str(builder.last_collected_date))
+            NB.last_collected_tweet = last_builder.last_collected_tweet
+            NB.last_collected_date = last_builder.last_collected_date
+        NB.data_collection_date = min(builder.data_collection_date for builder in builders)
+        NB.n_valid_tweet = len(NB.store)
+        # n_analysed_tweets of a builder is the index of its last analysed tweet, not a number of tweets
+        NB.n_analysed_tweets = max(
+            sum(builder.n_analysed_tweets + 1 for builder in builders if builder.most_recent_tweet != "") - 1, 0
+        )
+        NB.data_collected = True
+        NB.status = "DONE"
+        return NB
+
+    def graph_paths(self, path):
+        """
+        Returns dictionnary of the paths where to export the graph of each search, the search is added to path (e.g.
+        output.json becomes output_hashtag.json for search "#hashtag")
+        """
+        root, extension = os.path.splitext(path)
+        paths = {}
+        for search in self.searches:
+            name = re.sub(r"[^0-9A-Za-z_-]+", "_", search).strip("_") or "search"
+            search_path = f"{root}_{name}{extension}"
+            i = 1
+            while search_path in paths.values():
+                i += 1
+                search_path = f"{root}_{name}_{i}{extension}"
+            paths[search] = search_path
+        return paths
+
+    def build_graphs(self, layout_algo, community_algo, json_path, img_path="no_img_file", start=None, metrics_path=None):
+        """
+        Clean data, create graphs, find communities and export graphs, either one graph per search (search is added
+        to json_path and img_path, see graph_paths()) or the merged graph
+            Parameters:
+                layout_algo (str): layout algorithm (see GraphBuilder.create_graph())
+                community_algo (str): community algorithm (see GraphBuilder.find_communities())
+                json_path (str): path where to export the json
+                img_path (str): path where to export graph png file, "no_img_file" to export no image
+                start (datetime): start of the program, used to compute execution time
+                metrics_path (str): path where to export metrics of the stages of each graph (search is added to the
+                path as for json_path), if None metrics are not exported
+        """
+        start = start or datetime.now()
+        if self.merge:
+            graphs = [(self.merged_graph_builder(), json_path, img_path, metrics_path)]
+        else:
+            json_paths = self.graph_paths(json_path)
+            img_paths = self.graph_paths(img_path)
+            metrics_paths = self.graph_paths(metrics_path) if metrics_path else {}
+            graphs = [
+                (NB, json_paths[search], img_paths[search], metrics_paths.get(search))
+                for search, NB in self.graph_builders.items()
+            ]
+        for NB, graph_json_path, graph_img_path, graph_metrics_path in graphs:
+            NB.clean_nodes_edges({})
+            NB.create_graph(layout_algo)
+            NB.find_communities(community_algo)
+            if img_path != "no_img_file":
+                NB.export_img_graph(graph_img_path, background=True)
+            NB.export_json_output(graph_json_path, datetime.now() - start)
+            NB.wait_img_export()
+            NB.export_metrics(graph_metrics_path)
+            print(f"Graph of {NB.search} exported, time of execution is:", datetime.now() - start)
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+class SparseGraph:
+    """
+    Class to store an undirected weighted graph of accounts with dense integer ids: accounts are numbered once (in
+    order of first appearance in edges, which is the order of nodes of networkx graphs built from edges) and edges
+    are stored in arrays of ids, the weighted adjacency is a scipy CSR matrix
+    Positions and communities of nodes are arrays following the order of ids, the networkx graph is only built when an
+    algorithm needs it
+    """
+
+    def __init__(self, sources, targets, weights, weight="weight"):
+        """
+        Init function of class SparseGraph
+            Parameters:
+                sources (array): source accounts of edges
+                targets (array): target accounts of edges
+                weights (array): weights of edges, when an edge appears several times (in any direction) the weight
+                of its last occurrence is kept, as in networkx
+                weight (str): name of the weight attribute of edges
+        """
+        codes, self.nodes = pd.factorize(np.column_stack([np.asarray(sources), np.asarray(targets)]).ravel())
+        self.nodes = np.asarray(self.nodes, dtype=object)
+        self.sources = codes[0::2]
+        self.targets = codes[1::2]
+        self.weights = np.asarray(weights)
+        self.weight = weight
+        self.adjacencies = {}
+        self.nx_graph = None
+
+    def __len__(self):
+        """
+        Number of nodes
+        """
+        return len(self.nodes)
+
+    def number_of_nodes(self):
+        """
+        Number of nodes
+        """
+        return len(self.nodes)
+
+    def index(self, nodes):
+        """
+        Returns array of the ids of nodes, -1 for nodes which are not in the graph
+        """
+        return pd.Index(self.nodes).get_indexer(nodes)
+
+    def unique_edges(self):
+        """
+        Returns ids of the sources and targets and weights of the edges, an edge appearing several times (in any
+        direction) is returned once with the weight of its last occurrence
+        """
+        low = np.minimum(self.sources, self.targets)
+        high = np.maximum(self.sources, self.targets)
+        keys = low.astype(np.int64) * len(self.nodes) + high
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = np.sort(len(keys) - 1 - last)
+        return self.sources[last], self.targets[last], self.weights[last]
+
+    def neighbours(self):
+        """
+        Returns neighbours of each node in CSR format (indptr and indices arrays), neighbours of a node follow the order
+        in which its edges first appear, which is the order of neighbours in networkx
+        """
+        low = np.minimum(self.sources, self.targets)
+        high = np.maximum(self.sources, self.targets)
+        _, first = np.unique(low.astype(np.int64) * len(self.nodes) + high, return_index=True)
+        first = np.sort(first)
+        sources, targets = self.sources[first], self.targets[first]
+        not_loop = sources != targets
+        rows = np.concatenate([sources, targets[not_loop]])
+        indices = np.concatenate([targets, sources[not_loop]])
+        positions = np.concatenate([np.arange(len(first)), np.flatnonzero(not_loop)])
+        order = np.lexsort((positions, rows))
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(self.nodes)))])
+        return indptr, indices[order]
+
+    def named_edges(self):
+        """
+        Returns iterable of the edges (source, target, weight) with node names, see unique_edges()
+        """
+        sources, targets, weights = self.unique_edges()
+        return zip(self.nodes[sources].tolist(), self.nodes[targets].tolist(), weights.tolist())
+
+    def adjacency(self, weight=None):
+        """
+        Returns symmetric adjacency matrix (scipy CSR matrix), rows follow the ids of nodes and self loops are dropped,
+        edges have a weight of 1 if weight is not the weight attribute of the graph (as edges without this attribute in
+        networkx)
+        """
+        weight = weight or self.weight
+        if weight not in self.adjacencies:
+            sources, targets, weights = self.unique_edges()
+            weights = weights.astype(float) if weight == self.weight else np.ones(len(weights))
+            not_loop = sources != targets
+            sources, targets, weights = sources[not_loop], targets[not_loop], weights[not_loop]
+            n = len(self.nodes)
+            A = sp.coo_matrix(
+                (np.concatenate([weights, weights]), (np.concatenate([sources, targets]), np.concatenate([targets, sources]))),
+                shape=(n, n),
+            ).tocsr()
+            A.sum_duplicates()
+            self.adjacencies[weight] = A
+        return self.adjacencies[weight]
+
+    def to_networkx(self):
+        """
+        Returns the graph in networkx format, it is built once, with the same order of nodes and edges as
+        networkx.from_pandas_edgelist()
+        """
+        if self.nx_graph is None:
+            import networkx as nx
+
+            G = nx.Graph()
+            G.add_nodes_from(self.nodes.tolist())
+            G.add_weighted_edges_from(
+                zip(self.nodes[self.sources].tolist(), self.nodes[self.targets].tolist(), self.weights.tolist()),
+                weight=self.weight,
+            )
+            self.nx_graph = G
+        return self.nx_graph
+
+    def to_dict(self, values):
+        """
+        Returns dictionnary with nodes as keys and values (array following the ids of nodes) as values
+        """
+        return dict(zip(self.nodes.tolist(), values))
+
+    def from_dict(self, values):
+        """
+        Returns array of the values of a dictionnary with nodes as keys, following the ids of nodes
+        """
+        return np.array([values[node] for node in self.nodes.tolist()])
@@ -0,0 +1,196 @@
+from contextlib import contextmanager
+import cProfile
+import functools
+import json
+import sys
+import time
+import tracemalloc
+
+from graphgenerator.utils.graph_files import replace_file
+
+# resource is only available on unix systems, peak RSS is then not measured
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class StageMetrics:
+    """
+    Class to measure stages of a graph builder (data collection, cleaning, layout, communities, exports): for each run
+    of a stage, a record with its wall time, CPU time, peak RSS of the process and counts of the stage (tweets, nodes,
+    edges...) is saved
+    cpu_time is the CPU time of the whole process during the stage (it includes threads and other stages running at the
+    same time), thread_cpu_time is the CPU time of the thread running the stage (it excludes threads started by the
+    stage, e.g. the scraping pipeline or the layout threads)
+    Peak of memory traced by tracemalloc during the stage is also saved if trace_memory is True (it slows the program
+    down) and stages can be profiled with cProfile if profile_path is set
+    tracemalloc traces the whole process: the peak of a stage includes memory allocated by all threads during the
+    stage, so memory of stages of graph builders running at the same time in threads is not isolated (memory is not
+    traced while MultiSearchBuilder collects searches)
+    Stages run inside another stage (e.g. batches saved during the data collection) are recorded with a depth of 1,
+    their wall time is added to the inner_time of the outer stage, stages run in a background thread (see
+    measure_background()) are recorded once they end
+    """
+
+    def __init__(self, trace_memory=False, profile_path=None):
+        """
+        Init function of class StageMetrics
+            Parameters:
+                trace_memory (bool): should the peak of memory allocated by python during each stage be measured with
+                tracemalloc
+                profile_path (str): path where to save cProfile statistics of stages (see dump_profile()), if None
+                stages are not profiled
+        """
+        self.trace_memory = trace_memory
+        self.profile_path = profile_path
+        self.profile = cProfile.Profile() if profile_path else None
+        self.stages = []
+        self.running = []
+        self.start = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def memory_peak(self):
+        """
+        Returns the peak of memory traced since the last reset and resets it, None if memory is not traced
+        """
+        if not (self.trace_memory and tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak")):
+            return None
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        return peak
+
+    @contextmanager
+    def measure(self, stage):
+        """
+        Measure a run of stage, yield the record of the run to which counts of the stage can be added
+        """
+        record = {
+            "stage": stage,
+            "depth": len(self.running),
+            "start": time.perf_counter() - self.start,
+        }
+        self.stages.append(record)
+        # the peak of the running stage is saved before it is reset for the new stage
+        peak = self.memory_peak()
+        if self.running and peak is not None:
+            self.running[-1]["memory_peak"] = max(self.running[-1].get("memory_peak") or 0, peak)
+        self.running.append(record)
+        if self.profile and record["depth"] == 0:
+            self.profile.enable()
+        wall_time = time.perf_counter()
+        cpu_time = time.process_time()
+        thread_cpu_time = time.thread_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - wall_time
+            record["cpu_time"] = time.process_time() - cpu_time
+            record["thread_cpu_time"] = time.thread_time() - thread_cpu_time
+            if self.profile and record["depth"] == 0:
+                self.profile.disable()
+            self.running.pop()
+            if self.running:
+                self.running[-1]["inner_time"] = self.running[-1].get("inner_time", 0) + record["wall_time"]
+            peak = self.memory_peak()
+            if peak is not None:
+                record["memory_peak"] = max(record.get("memory_peak") or 0, peak)
+                if self.running:
+                    self.running[-1]["memory_peak"] = max(self.running[-1].get("memory_peak") or 0, peak)
+            else:
+                record["memory_peak"] = None
+            record["max_rss"] = max_rss()
+
+    @contextmanager
+    def measure_background(self, stage):
+        """
+        Measure a run of stage in a background thread, yield the record of the run to which counts of the stage can be
+        added
+        Other stages run at the same time: memory is not traced (memory_peak is None) and the record is only added to
+        the stages once the run ends
+        """
+        record = {
+            "stage": stage,
+            "depth": 0,
+            "background": True,
+            "start": time.perf_counter() - self.start,
+        }
+        wall_time = time.perf_counter()
+        cpu_time = time.process_time()
+        thread_cpu_time = time.thread_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - wall_time
+            record["cpu_time"] = time.process_time() - cpu_time
+            record["thread_cpu_time"] = time.thread_time() - thread_cpu_time
+            record["memory_peak"] = None
+            record["max_rss"] = max_rss()
+            self.stages.append(record)
+
+    def to_dict(self):
+        """
+        Returns metrics in dictionnary format: records of the ended runs of stages in the order they started, and wall
+        time spent in each stage (runs of stages inside other stages are not added to the total)
+        """
+        records = sorted(
+            (dict(record) for record in list(self.stages) if "wall_time" in record), key=lambda record: record["start"]
+        )
+        totals = {}
+        for record in records:
+            if record["depth"] == 0:
+                totals[record["stage"]] = totals.get(record["stage"], 0) + record["wall_time"]
+        return {
+            "stages": records,
+            "wall_time": totals,
+            "max_rss": max_rss(),
+        }
+
+    def write(self, path):
+        """
+        Write metrics (see to_dict()) in a json file
+        """
+
+        def write_metrics(temporary_path):
+            with open(temporary_path, "w") as file:
+                json.dump(self.to_dict(), file, indent=4, default=str)
+
+        replace_file(path, write_metrics)
+
+    def dump_profile(self):
+        """
+        Save cProfile statistics of stages in profile_path (they can be read with pstats or snakeviz)
+        """
+        if self.profile:
+            self.profile.dump_stats(self.profile_path)
+
+
+def max_rss():
+    """
+    Returns peak resident set size of the process in bytes, None if it can't be measured
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on linux and in bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measured_stage(stage):
+    """
+    Decorator of a GraphBuilder method measuring its runs as stage (see StageMetrics), counts of the stage returned by
+    the stage_counts() method of the graph builder are added to the record of each run once it is measured
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.measure(stage) as record:
+                result = method(self, *args, **kwargs)
+            record.update(self.stage_counts(stage, record))
+            return result
+
+        return wrapper
+
+    return decorator
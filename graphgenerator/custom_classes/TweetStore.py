@@ -0,0 +1,331 @@
+from array import array
+import numpy as np
+import pandas as pd
+
+from graphgenerator.config import column_names
+
+
+class TweetStore:
+    """
+    Class to store information extracted from collected tweets in a columnar way, rather than a dictionnary per tweet
+    Usernames are stored only once (each row keeps the index of the username), tweet ids and counts are stored in
+    typed arrays, and ids of source tweets already stored are kept in a set
+    Two tables are stored:
+    - interactions: one row per RT or quote, it feeds the edges and the nodes of accounts retweeting or quoting
+    - originals: one row per source tweet (tweet which has been retweeted or quoted)
+    """
+
+    def __init__(self):
+        """
+        Init function of class TweetStore
+        """
+        self.usernames = []
+        self.usernames_index = {}
+        # interactions table
+        self.user = array("l")
+        self.source_user = array("l")
+        self.tweet_id = array("q")
+        self.source_tweet_id = array("q")
+        self.is_quote = array("b")
+        self.retweet_count = array("q")
+        self.url = []
+        self.date = []
+        self.source_date = []
+        # originals table
+        self.original_user = array("l")
+        self.original_tweet_id = array("q")
+        self.original_retweet_count = array("q")
+        self.original_url = []
+        self.original_date = []
+        self.original_ids = set()
+
+    def __len__(self):
+        """
+        Number of interactions (RT and quotes) stored
+        """
+        return len(self.tweet_id)
+
+    def username_index(self, username):
+        """
+        Returns index of username in the list of usernames, username is added to the list if it is new
+        """
+        index = self.usernames_index.get(username)
+        if index is None:
+            index = len(self.usernames)
+            self.usernames_index[username] = index
+            self.usernames.append(username)
+        return index
+
+    def add_interaction(self, tweet, source_tweet, is_quote):
+        """
+        Store a RT or a quote
+            Parameters:
+                tweet (dict): tweet retweeting or quoting source_tweet
+                source_tweet (dict): tweet which has been retweeted or quoted
+                is_quote (bool): is tweet a quote (otherwise it is a RT)
+        """
+        self.user.append(self.username_index(tweet["user"]["username"]))
+        self.source_user.append(self.username_index(source_tweet["user"]["username"]))
+        self.tweet_id.append(int(tweet["id"]))
+        self.source_tweet_id.append(int(source_tweet["id"]))
+        self.is_quote.append(is_quote)
+        self.retweet_count.append(tweet["retweetCount"] if is_quote else 0)
+        self.url.append(tweet["url"])
+        self.date.append(str(tweet["date"]))
+        self.source_date.append(source_tweet["date"])
+
+    def has_original(self, tweet_id):
+        """
+        Returns True if the source tweet tweet_id has already been stored
+        """
+        return int(tweet_id) in self.original_ids
+
+    def add_original(self, tweet, source_tweet):
+        """
+        Store a source tweet (tweet which has been retweeted or quoted)
+            Parameters:
+                tweet (dict): tweet retweeting or quoting source_tweet
+                source_tweet (dict): tweet which has been retweeted or quoted
+        """
+        self.original_ids.add(int(source_tweet["id"]))
+        self.original_user.append(self.username_index(source_tweet["user"]["username"]))
+        self.original_tweet_id.append(int(source_tweet["id"]))
+        self.original_retweet_count.append(tweet["retweetCount"])
+        self.original_url.append(source_tweet["url"])
+        self.original_date.append(source_tweet["date"])
+
+    def extend(self, other):
+        """
+        Append rows of another tweet store (filled with tweets collected after the ones of this store), username
+        indexes are remapped and source tweets already stored are skipped, so that the result is the same as if all
+        tweets had been added to this store
+        """
+        codes = array("l", [self.username_index(username) for username in other.usernames])
+        self.user.extend(array("l", [codes[code] for code in other.user]))
+        self.source_user.extend(array("l", [codes[code] for code in other.source_user]))
+        self.tweet_id.extend(other.tweet_id)
+        self.source_tweet_id.extend(other.source_tweet_id)
+        self.is_quote.extend(other.is_quote)
+        self.retweet_count.extend(other.retweet_count)
+        self.url.extend(other.url)
+        self.date.extend(other.date)
+        self.source_date.extend(other.source_date)
+        for row, tweet_id in enumerate(other.original_tweet_id):
+            if tweet_id not in self.original_ids:
+                self.original_ids.add(tweet_id)
+                self.original_user.append(codes[other.original_user[row]])
+                self.original_tweet_id.append(tweet_id)
+                self.original_retweet_count.append(other.original_retweet_count[row])
+                self.original_url.append(other.original_url[row])
+                self.original_date.append(other.original_date[row])
+
+    def clear(self):
+        """
+        Remove all rows of the store (e.g. once they are spilled to a checkpoint), ids of source tweets already stored
+        are kept so that a source tweet is not stored again by later tweets
+        """
+        original_ids = self.original_ids
+        self.__init__()
+        self.original_ids = original_ids
+
+    def to_arrays(self):
+        """
+        Returns the content of the store in compact arrays, used to spill the store to a checkpoint (see
+        CollectionCheckpoint): numeric columns are numpy arrays and dates of source tweets are stored once per source
+        tweet (rows refer to them by index) instead of once per RT or quote
+        """
+        source_ids, first_rows, sources = np.unique(
+            np.array(self.source_tweet_id, dtype=np.int64), return_index=True, return_inverse=True
+        )
+        return {
+            "usernames": self.usernames,
+            "user": np.array(self.user, dtype=np.int32),
+            "source_user": np.array(self.source_user, dtype=np.int32),
+            "tweet_id": np.array(self.tweet_id, dtype=np.int64),
+            "source_tweet_id": source_ids,
+            "source": sources.astype(np.int32),
+            "source_date": [self.source_date[row] for row in first_rows.tolist()],
+            "is_quote": np.array(self.is_quote, dtype=np.int8),
+            "retweet_count": np.array(self.retweet_count, dtype=np.int64),
+            "url": self.url,
+            "date": self.date,
+            "original_user": np.array(self.original_user, dtype=np.int32),
+            "original_tweet_id": np.array(self.original_tweet_id, dtype=np.int64),
+            "original_retweet_count": np.array(self.original_retweet_count, dtype=np.int64),
+            "original_url": self.original_url,
+            "original_date": self.original_date,
+        }
+
+    def extend_arrays(self, arrays):
+        """
+        Append rows of a store in compact arrays (see to_arrays(), numeric columns can also be lists, as read back
+        from a checkpoint), the result is the same as with extend() but columns are appended at once rather than row
+        by row
+        """
+        arrays = dict(
+            arrays,
+            **{
+                column: np.asarray(arrays[column], dtype=np.int64)
+                for column in [
+                    "user",
+                    "source_user",
+                    "tweet_id",
+                    "source_tweet_id",
+                    "source",
+                    "is_quote",
+                    "retweet_count",
+                    "original_user",
+                    "original_tweet_id",
+                    "original_retweet_count",
+                ]
+            },
+        )
+        codes = np.array([self.username_index(username) for username in arrays["usernames"]], dtype=np.int64)
+        self.user.frombytes(codes[arrays["user"]].astype(self.user.typecode).tobytes())
+        self.source_user.frombytes(codes[arrays["source_user"]].astype(self.source_user.typecode).tobytes())
+        self.tweet_id.frombytes(arrays["tweet_id"].astype(self.tweet_id.typecode).tobytes())
+        self.source_tweet_id.frombytes(
+            arrays["source_tweet_id"][arrays["source"]].astype(self.source_tweet_id.typecode).tobytes()
+        )
+        self.is_quote.frombytes(arrays["is_quote"].astype(self.is_quote.typecode).tobytes())
+        self.retweet_count.frombytes(arrays["retweet_count"].astype(self.retweet_count.typecode).tobytes())
+        self.url.extend(arrays["url"])
+        self.date.extend(arrays["date"])
+        self.source_date.extend(np.array(arrays["source_date"], dtype=object)[arrays["source"]].tolist())
+        # source tweets already stored are skipped
+        new = np.array(
+            [tweet_id not in self.original_ids for tweet_id in arrays["original_tweet_id"].tolist()], dtype=bool
+        )
+        rows = np.flatnonzero(new)
+        self.original_ids.update(arrays["original_tweet_id"][rows].tolist())
+        self.original_user.frombytes(codes[arrays["original_user"][rows]].astype(self.original_user.typecode).tobytes())
+        self.original_tweet_id.frombytes(
+            arrays["original_tweet_id"][rows].astype(self.original_tweet_id.typecode).tobytes()
+        )
+        self.original_retweet_count.frombytes(
+            arrays["original_retweet_count"][rows].astype(self.original_retweet_count.typecode).tobytes()
+        )
+        self.original_url.extend([arrays["original_url"][row] for row in rows.tolist()])
+        self.original_date.extend([arrays["original_date"][row] for row in rows.tolist()])
+
+    def without_known_tweets(self, other):
+        """
+        Returns a copy of this store without the RT and quotes which are already in store other (a tweet can be
+        collected by several searches), source tweets are all kept as they are skipped by extend() when already stored
+        """
+        known = set(other.tweet_id)
+        rows = [row for row, tweet_id in enumerate(self.tweet_id) if tweet_id not in known]
+        return self.take_interactions(rows, range(self.n_originals()))
+
+    def head(self, n):
+        """
+        Returns a copy of this store with only the n first RT and quotes stored and the source tweets they refer to, as
+        if collection had stopped after the n-th RT or quote
+        """
+        sources = set(self.source_tweet_id[:n])
+        rows = [row for row, tweet_id in enumerate(self.original_tweet_id) if tweet_id in sources]
+        return self.take_interactions(range(min(n, len(self))), rows)
+
+    def take_interactions(self, rows, original_rows):
+        """
+        Returns a store with rows of the interactions table and original_rows of the originals table of this store,
+        usernames are shared with this store
+        """
+        store = TweetStore()
+        store.usernames = self.usernames
+        store.usernames_index = self.usernames_index
+        store.user = array("l", [self.user[row] for row in rows])
+        store.source_user = array("l", [self.source_user[row] for row in rows])
+        store.tweet_id = array("q", [self.tweet_id[row] for row in rows])
+        store.source_tweet_id = array("q", [self.source_tweet_id[row] for row in rows])
+        store.is_quote = array("b", [self.is_quote[row] for row in rows])
+        store.retweet_count = array("q", [self.retweet_count[row] for row in rows])
+        store.url = [self.url[row] for row in rows]
+        store.date = [self.date[row] for row in rows]
+        store.source_date = [self.source_date[row] for row in rows]
+        store.original_user = array("l", [self.original_user[row] for row in original_rows])
+        store.original_tweet_id = array("q", [self.original_tweet_id[row] for row in original_rows])
+        store.original_retweet_count = array("q", [self.original_retweet_count[row] for row in original_rows])
+        store.original_url = [self.original_url[row] for row in original_rows]
+        store.original_date = [self.original_date[row] for row in original_rows]
+        store.original_ids = set(store.original_tweet_id)
+        return store
+
+    def take_usernames(self, codes, start, prefix=""):
+        """
+        Returns array of usernames from an array of username indexes, starting at row start
+        """
+        usernames = np.array([prefix + username for username in self.usernames], dtype=object)
+        return usernames[np.array(codes[start:], dtype=np.int64)]
+
+    @staticmethod
+    def take_ids(ids, start):
+        """
+        Returns array of tweet ids in string format from an array of tweet ids, starting at row start
+        """
+        return np.array(ids[start:], dtype=np.int64).astype(str).astype(object)
+
+    def edges_dataframe(self, start=0):
+        """
+        Returns dataframe of edges (one row per RT or quote) stored from row start
+        """
+        is_quote = np.array(self.is_quote[start:], dtype=bool)
+        url = np.array(self.url[start:], dtype=object)
+        return pd.DataFrame(
+            {
+                column_names.edge_source: self.take_usernames(self.user, start),
+                column_names.edge_target: self.take_usernames(self.source_user, start),
+                column_names.edge_source_date: self.source_date[start:],
+                column_names.edge_date: self.date[start:],
+                column_names.edge_tweet_id: self.take_ids(self.tweet_id, start),
+                column_names.edge_url_quoted: np.where(is_quote, url, ""),
+                column_names.edge_url_RT: np.where(is_quote, "", url),
+                column_names.edge_url_label: np.where(is_quote, "has quoted", "has RT").astype(object),
+                column_names.edge_type: "arrow",
+            }
+        )
+
+    def nodes_RT_quoted_dataframe(self, start=0):
+        """
+        Returns dataframe of nodes of accounts which have retweeted or quoted a tweet, stored from row start
+        """
+        is_quote = np.array(self.is_quote[start:], dtype=bool)
+        url = np.array(self.url[start:], dtype=object)
+        return pd.DataFrame(
+            {
+                column_names.node_id: self.take_usernames(self.user, start),
+                column_names.node_label: self.take_usernames(self.user, start, "@"),
+                column_names.node_url_quoted: np.where(is_quote, url, ""),
+                column_names.node_url_RT: np.where(is_quote, "", url),
+                column_names.node_url_tweet: "",
+                column_names.node_date: self.date[start:],
+                column_names.node_source_date: self.source_date[start:],
+                column_names.node_tweet_id: self.take_ids(self.tweet_id, start),
+                column_names.node_type_tweet: np.where(is_quote, "has quoted", "has RT").astype(object),
+                column_names.node_rt_count: np.array(self.retweet_count[start:], dtype=np.int64),
+            }
+        )
+
+    def nodes_original_dataframe(self, start=0):
+        """
+        Returns dataframe of nodes of accounts which have been retweeted or quoted, stored from row start
+        """
+        return pd.DataFrame(
+            {
+                column_names.node_id: self.take_usernames(self.original_user, start),
+                column_names.node_label: self.take_usernames(self.original_user, start, "@"),
+                column_names.node_url_tweet: self.original_url[start:],
+                column_names.node_url_quoted: "",
+                column_names.node_url_RT: "",
+                column_names.node_date: self.original_date[start:],
+                column_names.node_tweet_id: self.take_ids(self.original_tweet_id, start),
+                column_names.node_rt_count: np.array(self.original_retweet_count[start:], dtype=np.int64),
+                column_names.node_type_tweet: "original",
+            }
+        )
+
+    def n_originals(self):
+        """
+        Number of source tweets stored
+        """
+        return len(self.original_tweet_id)
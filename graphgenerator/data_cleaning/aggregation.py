@@ -0,0 +1,74 @@
+import gc
+from itertools import chain
+import numpy as np
+
+
+def aggregate_groups(df, keys, aggregations):
+    """
+    Group rows of df by keys and aggregate the other columns, the result is the same as
+    df.groupby(keys).agg(...).reset_index() but no python function is called per group: rows are given the code of
+    their group, sorted by code (keeping their order within a group) and columns are sliced at the group boundaries
+        Parameters:
+            df (pandas.DataFrame): rows to aggregate
+            keys (list): columns defining the groups, rows with a missing key are dropped (as with groupby)
+            aggregations (dict): aggregation of each column, either "list" (list of the values), "concat"
+            (concatenation of the lists of the values), "sum" or "first"
+    """
+    valid = np.logical_and.reduce([df[key].notna().to_numpy() for key in keys])
+    if not valid.all():
+        df = df[valid]
+    codes = df.groupby(keys).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+    first = np.r_[0, boundaries] if len(df) else np.array([], dtype=np.int64)
+    aggregated = df[keys].iloc[order[first]].reset_index(drop=True)
+    starts, ends = first.tolist(), boundaries.tolist() + [len(df)]
+    # garbage collection is disabled while lists are created, otherwise it runs again and again over all objects
+    # (lists are not cyclic so there is nothing to collect)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for column, aggregation in aggregations.items():
+            if aggregation in ["list", "concat"]:
+                # values are boxed as when iterating over a Series (e.g. python ints and Timestamps)
+                values = df[column].astype(object).to_numpy()[order].tolist()
+                if aggregation == "list":
+                    aggregated[column] = [values[start:end] for start, end in zip(starts, ends)]
+                else:
+                    aggregated[column] = [
+                        list(chain.from_iterable(values[start:end])) for start, end in zip(starts, ends)
+                    ]
+            elif aggregation == "sum":
+                aggregated[column] = np.add.reduceat(df[column].to_numpy()[order], first) if len(df) else 0
+            elif aggregation == "first":
+                aggregated[column] = df[column].to_numpy()[order][first]
+            else:
+                raise Exception(f"Unknown aggregation {aggregation}, it must be list, concat, sum or first")
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return aggregated
+
+
+def explode_groups(df, list_columns):
+    """
+    Transform groups aggregated by aggregate_groups() back into one row per value, the result is the same as
+    df.explode(list_columns) (lists of a row must have the same length, empty lists are dropped) with a new index
+        Parameters:
+            df (pandas.DataFrame): aggregated groups
+            list_columns (list): columns aggregated in lists
+    """
+    lengths = np.fromiter(map(len, df[list_columns[0]]), dtype=np.int64, count=len(df))
+    rows = np.repeat(np.arange(len(df)), lengths)
+    exploded = df.drop(columns=list_columns).iloc[rows].reset_index(drop=True)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for column in list_columns:
+            values = np.empty(len(rows), dtype=object)
+            values[:] = list(chain.from_iterable(df[column]))
+            exploded[column] = values
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return exploded[df.columns]
@@ -0,0 +1,132 @@
+import bisect
+import sys
+import numpy as np
+import pandas as pd
+from graphgenerator.config import column_names
+from graphgenerator.data_cleaning.edges import aggregate_edge_data
+from graphgenerator.data_cleaning.nodes import (
+    aggregate_node_data,
+    create_tweet_id_column,
+    drop_duplicated_nodes,
+)
+
+
+edges_list_columns = [
+    column_names.edge_date,
+    column_names.edge_tweet_id,
+    column_names.edge_url_quoted,
+    column_names.edge_url_RT,
+]
+
+aggregated_edges_columns = [
+    column_names.edge_source,
+    column_names.edge_target,
+    column_names.edge_type,
+    *edges_list_columns,
+    column_names.edge_size,
+    column_names.edge_url_label,
+]
+
+nodes_list_columns = [
+    column_names.node_url_tweet,
+    column_names.node_url_quoted,
+    column_names.node_url_RT,
+    column_names.node_date,
+    column_names.node_type_tweet,
+]
+
+aggregated_nodes_columns = [
+    column_names.node_id,
+    column_names.node_label,
+    column_names.node_botscore,
+    *nodes_list_columns,
+]
+
+
+def split_pending_rows(pending, dates, start, limit_date):
+    """
+    Returns rows of the tweet store to process in a batch (in the order of the store): rows added since the previous
+    batch whose date is after limit_date and pending rows whose date is now after limit_date
+    Rows whose date is before limit_date can't be used yet as all RT and quotes of their source tweet may not have
+    been collected, they are kept pending until a later batch: only their row and their date are kept, in a list of
+    (date, row) sorted by date, so that rows released by a batch are found without going through all pending rows
+        Parameters:
+            pending (list): pending rows of previous batches, sorted list of (date, row) modified in place
+            dates (list): dates of the rows added since the previous batch
+            start (int): row of the first date of dates
+            limit_date (str): date of the last collected tweet
+    """
+    # limit_date only decreases from one batch to the next, released rows are the most recent pending ones
+    n_pending = bisect.bisect_right(pending, (limit_date, sys.maxsize))
+    rows = sorted(row for _, row in pending[n_pending:])
+    del pending[n_pending:]
+    dates = np.array(dates, dtype=object)
+    new_rows = np.arange(start, start + len(dates))
+    valid = dates > limit_date if len(dates) else np.zeros(0, dtype=bool)
+    rows.extend(new_rows[valid].tolist())
+    if not valid.all():
+        pending.extend(zip(dates[~valid].tolist(), new_rows[~valid].tolist()))
+        pending.sort()
+    return rows
+
+
+def deaggregate_edges(edges):
+    """
+    Transform edges aggregated at the edge level back into one row per tweet, so that they can be aggregated again
+    with new rows (the label of each row is recreated from the urls)
+    """
+    edges = edges.explode(edges_list_columns)
+    edges[column_names.edge_size] = 1
+    edges[column_names.edge_url_label] = np.where(
+        edges[column_names.edge_url_quoted] != "", "has quoted", "has RT"
+    )
+    return edges
+
+
+def deaggregate_nodes(nodes):
+    """
+    Transform nodes aggregated at the user level back into one row per tweet, so that they can be aggregated again
+    with new rows (tweet id is recreated from the urls)
+    """
+    nodes = nodes.explode(nodes_list_columns)
+    return create_tweet_id_column(nodes)
+
+
+def fold_edges(edges_aggregated, new_edges):
+    """
+    Fold new edges (one row per tweet) into edges already aggregated at the edge level, only the edges connecting the
+    same accounts as the new ones are deaggregated and aggregated again
+    """
+    new_edges = new_edges.copy()
+    new_edges[column_names.edge_size] = 1
+    keys = [column_names.edge_source, column_names.edge_target, column_names.edge_type]
+    if edges_aggregated is None:
+        untouched = None
+    else:
+        touched = (
+            edges_aggregated.set_index(keys)
+            .index.isin(new_edges.set_index(keys).index)
+        )
+        untouched = edges_aggregated[~touched]
+        new_edges = pd.concat([deaggregate_edges(edges_aggregated[touched]), new_edges])
+    new_edges = new_edges.sort_values(column_names.edge_date, ascending=True)
+    edges = pd.concat([untouched, aggregate_edge_data(new_edges)])
+    return edges.sort_values(keys).reset_index(drop=True)
+
+
+def fold_nodes(nodes_aggregated, new_nodes):
+    """
+    Fold new nodes (one row per tweet) into nodes already aggregated at the user level, only the accounts appearing
+    in the new rows are deaggregated and aggregated again (duplicated tweets are dropped as in concat_clean_nodes)
+    """
+    if nodes_aggregated is None:
+        untouched = None
+    else:
+        touched = nodes_aggregated[column_names.node_id].isin(new_nodes[column_names.node_id])
+        untouched = nodes_aggregated[~touched]
+        new_nodes = pd.concat([new_nodes, deaggregate_nodes(nodes_aggregated[touched])])
+    new_nodes = drop_duplicated_nodes(new_nodes)
+    nodes = pd.concat([untouched, aggregate_node_data(new_nodes)])
+    return nodes.sort_values(
+        [column_names.node_id, column_names.node_label, column_names.node_botscore]
+    ).reset_index(drop=True)
@@ -1,49 +1,38 @@
+from itertools import chain
+import json
 import pandas as pd
 from graphgenerator.config import column_names
 from graphgenerator.config.config_export import (
+    batch_edges_columns_export,
+    batch_nodes_columns_export,
+    batch_nodes_columns_metadata,
     nodes_columns_metadata,
     edges_columns_metadata,
     edges_columns_export,
     nodes_columns_export,
 )
+from graphgenerator.data_cleaning.aggregation import aggregate_groups
+from graphgenerator.utils.graph_files import replace_file, write_parquet_graph
 
 
 def merge_positions2nodes(position, nodes, dim):
     """
-    Merge positions data calculated thanks to layout algo in GraphBuilder to node dataframe
-    """
-    columns_mapping = {
-                    0: column_names.node_pos_x,
-                    1: column_names.node_pos_y,
-                    "index": column_names.node_id,
-                }
-    if dim == 3:
-        columns_mapping[2] = column_names.node_pos_z
-    position_df = (
-        pd.DataFrame(position)
-        .T.reset_index()
-        .rename(
-            columns=columns_mapping
-        )
-    )
-    nodes = nodes.merge(position_df, how="right", on=column_names.node_id)
-    nodes[column_names.node_pos_y] = nodes[column_names.node_pos_y] #*800/2
-    nodes[column_names.node_pos_x] = nodes[column_names.node_pos_x] #*800/2
-    return nodes
+    Merge positions data calculated thanks to layout algo in GraphBuilder to node dataframe, nodes follow the order of
+    position (dataframe with node ids as index and one column per axis), a node id can appear in several rows of nodes
+    (e.g. with several botscores), all of them are kept
+    """
+    axes = [column_names.node_pos_x, column_names.node_pos_y, column_names.node_pos_z][:dim]
+    position_df = pd.DataFrame(position.to_numpy()[:, :dim], columns=axes)
+    position_df.insert(0, column_names.node_id, position.index.to_numpy())
+    return nodes.merge(position_df, how="right", on=column_names.node_id)
 
 
 def merge_communities2nodes(communities, nodes):
     """
     Merge communities data calculated thanks to community detection algo in Graphbuilder to node dataframe
+    (communities is a series with node ids as index)
     """
-    communities_df = (
-        pd.DataFrame([communities])
-        .T.reset_index()
-        .rename(
-            columns={"index": column_names.node_id, 0: column_names.nodes_community}
-        )
-    )
-    nodes = nodes.merge(communities_df, how="left", on=column_names.node_id)
+    nodes[column_names.nodes_community] = nodes[column_names.node_id].map(communities)
     return nodes
 
 
@@ -54,13 +43,10 @@ def merge_edges_size_date2nodes(edges, nodes):
     hidden and not returned in search function)
     It also aggregates all RT and quotes dates of an account to facilitate the creation of the graph (dates are sorted)
     """
-    nodes_size_date = (
-        edges[
-            [column_names.edge_target, column_names.edge_size, column_names.edge_date]
-        ]
-        .groupby(column_names.edge_target)
-        .agg({column_names.edge_size: "sum", column_names.edge_date: "sum"})
-        .reset_index()
+    nodes_size_date = aggregate_groups(
+        edges,
+        [column_names.edge_target],
+        {column_names.edge_size: "sum", column_names.edge_date: "concat"},
     )
     nodes_size_date = nodes_size_date.rename(
         columns={column_names.edge_date: column_names.node_edge_date}
@@ -72,29 +58,171 @@ def merge_edges_size_date2nodes(edges, nodes):
         right_on=column_names.edge_target,
     )
     nodes[column_names.node_size] = nodes[column_names.node_size].fillna(0)
-    nodes[column_names.node_edge_date] = nodes[column_names.node_edge_date].apply(
-        lambda d: sorted(d) if isinstance(d, list) else []
-    )
+    nodes[column_names.node_edge_date] = [
+        sorted(d) if isinstance(d, list) else [] for d in nodes[column_names.node_edge_date]
+    ]
     return nodes
 
 
-def create_json_output(nodes, edges, position, communities, dim):
+def dataframe2records(df, columns):
     """
-    Create a json output with nodes and edges, merge positions and communities information at the user level
+    Returns list of dictionnaries (one per row of df) containing values of columns, it is built column by column
+    rather than row by row as with DataFrame.apply or DataFrame.to_dict
+    """
+    return [dict(zip(columns, values)) for values in zip(*[df[column].tolist() for column in columns])]
+
+
+def merge_nodes_data(nodes, edges, position, communities, dim):
+    """
+    Merge positions, communities and size and dates of edges to node dataframe
     """
-    # merge nodes with other datasets
     nodes = merge_positions2nodes(position, nodes, dim)
     nodes = merge_communities2nodes(communities, nodes)
     nodes = merge_edges_size_date2nodes(edges, nodes)
-    # create metadata field in nodes en edges dataframes
-    nodes[column_names.node_metadata] = nodes.apply(
-        lambda x: {col: x[col] for col in nodes_columns_metadata}, axis=1
-    )
-    edges[column_names.edge_metadata] = edges.apply(
-        lambda x: {col: x[col] for col in edges_columns_metadata}, axis=1
-    )
+    return nodes
+
+
+def iter_records(df, columns, metadata_column, metadata_columns, chunk_size=10000):
+    """
+    Yield records of df (lists of dictionnaries) by chunks of chunk_size rows, the metadata field of each record is
+    built from metadata_columns
+    """
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        chunk = chunk.assign(**{metadata_column: dataframe2records(chunk, metadata_columns)})
+        yield dataframe2records(chunk, columns)
+
+
+def create_json_output(nodes, edges, position, communities, dim):
+    """
+    Create a json output with nodes and edges, merge positions and communities information at the user level
+    """
+    nodes = merge_nodes_data(nodes, edges, position, communities, dim)
     output = {
-        "edges": edges[edges_columns_export].to_dict("records"),
-        "nodes": nodes[nodes_columns_export[dim]].to_dict("records"),
+        "edges": list(
+            chain.from_iterable(
+                iter_records(edges, edges_columns_export, column_names.edge_metadata, edges_columns_metadata)
+            )
+        ),
+        "nodes": list(
+            chain.from_iterable(
+                iter_records(nodes, nodes_columns_export[dim], column_names.node_metadata, nodes_columns_metadata)
+            )
+        ),
     }
     return output
+
+
+def write_json_output(json_path, nodes, edges, position, communities, dim, metadata, chunk_size=10000):
+    """
+    Write json output with nodes, edges and metadata (same content as create_json_output() plus metadata) without
+    building it in memory: records are encoded and written by chunks
+    The json is first written to a temporary file which then replaces json_path (see replace_file()), so that
+    json_path is never half written
+        Parameters:
+            json_path (str): path where to export the json
+            nodes (pandas.DataFrame): nodes of the graph, if None the json has no nodes and no edges
+            edges (pandas.DataFrame): edges of the graph
+            position (pandas.DataFrame): positions of nodes (node ids as index, one column per axis)
+            communities (pandas.Series): communities of nodes (node ids as index, same order as position)
+            dim (int): dimension of the layout
+            metadata (dict): metadata of the graph
+            chunk_size (int): number of records encoded at once
+    """
+    if nodes is None:
+        sections = {"edges": [], "nodes": []}
+    else:
+        nodes = merge_nodes_data(nodes, edges, position, communities, dim)
+        sections = {
+            "edges": iter_records(
+                edges, edges_columns_export, column_names.edge_metadata, edges_columns_metadata, chunk_size
+            ),
+            "nodes": iter_records(
+                nodes, nodes_columns_export[dim], column_names.node_metadata, nodes_columns_metadata, chunk_size
+            ),
+        }
+
+    def write(temporary_path):
+        with open(temporary_path, "w") as outfile:
+            # separators are the ones of json.dump so that the file is the same as json.dump(output)
+            outfile.write("{")
+            for key, chunks in sections.items():
+                outfile.write(json.dumps(key) + ": [")
+                first_chunk = True
+                for records in chunks:
+                    if records:
+                        if not first_chunk:
+                            outfile.write(", ")
+                        outfile.write(json.dumps(records)[1:-1])
+                        first_chunk = False
+                outfile.write("], ")
+            outfile.write('"metadata": ' + json.dumps(metadata) + "}")
+
+    replace_file(json_path, write)
+
+
+def write_batch_delta(path, nodes, edges, metadata, append=True):
+    """
+    Append the delta of an incremental batch to path as a line of json: accounts and edges changed by the batch (rows
+    replacing the previous rows with the same account, or with the same source, target and type), with the metadata
+    of the graph at the batch
+    Columns which depend on the whole graph are not in the delta (see batch_edges_columns_export), they are computed
+    when the graph is exported at the end of the collection
+        Parameters:
+            path (str): path of the file of deltas (see batch_delta_path())
+            nodes (pandas.DataFrame): accounts changed by the batch, aggregated at the user level
+            edges (pandas.DataFrame): edges changed by the batch, aggregated at the edge level
+            metadata (dict): metadata of the graph
+            append (bool): should the delta be appended to path, otherwise path is replaced
+    """
+    delta = {
+        "edges": list(
+            chain.from_iterable(
+                iter_records(edges, batch_edges_columns_export, column_names.edge_metadata, edges_columns_metadata)
+            )
+        ),
+        "nodes": list(
+            chain.from_iterable(
+                iter_records(
+                    nodes, batch_nodes_columns_export, column_names.node_metadata, batch_nodes_columns_metadata
+                )
+            )
+        ),
+        "metadata": metadata,
+    }
+    with open(path, "a" if append else "w") as outfile:
+        outfile.write(json.dumps(delta) + "\n")
+
+
+def flat_columns(columns, metadata_column, metadata_columns):
+    """
+    Returns export columns where the metadata column is replaced by the columns it contains
+    """
+    flat = []
+    for column in columns:
+        flat += metadata_columns if column == metadata_column else [column]
+    return flat
+
+
+def write_parquet_output(path, nodes, edges, position, communities, dim, metadata):
+    """
+    Write output in parquet format (see write_parquet_graph()) with the same nodes, edges and metadata as
+    write_json_output(), fields of metadata of nodes and edges are columns
+        Parameters:
+            path (str): path of the directory where to export the graph
+            nodes (pandas.DataFrame): nodes of the graph, if None the graph has no nodes and no edges
+            edges (pandas.DataFrame): edges of the graph
+            position (pandas.DataFrame): positions of nodes (node ids as index, one column per axis)
+            communities (pandas.Series): communities of nodes (node ids as index, same order as position)
+            dim (int): dimension of the layout
+            metadata (dict): metadata of the graph
+    """
+    nodes_columns = flat_columns(nodes_columns_export[dim], column_names.node_metadata, nodes_columns_metadata)
+    edges_columns = flat_columns(edges_columns_export, column_names.edge_metadata, edges_columns_metadata)
+    if nodes is None:
+        nodes = pd.DataFrame(columns=nodes_columns)
+        edges = pd.DataFrame(columns=edges_columns)
+    else:
+        nodes = merge_nodes_data(nodes, edges, position, communities, dim)[nodes_columns]
+        edges = edges[edges_columns]
+    write_parquet_graph(path, nodes, edges, metadata)
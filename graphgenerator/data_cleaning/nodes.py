@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 from graphgenerator.config import column_names
+from graphgenerator.data_cleaning.aggregation import aggregate_groups
+from graphgenerator.utils.graph_files import input_graph_column, input_graph_table
 
 
 def clean_nodes_RT_quoted(nodes_RT_list, limit_date):
@@ -47,22 +50,20 @@ def aggregate_node_data(nodes):
     will then be available in the metadata field)
     """
     nodes = nodes.sort_values(column_names.node_date, ascending=True)
-    nodes = (
-        nodes.groupby([column_names.node_id, column_names.node_label, column_names.node_botscore])
-        .agg(
-            {
-                col: lambda x: list(x)
-                for col in [
-                    column_names.node_url_tweet,
-                    column_names.node_url_quoted,
-                    column_names.node_url_RT,
-                    column_names.node_date,
-                    # column_names.node_rt_count,
-                    column_names.node_type_tweet,
-                ]
-            }
-        )
-        .reset_index()
+    nodes = aggregate_groups(
+        nodes,
+        [column_names.node_id, column_names.node_label, column_names.node_botscore],
+        {
+            col: "list"
+            for col in [
+                column_names.node_url_tweet,
+                column_names.node_url_quoted,
+                column_names.node_url_RT,
+                column_names.node_date,
+                # column_names.node_rt_count,
+                column_names.node_type_tweet,
+            ]
+        },
     )
     return nodes
 
@@ -77,7 +78,7 @@ def create_tweet_id_column(old_nodes):
         column_names.node_url_quoted,
         column_names.node_url_RT,
     ]:
-        old_nodes[col] = old_nodes[col].apply(lambda x: x if len(x) else float("nan"))
+        old_nodes[col] = old_nodes[col].where(old_nodes[col].str.len() > 0)
     old_nodes[column_names.node_tweet_id] = (
         old_nodes["tweets"]
         .fillna(old_nodes["quoted"])
@@ -109,35 +110,30 @@ def deaggraggate_node_dataframe(old_nodes):
     """
     Nodes dataframe needs to be deaggragted as data are aggregate in lists at the user level
     In order to be reaggregated with the new data, it must be deaggragated
-    To ensure that elements are aggregated in the right order at the user level (make sur that dates are ordered)
-    To do so, intermediate table ist created for each column, it is deaggregated and merged with the user information
+    Lists are exploded together (element i of each list belongs to the same tweet), if lists of a user do not have
+    the same length they are cut to the shortest one, rows are ordered by position in the lists and then by user
     Recreate column from based on list urls columns
     """
-    old_nodes_deag = old_nodes[[column_names.node_label, column_names.node_id, column_names.node_botscore]].copy()
-    i = 1
-    for col in [
+    list_columns = [
         column_names.node_date,
         column_names.node_url_tweet,
         column_names.node_url_quoted,
         column_names.node_url_RT,
-    ]:
-        temp_data = (
-            old_nodes[col]
-            .apply(pd.Series)
-            .merge(
-                old_nodes[[column_names.node_label]], left_index=True, right_index=True
-            )
-            .melt(id_vars=[column_names.node_label], value_name=col)
-        )
-        if i == 1:
-            old_nodes_deag = old_nodes_deag.merge(
-                temp_data, how="right", on=column_names.node_label
-            )
-        else:
-            old_nodes_deag = old_nodes_deag.merge(
-                temp_data, how="right", on=[column_names.node_label, "variable"]
-            )
-        i += 1
+    ]
+    old_nodes_deag = old_nodes[
+        [column_names.node_label, column_names.node_id, column_names.node_botscore] + list_columns
+    ].reset_index(drop=True)
+    lengths = np.min([old_nodes_deag[col].str.len().fillna(0) for col in list_columns], axis=0).astype(int)
+    for col in list_columns:
+        col_lengths = old_nodes_deag[col].str.len()
+        if col_lengths.isna().any() or (col_lengths != lengths).any():
+            old_nodes_deag[col] = [
+                values[:length] if isinstance(values, list) else []
+                for values, length in zip(old_nodes_deag[col], lengths)
+            ]
+    old_nodes_deag = old_nodes_deag.explode(list_columns)
+    old_nodes_deag["variable"] = old_nodes_deag.groupby(level=0).cumcount()
+    old_nodes_deag = old_nodes_deag.sort_values("variable", kind="mergesort").reset_index(drop=True)
     old_nodes_deag = old_nodes_deag.dropna(how="any")
 
     old_nodes_deag = create_from_column(old_nodes_deag)
@@ -151,15 +147,55 @@ def input_graph_json2node_df(input_graph_json):
     Format must be similar to the dataframe produced by the cleaning functions after data collection
     It consists in doing the inverted process (deaggregate data) to allow for merging with new data
     """
-    nodes = pd.DataFrame(input_graph_json["nodes"])
-    nodes = nodes.join(pd.json_normalize(nodes["metadata"]))
-    nodes = nodes.drop(["metadata"], axis=1)
+    nodes = input_graph_table(input_graph_json, "nodes")
     nodes["table_id"] = 0
     nodes = deaggraggate_node_dataframe(nodes)
     return nodes
 
 
-def concat_clean_nodes(nodes_RT_quoted, nodes_original, limit_date, input_graph_json):
+def input_graph_json2positions(input_graph_json, dim):
+    """
+    Returns positions of the nodes of a graph in json format (output of graphgenerator command) in a dataframe with
+    node ids as index and one column per axis, missing coordinates (2D graph updated in 3D) are set to 0
+    """
+    axes = [column_names.node_pos_x, column_names.node_pos_y, column_names.node_pos_z][:dim]
+    ids = input_graph_column(input_graph_json, "nodes", column_names.node_id)
+    coordinates = np.array(
+        [input_graph_column(input_graph_json, "nodes", axis, 0) for axis in axes], dtype=float
+    ).reshape(dim, len(ids))
+    positions = pd.DataFrame(coordinates.T, index=pd.Index(ids, dtype=object), columns=axes)
+    return positions[~positions.index.duplicated(keep="last")]
+
+
+def input_graph_json2communities(input_graph_json):
+    """
+    Returns communities of the nodes of a graph in json format (output of graphgenerator command) in a series with
+    node ids as index (nodes without community are dropped)
+    """
+    communities = pd.Series(
+        input_graph_column(input_graph_json, "nodes", column_names.nodes_community),
+        index=pd.Index(input_graph_column(input_graph_json, "nodes", column_names.node_id), dtype=object),
+        dtype=object,
+    )
+    communities = communities.dropna().astype(np.int64)
+    return communities[~communities.index.duplicated(keep="last")]
+
+
+def join_botscores(nodes, botscores):
+    """
+    Add botscore column to nodes from botscores computed at the user level (dictionnary with usernames as keys), if
+    botscores have not been computed, botscore is set to "nan"
+    """
+    if botscores:
+        nodes[column_names.node_botscore] = (
+            nodes[column_names.node_id].map(botscores).fillna(str(float("nan")))
+        )
+    else:
+        nodes[column_names.node_botscore] = str(float("nan"))
+    return nodes
+
+
+def concat_clean_nodes(nodes_RT_quoted, nodes_original, limit_date, input_graph_json, botscores=None):
     """
     Concates nodes that are taken from tweets which are Retweets or tweets qu (nodes_RT_quoted) and original tweets which
     have been retweeted or quoted
@@ -171,6 +207,8 @@ def concat_clean_nodes(nodes_RT_quoted, nodes_original, limit_date, input_graph_
     nodes_RT_quoted = clean_nodes_RT_quoted(nodes_RT_quoted, limit_date)
     nodes_original = clean_nodes_tweet(nodes_original, limit_date)
     nodes = pd.concat([nodes_original, nodes_RT_quoted])
+    # add botscores computed at the user level
+    nodes = join_botscores(nodes, botscores)
     # if input_graph, concatenate with new nodes
     if input_graph_json:
         old_nodes = input_graph_json2node_df(input_graph_json)
@@ -179,7 +217,13 @@ def concat_clean_nodes(nodes_RT_quoted, nodes_original, limit_date, input_graph_
     nodes = drop_duplicated_nodes(nodes)
     # aggregate data at the user level
     nodes = aggregate_node_data(nodes)
-    # keep the first value of the type of tweet as a label
+    return label_type_tweet(nodes)
+
+
+def label_type_tweet(nodes):
+    """
+    keep the first value of the type of tweet as a label
+    """
     nodes[column_names.node_type_tweet] = nodes[column_names.node_type_tweet].apply(
         lambda x: x[0]
     )
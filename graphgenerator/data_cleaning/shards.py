@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+from graphgenerator.config import column_names
+from graphgenerator.data_cleaning.aggregation import aggregate_groups, explode_groups
+from graphgenerator.data_cleaning.batches import aggregated_edges_columns, edges_list_columns, nodes_list_columns
+from graphgenerator.data_cleaning.edges import aggregate_edge_data, complete_edges
+from graphgenerator.data_cleaning.nodes import (
+    aggregate_node_data,
+    drop_duplicated_nodes,
+    input_graph_json2node_df,
+    join_botscores,
+    label_type_tweet,
+)
+
+# date compared with the date of the last collected tweet to keep a row (date of the source tweet for RT and quotes,
+# date of the tweet for source tweets), minimal cut date of a group and is a tweet id repeated in a group
+cut_date = "cut_date"
+min_cut_date = "min_cut_date"
+duplicated_tweets = "duplicated_tweets"
+
+edges_keys = [column_names.edge_source, column_names.edge_target, column_names.edge_type]
+nodes_keys = [column_names.node_id, column_names.node_label]
+shard_edges_list_columns = edges_list_columns + [cut_date]
+shard_nodes_list_columns = nodes_list_columns + [column_names.node_tweet_id, cut_date]
+
+
+def aggregate_shard_edges(edges):
+    """
+    Aggregate edges of a shard (one row per RT or quote, see TweetStore.edges_dataframe()) at the edge level as
+    aggregate_edge_data() does, dates of the source tweets are kept in a list so that rows can be cut once the date of
+    the last collected tweet of all shards is known (see merge_shard_edges())
+    """
+    edges = edges.rename(columns={column_names.edge_source_date: cut_date})
+    edges[column_names.edge_size] = 1
+    edges = edges.sort_values(column_names.edge_date, ascending=True)
+    aggregated = aggregate_groups(
+        edges,
+        edges_keys,
+        {
+            **{col: "list" for col in shard_edges_list_columns},
+            column_names.edge_size: "sum",
+            column_names.edge_url_label: "first",
+        },
+    )
+    aggregated[min_cut_date] = list(map(min, aggregated[cut_date]))
+    return aggregated
+
+
+def aggregate_shard_nodes(nodes_RT_quoted, nodes_original):
+    """
+    Aggregate nodes of a shard (see TweetStore.nodes_RT_quoted_dataframe() and nodes_original_dataframe()) at the
+    user level as aggregate_node_data() does, tweet ids and cut dates are kept in lists so that rows can be cut and
+    deduplicated once all shards are collected (see merge_shard_nodes())
+    """
+    nodes = pd.concat(
+        [
+            nodes_original.assign(**{cut_date: nodes_original[column_names.node_date]}),
+            nodes_RT_quoted.rename(columns={column_names.node_source_date: cut_date}),
+        ]
+    )
+    # a tweet id always belongs to the same account, tweets repeated in an account are deduplicated after the cut
+    nodes[duplicated_tweets] = nodes.duplicated(column_names.node_tweet_id, keep=False)
+    nodes = nodes.sort_values(column_names.node_date, ascending=True)
+    aggregated = aggregate_groups(nodes, nodes_keys, {col: "list" for col in shard_nodes_list_columns})
+    aggregated[min_cut_date] = list(map(min, aggregated[cut_date]))
+    aggregated[duplicated_tweets] = nodes.groupby(nodes_keys)[duplicated_tweets].any().to_numpy()
+    return aggregated
+
+
+def split_shard_groups(groups, keys, list_columns, limit_date, touched=False):
+    """
+    Split groups aggregated by shards between groups which are already clean (found by a single shard, no row to cut)
+    and the other groups, exploded back into one row per tweet whose cut date is after limit_date
+        Parameters:
+            groups (pandas.DataFrame): groups aggregated by all shards, concatenated in the order of the shards
+            keys (list): columns defining the groups
+            list_columns (list): columns aggregated in lists
+            limit_date (str): date of the last collected tweet
+            touched (pandas.Series): other groups to explode (boolean series with the same index as groups)
+    """
+    split = groups.duplicated(keys, keep=False) | (groups[min_cut_date] <= limit_date) | touched
+    rows = explode_groups(groups[split], list_columns)
+    rows = rows[rows[cut_date] > limit_date]
+    return groups[~split], rows.drop(columns=[cut_date, min_cut_date])
+
+
+def merge_shard_edges(shards, limit_date, input_graph_json):
+    """
+    Merge edges aggregated by shards (see aggregate_shard_edges()) into a clean dataframe, the same as clean_edges()
+    on all rows: only edges found by several shards or with rows to cut are aggregated again
+        Parameters:
+            shards (list): dataframes of edges aggregated by each shard, in the order of the shards
+            limit_date (str): date of the last collected tweet
+            input_graph_json (dict): graph in json format, output of grapgenerator command
+    """
+    groups = pd.concat(shards, ignore_index=True)
+    clean, rows = split_shard_groups(groups, edges_keys, shard_edges_list_columns, limit_date)
+    rows[column_names.edge_size] = 1
+    rows[column_names.edge_url_label] = np.where(rows[column_names.edge_url_quoted] != "", "has quoted", "has RT")
+    rows = rows.sort_values(column_names.edge_date, ascending=True)
+    edges = pd.concat([clean[aggregated_edges_columns], aggregate_edge_data(rows)])
+    edges = edges.sort_values(edges_keys).reset_index(drop=True)
+    return complete_edges(edges, input_graph_json)
+
+
+def merge_shard_nodes(shards, limit_date, input_graph_json, botscores=None):
+    """
+    Merge nodes aggregated by shards (see aggregate_shard_nodes()) into a clean dataframe, the same as
+    concat_clean_nodes() on all rows: only accounts found by several shards, with rows to cut, with repeated tweets or
+    in the input graph are aggregated again
+        Parameters:
+            shards (list): dataframes of nodes aggregated by each shard, in the order of the shards
+            limit_date (str): date of the last collected tweet
+            input_graph_json (dict): graph in json format, output of grapgenerator command
+            botscores (dict): botscores at the user level, if None botscores are not computed
+    """
+    groups = pd.concat(shards, ignore_index=True)
+    touched = groups[duplicated_tweets]
+    old_nodes = None
+    if input_graph_json:
+        old_nodes = input_graph_json2node_df(input_graph_json)
+        touched = touched | groups[column_names.node_id].isin(old_nodes[column_names.node_id])
+    clean, rows = split_shard_groups(groups, nodes_keys, shard_nodes_list_columns, limit_date, touched)
+    rows = pd.concat([join_botscores(rows, botscores), old_nodes])
+    rows = aggregate_node_data(drop_duplicated_nodes(rows))
+    clean = join_botscores(clean[nodes_keys + nodes_list_columns].copy(), botscores)[rows.columns]
+    # clean groups and aggregated rows have different accounts, accounts are sorted as by aggregate_node_data()
+    nodes = pd.concat([clean, rows]).sort_values(column_names.node_id, kind="mergesort").reset_index(drop=True)
+    return label_type_tweet(nodes)
@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from botfinder.bot_classifier import findbot_rawjson
+
+from graphgenerator.config.config_botscore import botscore_profile_fields
+
+
+def user_profile(user_info):
+    """
+    Returns the fields of a user profile used to compute the botscore
+    """
+    return {field: user_info.get(field) for field in botscore_profile_fields}
+
+
+def profile_fingerprint(user_info):
+    """
+    Returns a hash of the fields of a user profile used to compute the botscore, a botscore computed for a profile can
+    be reused as long as the fingerprint of the profile does not change
+    """
+    profile = user_profile(user_info)
+    return hashlib.sha1(
+        json.dumps(profile, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def compute_botscores(profiles):
+    """
+    Compute botscores of a list of user profiles using botfinder (the function findbot_rawjson from the package is used
+    rather than the CLI), returns the list of botscores
+    """
+    return [result["botScore"] for result in json.loads(findbot_rawjson(json.dumps(profiles)))]
+
+
+class BotscoreCache:
+    """
+    Class to cache botscores at the user level, so that the botscore of an account is computed only once even if the
+    account appears in many tweets
+    Botscores are kept in memory (up to max_size accounts, the least recently used are dropped first) and can also be
+    saved in a SQLite database to be reused from one run to the other, in this case botscores older than max_age_days
+    are computed again (the age of the account is used to compute the botscore)
+    """
+
+    def __init__(self, max_size=100000, db_path=None, max_age_days=30, commit_every=100):
+        """
+        Init function of class BotscoreCache
+            Parameters:
+                max_size (int): maximal number of botscores kept in memory
+                db_path (str): path to SQLite database where to save botscores, if None botscores are only kept in memory
+                max_age_days (float): number of days after which a botscore saved in the database is expired
+                commit_every (int): number of new botscores after which they are committed to the database
+        """
+        self.max_size = max_size
+        self.max_age = max_age_days * 24 * 3600
+        self.commit_every = commit_every
+        self.botscores = OrderedDict()
+        self.n_uncommitted = 0
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS botscores ("
+                "username TEXT, fingerprint TEXT, botscore REAL, computed_at REAL, "
+                "PRIMARY KEY (username, fingerprint))"
+            )
+            self.db.execute(
+                "DELETE FROM botscores WHERE computed_at < ?", (time.time() - self.max_age,)
+            )
+            self.db.commit()
+
+    def get(self, username, fingerprint):
+        """
+        Returns botscore of an account if it is in the cache and None otherwise
+        """
+        key = (username, fingerprint)
+        if key in self.botscores:
+            self.botscores.move_to_end(key)
+            return self.botscores[key]
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT botscore FROM botscores WHERE username = ? AND fingerprint = ? AND computed_at >= ?",
+                (username, fingerprint, time.time() - self.max_age),
+            ).fetchone()
+            if row is not None:
+                self.keep_in_memory(key, row[0])
+                return row[0]
+        return None
+
+    def set(self, username, fingerprint, botscore):
+        """
+        Add botscore of an account to the cache
+        """
+        self.keep_in_memory((username, fingerprint), botscore)
+        if self.db is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO botscores VALUES (?, ?, ?, ?)",
+                (username, fingerprint, botscore, time.time()),
+            )
+            self.n_uncommitted += 1
+            if self.n_uncommitted >= self.commit_every:
+                self.commit()
+
+    def keep_in_memory(self, key, botscore):
+        """
+        Keep botscore in memory and drop the least recently used botscore if the cache is full
+        """
+        self.botscores[key] = botscore
+        self.botscores.move_to_end(key)
+        if len(self.botscores) > self.max_size:
+            self.botscores.popitem(last=False)
+
+    def commit(self):
+        """
+        Commit new botscores to the database
+        """
+        if self.db is not None:
+            self.db.commit()
+            self.n_uncommitted = 0
+
+
+class ProfileCollector:
+    """
+    Class gathering the first profile of each account, used instead of BotscoreScorer when tweets are collected in a
+    worker process: profiles are sent back to the main process where botscores are computed
+    """
+
+    def __init__(self):
+        """
+        Init function of class ProfileCollector
+        """
+        self.profiles = {}
+
+    def add(self, user_info):
+        """
+        Add profile of an account, only the first profile of an account is kept
+        """
+        if user_info["username"] not in self.profiles:
+            self.profiles[user_info["username"]] = user_profile(user_info)
+
+
+class BotscoreScorer:
+    """
+    Class to compute botscores at the user level in a pool of processes, while tweets are still being collected
+    Profiles of new accounts are gathered in batches, each batch is classified in one call to botfinder by one of the
+    processes, botscores already in the cache are not computed again
+    A scorer can be shared by several threads (e.g. searches collected at the same time)
+    """
+
+    def __init__(self, cache=None, n_workers=None, batch_size=100):
+        """
+        Init function of class BotscoreScorer
+            Parameters:
+                cache (BotscoreCache): cache where to look for botscores before computing them
+                n_workers (int): number of processes used to compute botscores, if None all cores are used
+                batch_size (int): number of profiles classified in one call to botfinder
+        """
+        self.cache = cache if cache is not None else BotscoreCache()
+        self.n_workers = n_workers
+        self.batch_size = batch_size
+        self.executor = None
+        self.botscores = {}
+        self.usernames_done = set()
+        self.batch = []
+        self.futures = []
+        self.lock = threading.RLock()
+
+    def add(self, user_info):
+        """
+        Add an account whose botscore must be computed, only the first profile of an account is used
+        """
+        username = user_info["username"]
+        with self.lock:
+            if username not in self.usernames_done:
+                self.usernames_done.add(username)
+                fingerprint = profile_fingerprint(user_info)
+                botscore = self.cache.get(username, fingerprint)
+                if botscore is None:
+                    self.batch.append((username, fingerprint, user_profile(user_info)))
+                    if len(self.batch) >= self.batch_size:
+                        self.submit_batch()
+                else:
+                    self.botscores[username] = botscore
+
+    def submit_batch(self):
+        """
+        Send current batch of profiles to the pool of processes
+        """
+        if self.batch:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.n_workers)
+            future = self.executor.submit(
+                compute_botscores, [profile for _, _, profile in self.batch]
+            )
+            self.futures.append((future, self.batch))
+            self.batch = []
+
+    def result(self):
+        """
+        Wait for all botscores to be computed and returns dictionnary of botscores at the user level
+        """
+        with self.lock:
+            self.submit_batch()
+            for future, batch in self.futures:
+                for (username, fingerprint, _), botscore in zip(batch, future.result()):
+                    self.botscores[username] = botscore
+                    self.cache.set(username, fingerprint, botscore)
+            self.futures = []
+            self.cache.commit()
+            return self.botscores
+
+    def close(self):
+        """
+        Wait for all botscores to be computed and stop the pool of processes
+        """
+        with self.lock:
+            self.result()
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
@@ -0,0 +1,200 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def edges_weights(edges):
+    """
+    Returns dictionnary of the weights of undirected edges (keys are frozensets of the two nodes), edges is an iterable
+    of (source, target, weight)
+    """
+    return {frozenset((source, target)): w for source, target, w in edges}
+
+
+def find_touched_nodes(edges, previous_edges):
+    """
+    Returns set of nodes which have an edge which is new or whose weight has changed since previous_edges
+    (dictionnary returned by edges_weights()), edges is an iterable of (source, target, weight)
+    """
+    touched_nodes = set()
+    for source, target, w in edges:
+        if previous_edges.get(frozenset((source, target))) != w:
+            touched_nodes.update((source, target))
+    return touched_nodes
+
+
+def local_best_partition(G, partition, touched_nodes, **kwargs):
+    """
+    Update a partition with louvain algorithm by only optimising communities containing touched nodes, other
+    communities are kept as they are (edges between them and touched communities are ignored)
+        Parameters:
+            G (networkx.Graph): graph
+            partition (dict): initial partition, it must contain all nodes of G
+            touched_nodes (set): nodes whose edges have changed since the initial partition was computed
+            kwargs: arguments of community_louvain.best_partition()
+    """
+    # python-louvain (and networkx) are only imported when louvain algorithm is run
+    import community as community_louvain
+
+    touched_communities = {partition[node] for node in touched_nodes if node in partition}
+    nodes = [node for node in G if partition[node] in touched_communities]
+    communities = {node: partition[node] for node in G if partition[node] not in touched_communities}
+    if nodes:
+        offset = max(partition.values()) + 1
+        sub_partition = community_louvain.best_partition(
+            G.subgraph(nodes), partition={node: partition[node] for node in nodes}, **kwargs
+        )
+        communities.update({node: offset + community for node, community in sub_partition.items()})
+    return communities
+
+
+def remap_communities(communities, previous_communities, next_id):
+    """
+    Renumber communities so that they keep the ids of the previous communities they overlap the most with (a previous
+    id is given to one community only), other communities get new ids from next_id
+        Parameters:
+            communities (numpy.array): community of each node
+            previous_communities (numpy.array): previous community of each node, NaN for nodes without previous
+            community
+            next_id (int): first id given to new communities (it must be above all previous ids)
+    """
+    known = ~np.isnan(previous_communities)
+    pairs, overlaps = np.unique(
+        np.column_stack([communities[known], previous_communities[known].astype(np.int64)]),
+        axis=0,
+        return_counts=True,
+    )
+    mapping = {}
+    used_ids = set()
+    for community, previous_community in pairs[np.lexsort((pairs[:, 0], pairs[:, 1], -overlaps))].tolist():
+        if community not in mapping and previous_community not in used_ids:
+            mapping[community] = previous_community
+            used_ids.add(previous_community)
+    unique_communities, inverse = np.unique(communities, return_inverse=True)
+    for community in unique_communities.tolist():
+        if community not in mapping:
+            mapping[community] = next_id
+            next_id += 1
+    return np.array([mapping[community] for community in unique_communities.tolist()], dtype=np.int64)[inverse]
+
+
+def best_moves(A, labels, degrees, totals, two_m, resolution, rows, rng):
+    """
+    Returns, for each node of rows, the community of its neighbours (or its own community) which maximises the gain of
+    modularity if the node is moved to it, ties are broken in favour of the current community of the node and then
+    randomly
+        Parameters:
+            A (scipy.sparse.csr_matrix): symmetric adjacency matrix
+            labels (numpy.array): community of each node
+            degrees (numpy.array): weighted degree of each node
+            totals (numpy.array): sum of the degrees of the nodes of each community
+            two_m (float): sum of all weights of A
+            resolution (float): resolution of the modularity
+            rows (numpy.array): consecutive nodes to move
+            rng (numpy.random.Generator): random number generator
+    """
+    n = A.shape[0]
+    start, end = A.indptr[rows[0]], A.indptr[rows[-1] + 1]
+    node = np.repeat(rows, np.diff(A.indptr[rows[0]:rows[-1] + 2]))
+    neighbour = A.indices[start:end]
+    not_self = node != neighbour
+    node = np.concatenate([node[not_self], rows])
+    label = np.concatenate([labels[neighbour[not_self]], labels[rows]])
+    weight = np.concatenate([A.data[start:end][not_self], np.zeros(len(rows))])
+    key = node * n + label
+    order = np.argsort(key, kind="stable")
+    keys, first = np.unique(key[order], return_index=True)
+    weights = np.add.reduceat(weight[order], first)
+    key_node, key_label = keys // n, keys % n
+    is_current = key_label == labels[key_node]
+    # the node is removed from its community before computing the gain
+    totals_without_node = totals[key_label] - np.where(is_current, degrees[key_node], 0)
+    gains = weights - resolution * degrees[key_node] * totals_without_node / two_m
+    scale = np.abs(gains).max() if len(gains) else 1
+    gains = gains + (scale or 1) * 1e-9 * (rng.random(len(gains)) + 2 * is_current)
+    best = np.lexsort((-gains, key_node))
+    best = best[np.r_[True, key_node[best][1:] != key_node[best][:-1]]]
+    return key_label[best]
+
+
+def parallel_louvain(
+    graph,
+    weight="weight",
+    partition=None,
+    resolution=1.0,
+    seed=0,
+    max_iterations=20,
+    tolerance=1e-2,
+    n_threads=1,
+    chunk_size=100000,
+):
+    """
+    Find communities maximising modularity with a vectorised version of louvain algorithm on the sparse adjacency
+    matrix of G: all nodes compute at once the community of their neighbours which they should join, then a random
+    half of them moves (moving all nodes at once can make communities oscillate), when (almost) no node wants to move,
+    communities are merged into nodes of a smaller graph and the process starts again
+    Returns array of the community of each node (following the ids of nodes of the graph)
+        Parameters:
+            graph (SparseGraph): graph
+            weight (str): edge attribute used as weight
+            partition (numpy.array): initial community of each node, if None each node starts in its own community
+            resolution (float): resolution of the modularity, communities are smaller when resolution is higher
+            seed (int): seed of the random number generator, results are the same for a given seed
+            max_iterations (int): maximal number of iterations at each level
+            tolerance (float): a level ends when less than this fraction of nodes wants to move
+            n_threads (int): number of threads computing the moves of the nodes (nodes are split in chunks of
+            chunk_size nodes)
+            chunk_size (int): number of nodes whose moves are computed at once by a thread
+    """
+    n = graph.number_of_nodes()
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    A = graph.adjacency(weight)
+    two_m = A.sum()
+    if two_m == 0:
+        return np.arange(n)
+    if partition is not None:
+        # a community is labelled by its first node
+        codes, _ = pd.factorize(np.asarray(partition))
+        first_nodes = np.full(codes.max() + 1, n)
+        np.minimum.at(first_nodes, codes, np.arange(n))
+        labels = first_nodes[codes]
+    else:
+        labels = np.arange(n)
+    rng = np.random.default_rng(seed)
+    communities = np.arange(n)
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        while True:
+            n_level = A.shape[0]
+            degrees = np.asarray(A.sum(axis=1)).ravel()
+            chunks = [np.arange(start, min(start + chunk_size, n_level)) for start in range(0, n_level, chunk_size)]
+            for _ in range(max_iterations):
+                totals = np.bincount(labels, degrees, minlength=n_level)
+                chunk_rngs = [np.random.default_rng(chunk_seed) for chunk_seed in rng.integers(0, 2 ** 32, len(chunks))]
+                new_labels = np.concatenate(
+                    list(
+                        executor.map(
+                            lambda i: best_moves(A, labels, degrees, totals, two_m, resolution, chunks[i], chunk_rngs[i]),
+                            range(len(chunks)),
+                        )
+                    )
+                )
+                moving = new_labels != labels
+                if not moving.any():
+                    break
+                if moving.sum() < tolerance * n_level:
+                    labels = np.where(moving, new_labels, labels)
+                    break
+                labels = np.where(moving & (rng.random(n_level) < 0.5), new_labels, labels)
+            _, labels = np.unique(labels, return_inverse=True)
+            communities = labels[communities]
+            n_communities = labels.max() + 1
+            if n_communities == n_level:
+                break
+            # communities become the nodes of the next level
+            P = sp.csr_matrix((np.ones(n_level), (np.arange(n_level), labels)), shape=(n_level, n_communities))
+            A = (P.T @ A @ P).tocsr()
+            labels = np.arange(n_communities)
+    return communities
@@ -0,0 +1,162 @@
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from graphgenerator.config import column_names
+from graphgenerator.config.config_export import parquet_graph_files
+
+# pyarrow is only needed to read and write graphs in parquet format
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+def replace_file(path, write):
+    """
+    Write a file atomically: write() writes a temporary file in the directory of path which then replaces path, so that
+    path is never half written
+        Parameters:
+            path (str): path of the file
+            write (function): function writing the content of the file, it takes the path of the temporary file
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    os.close(file_descriptor)
+    try:
+        write(temporary_path)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary_path, 0o666 & ~umask)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def check_pyarrow():
+    """
+    Raise an exception if pyarrow is not installed
+    """
+    if pa is None:
+        raise Exception(
+            "pyarrow must be installed to read or write graphs in parquet format "
+            "(pip3 install social-networks-graph-generator[parquet])"
+        )
+
+
+def parquet_graph_path(json_path):
+    """
+    Returns the directory where a graph is exported in parquet format instead of json_path: the .json extension is
+    replaced by .parquet (output.json becomes output.parquet), other paths are kept
+    """
+    root, extension = os.path.splitext(json_path)
+    return root + ".parquet" if extension == ".json" else json_path
+
+
+def batch_delta_path(json_path):
+    """
+    Returns the file where deltas of incremental batches are appended instead of exporting the graph to json_path at
+    each batch: the extension is replaced by .batches.jsonl (output.json becomes output.batches.jsonl)
+    """
+    return os.path.splitext(json_path)[0] + ".batches.jsonl"
+
+
+def write_parquet_graph(path, nodes, edges, metadata):
+    """
+    Write a graph in parquet format: path is a directory containing nodes and edges in parquet files (metadata fields
+    of nodes and edges are columns, lists are kept in list columns) and metadata of the graph in a json file
+    Each file is replaced atomically, metadata is written last
+        Parameters:
+            path (str): path of the directory
+            nodes (pandas.DataFrame): nodes with one column per field
+            edges (pandas.DataFrame): edges with one column per field
+            metadata (dict): metadata of the graph
+    """
+    check_pyarrow()
+    os.makedirs(path, exist_ok=True)
+    nodes = nodes.copy()
+    # botscore is either a float or "nan", it is saved as a float column
+    if column_names.node_botscore in nodes:
+        nodes[column_names.node_botscore] = pd.to_numeric(nodes[column_names.node_botscore], errors="coerce")
+    for key, df in [("nodes", nodes), ("edges", edges)]:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        replace_file(
+            os.path.join(path, parquet_graph_files[key]),
+            lambda temporary_path: pq.write_table(table, temporary_path),
+        )
+
+    def write_metadata(temporary_path):
+        with open(temporary_path, "w") as outfile:
+            json.dump(metadata, outfile)
+
+    replace_file(os.path.join(path, parquet_graph_files["metadata"]), write_metadata)
+
+
+def read_parquet_table(path):
+    """
+    Read a parquet file written by write_parquet_graph() into a dataframe, the file is memory mapped and columns which
+    are not lists are converted without copy when possible, list columns are converted to python lists (they are
+    concatenated with new data when a graph is updated)
+    """
+    table = pq.read_table(path, memory_map=True)
+    list_columns = [field.name for field in table.schema if pa.types.is_list(field.type)]
+    df = table.drop(list_columns).to_pandas()
+    for column in list_columns:
+        df[column] = table.column(column).to_pylist()
+    return df[table.column_names]
+
+
+def read_parquet_graph(path):
+    """
+    Read a graph written by write_parquet_graph(), returns a dictionnary with nodes and edges (dataframes with one
+    column per field) and metadata, it can be used everywhere a graph in json format is expected
+    """
+    check_pyarrow()
+    graph = {key: read_parquet_table(os.path.join(path, parquet_graph_files[key])) for key in ["nodes", "edges"]}
+    nodes = graph["nodes"]
+    if column_names.node_botscore in nodes:
+        botscores = nodes[column_names.node_botscore]
+        nodes[column_names.node_botscore] = botscores.astype(object).where(botscores.notna(), str(float("nan")))
+    with open(os.path.join(path, parquet_graph_files["metadata"]), "r") as file:
+        graph["metadata"] = json.load(file)
+    return graph
+
+
+def read_input_graph(path):
+    """
+    Read a graph exported by graphgenerator command, either in json format (path is a json file) or in parquet format
+    (path is a directory)
+    """
+    if os.path.isdir(path):
+        return read_parquet_graph(path)
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def input_graph_table(input_graph_json, key):
+    """
+    Returns nodes or edges (depending on key) of an input graph in a dataframe with one column per field, fields of
+    metadata are columns
+    """
+    table = input_graph_json[key]
+    if isinstance(table, pd.DataFrame):
+        return table.copy()
+    table = pd.DataFrame(table)
+    table = table.join(pd.DataFrame(table[column_names.node_metadata].tolist(), index=table.index))
+    return table.drop([column_names.node_metadata], axis=1)
+
+
+def input_graph_column(input_graph_json, key, column, default=None):
+    """
+    Returns list of values of a field of nodes or edges (depending on key) of an input graph, default is used when
+    the field is missing
+    """
+    table = input_graph_json[key]
+    if isinstance(table, pd.DataFrame):
+        return table[column].tolist() if column in table else [default] * len(table)
+    return [record.get(column, default) for record in table]
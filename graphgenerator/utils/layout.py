@@ -0,0 +1,271 @@
+from itertools import product
+import time
+
+import numpy as np
+import scipy.fft
+import scipy.sparse as sp
+
+
+def rows_max(values, indptr):
+    """
+    Returns maximum of values on each row of a CSR matrix (values follow the indices of the matrix), -inf for empty
+    rows
+    """
+    n = len(indptr) - 1
+    maximum = np.full(n, -np.inf)
+    not_empty = indptr[1:] > indptr[:-1]
+    if not_empty.any():
+        maximum[not_empty] = np.maximum.reduceat(values, indptr[:-1][not_empty])
+    return maximum
+
+
+def coarsen(A, rng, max_group_size=8):
+    """
+    Coarsen a graph by merging each node with a neighbouring "sun" node, suns are a maximal independent set of the
+    graph chosen in priority among nodes with the highest degrees (so that leaves are merged with their hub)
+    A sun is merged with at most max_group_size nodes, other nodes merged with the same sun are grouped together by
+    max_group_size, so that hubs do not swallow the whole graph
+    Returns the index of the coarse node of each node and the adjacency matrix of the coarse graph
+    """
+    n = A.shape[0]
+    priority = np.diff(A.indptr) + rng.random(n)
+    undecided = np.ones(n, dtype=bool)
+    suns = np.zeros(n, dtype=bool)
+    while undecided.any():
+        candidates = np.where(undecided, priority, -np.inf)
+        new_suns = undecided & (candidates > rows_max(candidates[A.indices], A.indptr))
+        suns |= new_suns
+        undecided &= ~new_suns
+        undecided &= ~((A @ new_suns.astype(float)) > 0)
+    closest_sun = np.asarray((A @ sp.diags(suns.astype(float))).tocsr().argmax(axis=1)).ravel()
+    planets = np.flatnonzero(~suns)
+    planets = planets[np.argsort(closest_sun[planets], kind="stable")]
+    _, first, counts = np.unique(closest_sun[planets], return_index=True, return_counts=True)
+    chunk = (np.arange(len(planets)) - np.repeat(first, counts)) // max_group_size
+    group = np.empty(n, dtype=np.int64)
+    group[suns] = np.arange(suns.sum())
+    group[planets[chunk == 0]] = group[closest_sun[planets[chunk == 0]]]
+    others = chunk > 0
+    key = closest_sun[planets[others]] * (len(planets) + 1) + chunk[others]
+    _, new_group = np.unique(key, return_inverse=True)
+    group[planets[others]] = suns.sum() + new_group
+    n_coarse = suns.sum() + (new_group.max() + 1 if len(new_group) else 0)
+    P = sp.csr_matrix((np.ones(n), (np.arange(n), group)), shape=(n, n_coarse))
+    A_coarse = (P.T @ A @ P).tocsr()
+    A_coarse.setdiag(0)
+    A_coarse.eliminate_zeros()
+    return group, A_coarse
+
+
+def cloud_in_cell(pos, lower, spacing, shape):
+    """
+    Returns, for each corner of the grid cell containing each node, the flat index of the corner in a grid of given
+    shape and the weight of the node given to the corner (cloud in cell interpolation)
+    """
+    relative = (pos - lower) / spacing
+    base = np.clip(np.floor(relative).astype(np.int64), 0, np.array(shape) // 2 - 2)
+    fraction = relative - base
+    corners = []
+    for corner in product([0, 1], repeat=pos.shape[1]):
+        corner = np.array(corner)
+        index = np.ravel_multi_index(tuple((base + corner).T), shape)
+        weight = np.where(corner == 1, fraction, 1 - fraction).prod(axis=1)
+        corners.append((index, weight))
+    return corners
+
+
+def repulsive_forces(pos, k, exact_limit=500, max_grid_size=None):
+    """
+    Returns repulsive forces between nodes (k^2/d as in spring layout)
+    Forces are computed exactly for small graphs, for larger graphs nodes are spread on a grid and forces are computed
+    as the convolution of the grid with the force kernel (using FFT), nodes closer than the grid spacing (about k/2) do
+    not repel each other accurately
+    """
+    n, dim = pos.shape
+    if n <= exact_limit:
+        delta = pos[:, np.newaxis, :] - pos[np.newaxis, :, :]
+        distance2 = np.maximum((delta ** 2).sum(axis=-1), 1e-9)
+        np.fill_diagonal(distance2, np.inf)
+        return (delta * (k * k / distance2)[:, :, np.newaxis]).sum(axis=1)
+    if max_grid_size is None:
+        max_grid_size = 512 if dim == 2 else 32
+    lower = pos.min(axis=0)
+    extent = max((pos.max(axis=0) - lower).max(), 1e-9)
+    spacing = max(extent / (max_grid_size - 2), k / 2)
+    # grid is padded with as many cells so that the convolution does not wrap around
+    shape = tuple(2 * (np.ceil((pos.max(axis=0) - lower) / spacing).astype(np.int64) + 2))
+    corners = cloud_in_cell(pos, lower, spacing, shape)
+    size = np.prod(shape)
+    mass = sum(np.bincount(index, weight, minlength=size) for index, weight in corners).reshape(shape)
+    mass_fft = scipy.fft.rfftn(mass, workers=-1)
+    offsets = np.meshgrid(
+        *[np.where(np.arange(m) < m // 2, np.arange(m), np.arange(m) - m) * spacing for m in shape],
+        indexing="ij",
+    )
+    distance2 = sum(offset ** 2 for offset in offsets)
+    distance2.flat[0] = np.inf
+    forces = np.zeros_like(pos)
+    for d in range(dim):
+        field = scipy.fft.irfftn(
+            mass_fft * scipy.fft.rfftn(k * k * offsets[d] / distance2, workers=-1), s=shape, workers=-1
+        ).ravel()
+        forces[:, d] = sum(weight * field[index] for index, weight in corners)
+    return forces
+
+
+def attractive_forces(pos, A, k):
+    """
+    Returns attractive forces between connected nodes (w*d^2/k as in spring layout)
+    """
+    n = len(pos)
+    i = np.repeat(np.arange(n), np.diff(A.indptr))
+    j = A.indices
+    delta = pos[i] - pos[j]
+    factor = A.data * np.sqrt((delta ** 2).sum(axis=1)) / k
+    forces = np.zeros_like(pos)
+    for d in range(pos.shape[1]):
+        forces[:, d] -= np.bincount(i, delta[:, d] * factor, minlength=n)
+    return forces
+
+
+def force_directed(pos, A, k, iterations, temperature, movable=None, deadline=None):
+    """
+    Move nodes according to attractive and repulsive forces, a node moves by the norm of its force up to a maximal
+    displacement (temperature) which decreases linearly to 0 as in spring layout
+    """
+    dt = temperature / (iterations + 1)
+    for _ in range(iterations):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        displacement = repulsive_forces(pos, k) + attractive_forces(pos, A, k)
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 0.01)
+        step = displacement * (np.minimum(length, temperature) / length)[:, np.newaxis]
+        if movable is not None:
+            step[~movable] = 0
+        pos += step
+        temperature -= dt
+    return pos
+
+
+def place_new_nodes(graph, pos, n_rounds=3, jitter=0.01, seed=None):
+    """
+    Returns positions of nodes completed with positions of new nodes, a new node is placed at the mean position of its
+    neighbours which already have a position (plus a small random jitter), nodes which are more than n_rounds edges
+    away from a node with a position are not placed
+        Parameters:
+            graph (SparseGraph): graph
+            pos (numpy.array): positions of nodes (one row per node), rows of new nodes are NaN
+            n_rounds (int): maximal number of edges between a new node and a node with a position
+            jitter (float): size of the random jitter
+            seed (int): seed of the random number generator
+    """
+    rng = np.random.default_rng(seed)
+    pos = np.array(pos, dtype=float)
+    indptr, indices = graph.neighbours()
+    rows = np.repeat(np.arange(len(pos)), np.diff(indptr))
+    placed = ~np.isnan(pos).any(axis=1)
+    for _ in range(n_rounds):
+        # positions of neighbours are added one after the other in the order of neighbours
+        from_placed = placed[indices] & ~placed[rows]
+        n_placed_neighbours = np.bincount(rows[from_placed], minlength=len(pos))
+        new = n_placed_neighbours > 0
+        if not new.any():
+            break
+        sums = np.zeros(pos.shape)
+        np.add.at(sums, rows[from_placed], pos[indices[from_placed]])
+        mean_positions = sums[new] / n_placed_neighbours[new, None]
+        pos[new] = mean_positions + (rng.random(mean_positions.shape) - 0.5) * jitter
+        placed |= new
+    return pos
+
+
+def multilevel_layout(
+    graph,
+    dim=2,
+    k=None,
+    pos=None,
+    fixed=None,
+    iterations=50,
+    temperature=0.1,
+    time_budget=None,
+    weight="weight",
+    scale=1,
+    center=None,
+    seed=None,
+    min_coarse_size=1000,
+):
+    """
+    Position nodes with a multilevel force-directed algorithm, suited to large graphs
+    The graph is coarsened several times (leaves and neighbours are merged with hubs), the coarsest graph is laid out
+    first and positions are then refined level after level, repulsive forces are computed on a grid with FFT except
+    for small graphs. Forces and conventions (k, scale, center, pos, fixed) are the same as in
+    networkx.spring_layout, but positions are arrays following the ids of nodes of the graph
+    Returns array of positions (one row per node)
+        Parameters:
+            graph (SparseGraph): graph to lay out
+            dim (int): dimension of the layout
+            k (float): optimal distance between nodes, if None it is set to 1/sqrt(n)
+            pos (numpy.array): initial positions of nodes (rows of nodes without initial position are NaN), if given
+            the graph is not coarsened and the layout is only refined
+            fixed (numpy.array): boolean array of nodes whose position must not change, they must have an initial
+            position
+            iterations (int): number of iterations on the coarsest graph, finer graphs use fewer iterations (at least
+            10)
+            temperature (float): maximal displacement of a node at the first iteration (it then decreases linearly),
+            a low temperature keeps nodes close to their initial positions
+            time_budget (float): number of seconds after which iterations are stopped, positions are still computed
+            for all nodes
+            weight (str): edge attribute used as weight
+            scale (float): scale of the positions (ignored if fixed is given)
+            center (array): center of the positions (ignored if fixed is given)
+            seed (int): seed of the random number generator
+            min_coarse_size (int): number of nodes under which the graph is not coarsened anymore
+    """
+    n = graph.number_of_nodes()
+    center = np.zeros(dim) if center is None else np.asarray(center, dtype=float)
+    if n == 0:
+        return np.zeros((0, dim))
+    if n == 1:
+        return center[None, :]
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    A = graph.adjacency(weight)
+    k = 1 / np.sqrt(n) if k is None else k
+    if pos is not None:
+        positions = rng.random((n, dim))
+        pos = np.asarray(pos, dtype=float)[:, :dim]
+        known = ~np.isnan(pos).any(axis=1)
+        positions[known] = pos[known]
+        movable = None if fixed is None else ~np.asarray(fixed)
+        positions = force_directed(positions, A, k, iterations, temperature, movable, deadline)
+    else:
+        levels = [A]
+        groups = []
+        while levels[-1].shape[0] > min_coarse_size:
+            group, A_coarse = coarsen(levels[-1], rng)
+            if A_coarse.shape[0] > 0.9 * levels[-1].shape[0]:
+                break
+            groups.append(group)
+            levels.append(A_coarse)
+        positions = rng.random((levels[-1].shape[0], dim))
+        n_coarsest = levels[-1].shape[0]
+        for level in range(len(levels) - 1, -1, -1):
+            n_level = levels[level].shape[0]
+            level_k = k * np.sqrt(n / n_level)
+            # finer levels start from the layout of the coarser one, they need fewer iterations
+            level_iterations = max(min(10, iterations), int(iterations * np.sqrt(n_coarsest / n_level)))
+            positions = force_directed(
+                positions, levels[level], level_k, level_iterations, temperature, None, deadline
+            )
+            if level > 0:
+                # nodes start next to the coarse node they have been merged into
+                positions = positions[groups[level - 1]]
+                positions += (rng.random(positions.shape) - 0.5) * level_k
+                temperature = 2 * k * np.sqrt(n / levels[level - 1].shape[0])
+    if fixed is None:
+        positions = positions - positions.mean(axis=0)
+        limit = np.abs(positions).max()
+        if limit > 0:
+            positions *= scale / limit
+        positions += center
+    return positions
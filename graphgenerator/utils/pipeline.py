@@ -0,0 +1,80 @@
+import queue
+import threading
+
+
+def iter_pipeline(iterable, functions=(), maxsize=1000):
+    """
+    Iterate over items of iterable to which functions are applied in turn, each stage (the iteration over iterable
+    and each function) runs in its own thread and stages are linked by bounded queues: a stage waiting (e.g. for the
+    network) does not block the other ones, and a stage can't get more than maxsize items ahead of the next one
+    Items keep their order. An exception raised by a stage is raised again by the generator. When the generator is
+    closed (e.g. when the loop using it breaks), stages stop after the item they are processing
+        Parameters:
+            iterable (iterable): items to process, e.g. tweets returned by a scraper
+            functions (list): functions applied in turn to each item
+            maxsize (int): maximal number of items waiting between two stages
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=maxsize) for _ in range(len(functions) + 1)]
+
+    def put(target, message):
+        # waiting with a timeout so that the stage stops even if the next stage no longer gets items
+        while not stop.is_set():
+            try:
+                target.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(source):
+        while not stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(queues[0], ("item", item)):
+                    return
+            put(queues[0], ("end", None))
+        except Exception as error:
+            put(queues[0], ("error", error))
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def transform(function, source, target):
+        while True:
+            message = get(source)
+            if message is None:
+                return
+            kind, value = message
+            if kind == "item":
+                try:
+                    value = function(value)
+                except Exception as error:
+                    kind, value = "error", error
+            if not put(target, (kind, value)) or kind != "item":
+                return
+
+    threads = [threading.Thread(target=produce, daemon=True)] + [
+        threading.Thread(target=transform, args=(function, queues[i], queues[i + 1]), daemon=True)
+        for i, function in enumerate(functions)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            kind, value = queues[-1].get()
+            if kind == "end":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
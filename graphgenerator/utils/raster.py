@@ -0,0 +1,174 @@
+import numpy as np
+
+from graphgenerator.config.config_image import (
+    community_colours,
+    edge_alpha,
+    edge_pixels_chunk_size,
+    image_margin,
+    label_height,
+    node_alpha,
+    node_radius,
+)
+
+
+def hex2rgb(colours):
+    """
+    Returns array of rgb colours (floats between 0 and 1) of a list of colours in hexadecimal format ("#rrggbb")
+    """
+    return np.array([[int(colour[i:i + 2], 16) / 255 for i in (1, 3, 5)] for colour in colours])
+
+
+def pixel_coordinates(positions, size, margin=image_margin):
+    """
+    Returns column and row (floats) of the pixel of each node in a square image of size pixels, the graph is scaled
+    to fill the image (without changing its aspect ratio) and centred, rows go downwards
+        Parameters:
+            positions (numpy.array): positions of nodes (only the two first axes are used)
+            size (int): width and height of the image in pixels
+            margin (float): share of the image left blank around the graph
+    """
+    xy = positions[:, :2].astype(float)
+    low, high = xy.min(axis=0), xy.max(axis=0)
+    extent = (high - low).max() or 1
+    scale = (size - 1) * (1 - 2 * margin) / extent
+    xy = (xy - (low + high) / 2) * scale + (size - 1) / 2
+    return xy[:, 0], (size - 1) - xy[:, 1]
+
+
+def draw_edges(image, columns, rows, sources, targets, colours, alpha=edge_alpha, chunk_size=edge_pixels_chunk_size):
+    """
+    Draw edges as straight lines of one pixel on image (array of shape (size, size, 3) modified in place), edges are
+    sampled once per pixel along their longest axis
+    Opacity accumulates: a pixel covered by n edges has an opacity of 1 - (1 - alpha) ** n, its colour is the mean of
+    the colours of the edges covering it
+        Parameters:
+            image (numpy.array): rgb image
+            columns (numpy.array): column of each node
+            rows (numpy.array): row of each node
+            sources (numpy.array): source node of each edge
+            targets (numpy.array): target node of each edge
+            colours (numpy.array): rgb colour of each edge
+            alpha (float): opacity of a single edge
+            chunk_size (int): number of pixels drawn at once
+    """
+    size = image.shape[0]
+    counts = np.zeros(size * size, dtype=np.float32)
+    colour_sums = np.zeros((3, size * size), dtype=np.float32)
+    column_steps = columns[targets] - columns[sources]
+    row_steps = rows[targets] - rows[sources]
+    lengths = np.ceil(np.maximum(np.abs(column_steps), np.abs(row_steps)))
+    n_pixels = lengths.astype(np.int64) + 1
+    lengths = np.maximum(lengths, 1)
+    # coordinates of the first pixel of each edge (0.5 is added so that coordinates are rounded when truncated) and
+    # moves from one pixel to the next one
+    first_columns = (columns[sources] + 0.5).astype(np.float32)
+    first_rows = (rows[sources] + 0.5).astype(np.float32)
+    column_steps = (column_steps / lengths).astype(np.float32)
+    row_steps = (row_steps / lengths).astype(np.float32)
+    colours = np.ascontiguousarray(colours.T, dtype=np.float32)
+    ends = np.cumsum(n_pixels)
+    starts = ends - n_pixels
+    start = 0
+    while start < len(sources):
+        # edges are drawn by chunks of about chunk_size pixels
+        offset = starts[start]
+        end = max(start + 1, int(np.searchsorted(ends, offset + chunk_size, side="right")))
+        edges = np.repeat(np.arange(start, end, dtype=np.int32), n_pixels[start:end])
+        steps = (np.arange(len(edges), dtype=np.int64) + offset - starts[edges]).astype(np.float32)
+        pixel_columns = (first_columns[edges] + steps * column_steps[edges]).astype(np.int32)
+        pixels = (first_rows[edges] + steps * row_steps[edges]).astype(np.int32) * size + pixel_columns
+        counts += np.bincount(pixels, minlength=size * size)
+        for channel in range(3):
+            colour_sums[channel] += np.bincount(pixels, weights=colours[channel][edges], minlength=size * size)
+        start = end
+    drawn = np.flatnonzero(counts)
+    counts = counts[drawn]
+    opacity = (1 - (1 - alpha) ** counts)[:, None]
+    pixels = image.reshape(-1, 3)
+    pixels[drawn] = pixels[drawn] * (1 - opacity) + (colour_sums[:, drawn] / counts).T * opacity
+
+
+def draw_nodes(image, columns, rows, radius, colours, alpha=node_alpha):
+    """
+    Draw nodes as discs on image (array of shape (size, size, 3) modified in place), the largest nodes are drawn first
+    so that small nodes are not hidden behind them
+        Parameters:
+            image (numpy.array): rgb image
+            columns (numpy.array): column of each node
+            rows (numpy.array): row of each node
+            radius (numpy.array): radius of each node in pixels (integers)
+            colours (numpy.array): rgb colour of each node
+            alpha (float): opacity of nodes
+    """
+    size = image.shape[0]
+    pixels = image.reshape(-1, 3)
+    columns, rows = np.rint(columns).astype(np.int64), np.rint(rows).astype(np.int64)
+    for r in np.unique(radius)[::-1]:
+        nodes = np.flatnonzero(radius == r)
+        dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+        disc = dx ** 2 + dy ** 2 <= r ** 2 + r
+        disc_columns = columns[nodes, None] + dx[disc]
+        disc_rows = rows[nodes, None] + dy[disc]
+        inside = (disc_columns >= 0) & (disc_columns < size) & (disc_rows >= 0) & (disc_rows < size)
+        disc_pixels = (disc_rows * size + disc_columns)[inside]
+        disc_colours = np.broadcast_to(colours[nodes, None, :], disc_columns.shape + (3,))[inside]
+        pixels[disc_pixels] = pixels[disc_pixels] * (1 - alpha) + disc_colours * alpha
+
+
+def render_graph(positions, sources, targets, communities, sizes, size):
+    """
+    Returns rgb image (array of shape (size, size, 3) of floats between 0 and 1, in single precision) of a graph on a white background:
+    edges are coloured as their source node, nodes are coloured by community and their radius grows with their size
+        Parameters:
+            positions (numpy.array): positions of nodes
+            sources (numpy.array): source node of each edge (index of the node in positions)
+            targets (numpy.array): target node of each edge
+            communities (numpy.array): community of each node
+            sizes (numpy.array): size of each node
+            size (int): width and height of the image in pixels
+    """
+    image = np.ones((size, size, 3), dtype=np.float32)
+    columns, rows = pixel_coordinates(positions, size)
+    palette = hex2rgb(community_colours).astype(np.float32)
+    colours = palette[np.asarray(communities, dtype=np.int64) % len(palette)]
+    not_loop = sources != targets
+    draw_edges(image, columns, rows, sources[not_loop], targets[not_loop], colours[sources[not_loop]])
+    largest = sizes.max() if len(sizes) else 0
+    relative_sizes = np.sqrt(sizes / largest) if largest > 0 else np.zeros(len(sizes))
+    radius = np.rint(node_radius[0] + (node_radius[1] - node_radius[0]) * relative_sizes).astype(np.int64)
+    order = np.argsort(-sizes, kind="stable")
+    draw_nodes(image, columns[order], rows[order], radius[order], colours[order])
+    return image
+
+
+def export_raster_image(img_path, positions, sources, targets, communities, sizes, labels, size, n_labels=0):
+    """
+    Render a graph (see render_graph()) and write it in a png file, labels of the n_labels largest nodes are written
+    next to them
+    The png file is written with Pillow (installed with matplotlib) and labels use the font of matplotlib, no
+    matplotlib figure is created so that images can be exported in a background thread
+        Parameters:
+            img_path (str): path where to export the png file
+            positions (numpy.array): positions of nodes
+            sources (numpy.array): source node of each edge (index of the node in positions)
+            targets (numpy.array): target node of each edge
+            communities (numpy.array): community of each node
+            sizes (numpy.array): size of each node
+            labels (numpy.array): label of each node
+            size (int): width and height of the image in pixels
+            n_labels (int): number of labelled nodes
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    from matplotlib import font_manager
+
+    image = render_graph(positions, sources, targets, communities, sizes, size)
+    image = Image.fromarray((image * 255 + 0.5).astype(np.uint8), mode="RGB")
+    if n_labels > 0 and len(sizes):
+        draw = ImageDraw.Draw(image)
+        font = ImageFont.truetype(font_manager.findfont("DejaVu Sans"), max(1, int(label_height * size)))
+        columns, rows = pixel_coordinates(positions, size)
+        for node in np.argsort(-sizes, kind="stable")[:n_labels]:
+            draw.text(
+                (columns[node] + node_radius[1], rows[node]), str(labels[node]), fill=(0, 0, 0), font=font, anchor="lm"
+            )
+    image.save(img_path, format="PNG", compress_level=3)
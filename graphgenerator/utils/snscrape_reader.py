@@ -0,0 +1,175 @@
+import glob
+import json
+import os
+
+from graphgenerator.config.config_botscore import botscore_profile_fields
+
+# fastest json parser installed is used to read snscrape json files
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_parser():
+    """
+    Returns a function parsing a json document (bytes), simdjson is used if installed (fields are then only parsed
+    when accessed), otherwise orjson, otherwise json from the standard library
+    """
+    if simdjson is not None:
+        return simdjson.Parser().parse
+    elif orjson is not None:
+        return orjson.loads
+    else:
+        return json.loads
+
+
+def iter_lines(path, start=0, end=None, chunk_size=1 << 24):
+    """
+    Read a file by chunks of chunk_size bytes and yield its non empty lines (in bytes)
+    Only lines beginning between bytes start (included) and end (excluded) are returned, so that a file can be split
+    in several byte ranges without splitting lines
+    """
+    with open(path, "rb") as f:
+        if start > 0:
+            # a line begins at start only if the previous byte is a new line, otherwise go to the next line
+            f.seek(start - 1)
+            f.readline()
+        offset = f.tell()
+        buffer = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (buffer + chunk).split(b"\n")
+            buffer = lines.pop()
+            for line in lines:
+                if end is not None and offset >= end:
+                    return
+                offset += len(line) + 1
+                if line.strip():
+                    yield line
+        if buffer.strip() and (end is None or offset < end):
+            yield buffer
+
+
+def read_last_line(path, block_size=1 << 16):
+    """
+    Returns last non empty line of a file (in bytes), the file is read backwards from its end
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+            lines = data.rstrip().split(b"\n")
+            if len(lines) > 1 or position == 0:
+                return lines[-1]
+    return b""
+
+
+def expand_paths(paths):
+    """
+    Returns list of paths of snscrape json outputs, paths containing wildcards are replaced by the matching files
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    expanded_paths = []
+    for path in paths:
+        matches = sorted(glob.glob(path)) if glob.has_magic(path) else [path]
+        if not matches:
+            raise Exception(f"No snscrape json file matches {path}")
+        expanded_paths += matches
+    return expanded_paths
+
+
+def sort_snscrape_files(paths):
+    """
+    Sort snscrape json outputs from the most recent to the oldest one (using the date of their first tweet), so that
+    they are read as a single snscrape output would be (tweets are sorted from the most recent to the oldest)
+    """
+    parse = json_parser()
+
+    def first_tweet_date(path):
+        for line in iter_lines(path, chunk_size=1 << 16):
+            return str(parse(line)["date"])
+        return ""
+
+    return sorted(paths, key=first_tweet_date, reverse=True)
+
+
+def split_files(paths, n_shards):
+    """
+    Split files into about n_shards byte ranges of similar size, returns list of (path, start, end), each file is
+    split in at least one range
+    """
+    sizes = [os.path.getsize(path) for path in paths]
+    total_size = max(sum(sizes), 1)
+    shards = []
+    for path, size in zip(paths, sizes):
+        n_file_shards = max(1, round(n_shards * size / total_size))
+        bounds = [size * i // n_file_shards for i in range(n_file_shards + 1)]
+        shards += [(path, bounds[i], bounds[i + 1]) for i in range(n_file_shards)]
+    return shards
+
+
+def mapping_field(mapping, field):
+    """
+    Returns a field of a tweet or a user in dictionnary format (or parsed by simdjson), None if it is missing
+    """
+    return mapping.get(field)
+
+
+def project_user(user, with_profile, get=mapping_field):
+    """
+    Keep only fields of a user used to build the graph (and to compute the botscore if with_profile is True), get
+    returns a field of the user (user is a dictionnary by default)
+    """
+    if with_profile:
+        return {field: get(user, field) for field in botscore_profile_fields}
+    return {"username": get(user, "username")}
+
+
+def project_tweet(tweet, with_profile=False, with_source=True, get=mapping_field):
+    """
+    Keep only fields of a tweet in snscrape format used to build the graph, the retweeted or quoted tweet is kept
+    (without its own source tweet) if with_source is True, get returns a field of the tweet (tweet is a dictionnary
+    by default)
+    """
+    projected = {
+        "id": get(tweet, "id"),
+        "date": get(tweet, "date"),
+        "url": get(tweet, "url"),
+        "retweetCount": get(tweet, "retweetCount"),
+        "user": project_user(get(tweet, "user"), with_profile, get),
+        "retweetedTweet": None,
+        "quotedTweet": None,
+    }
+    if with_source:
+        for field in ["retweetedTweet", "quotedTweet"]:
+            source_tweet = get(tweet, field)
+            if source_tweet:
+                projected[field] = project_tweet(source_tweet, with_profile, False, get)
+    return projected
+
+
+def iter_snscrape_tweets(path, with_profile=False, start=0, end=None):
+    """
+    Yield tweets of a snscrape json output (json lines format) with only the fields used to build the graph
+        Parameters:
+            path (str): path to snscrape json output
+            with_profile (bool): should user fields used to compute the botscore be kept
+            start (int): byte from which lines are read
+            end (int): byte up to which lines are read, if None the file is read up to its end
+    """
+    parse = json_parser()
+    for line in iter_lines(path, start, end):
+        yield project_tweet(parse(line), with_profile)
@@ -1,29 +1,46 @@
-import networkx as nx
+from importlib import import_module
 from graphgenerator.config import column_names
-import community as community_louvain
-import networkx.algorithms.community as nxcom
 
 
+# functions of algorithms are given by their path ("module.function") and loaded by load_function(), so that heavy
+# dependencies (networkx, python-louvain) are only imported when an algorithm using them is run
 layout_functions = {
-    "bipartite": {"function": nx.bipartite_layout, "args": {}},
-    "circular": {"function": nx.circular_layout, "args": {}},
+    "bipartite": {"function": "networkx.bipartite_layout", "args": {}},
+    "circular": {"function": "networkx.circular_layout", "args": {}},
     "kamada_kawai": {
-        "function": nx.kamada_kawai_layout,
+        "function": "networkx.kamada_kawai_layout",
         "args": {"weight": column_names.edge_weight},
     },
-    "planar": {"function": nx.planar_layout, "args": {}},
-    "random": {"function": nx.random_layout, "args": {}},
-    "shell": {"function": nx.shell_layout, "args": {}},
+    "planar": {"function": "networkx.planar_layout", "args": {}},
+    "random": {"function": "networkx.random_layout", "args": {}},
+    "shell": {"function": "networkx.shell_layout", "args": {}},
     "spring": {
-        "function": nx.spring_layout,
+        "function": "networkx.spring_layout",
         "args": {"weight": column_names.edge_weight},
+        "warm_start_args": {"iterations": 15},
+    },
+    "spectral": {"function": "networkx.spectral_layout", "args": {}},
+    "spiral": {"function": "networkx.spiral_layout", "args": {}},
+    "multipartite": {"function": "networkx.multipartite_layout", "args": {}},
+    "multilevel": {
+        "function": "graphgenerator.utils.layout.multilevel_layout",
+        "args": {"weight": column_names.edge_weight},
+        "warm_start_args": {"iterations": 15, "temperature": 0.02},
+        "time_budget_arg": "time_budget",
+        "graph_core": True,
     },
-    "spectral": {"function": nx.spectral_layout, "args": {}},
-    "spiral": {"function": nx.spiral_layout, "args": {}},
-    "multipartite": {"function": nx.multipartite_layout, "args": {}},
 }
 
 
+def load_function(path):
+    """
+    Returns the function of an algorithm of layout_functions or community_functions given by its path
+    ("module.function"), its module is imported when it is first used
+    """
+    module, name = path.rsplit(".", 1)
+    return getattr(import_module(module), name)
+
+
 def frozenset2partition_id(partition):
     """
     Transforms a frozenset object into clean partition user-id dict
@@ -59,28 +76,38 @@ def ide(x):
 
 community_functions = {
     "greedy_modularity": {
-        "function": nxcom.greedy_modularity_communities,
+        "function": "networkx.algorithms.community.greedy_modularity_communities",
         "cleaning": frozenset2partition_id,
         "args": {"weight": column_names.edge_size},
     },
     "asyn_lpa_communities": {
-        "function": nxcom.asyn_lpa_communities,
+        "function": "networkx.algorithms.community.asyn_lpa_communities",
         "cleaning": frozenset2partition_id,
         "args": {"weight": column_names.edge_size},
     },
     "girvan_newman": {
-        "function": nxcom.girvan_newman,
+        "function": "networkx.algorithms.community.girvan_newman",
         "cleaning": generator2partition_id,
         "args": {},
     },
     "label_propagation": {
-        "function": nxcom.label_propagation_communities,
+        "function": "networkx.algorithms.community.label_propagation_communities",
         "cleaning": dict2partition_id,
         "args": {},
     },
     "louvain": {
-        "function": community_louvain.best_partition,
+        "function": "community.best_partition",
         "cleaning": ide,
         "args": {"weight": column_names.edge_size},
+        "warm_start_arg": "partition",
+        "local_update_function": "graphgenerator.utils.communities.local_best_partition",
+    },
+    "parallel_louvain": {
+        "function": "graphgenerator.utils.communities.parallel_louvain",
+        "cleaning": ide,
+        "args": {"weight": column_names.edge_size, "seed": 0},
+        "warm_start_arg": "partition",
+        "threads_arg": "n_threads",
+        "graph_core": True,
     },
 }
@@ -1,17 +1,29 @@
-from graphgenerator.config import column_names
-from botfinder.bot_classifier import findbot_rawjson
+from datetime import date, datetime
 import json
+from dateutil import parser
 
+from graphgenerator.utils.snscrape_reader import expand_paths, project_tweet, read_last_line
 
-def compute_bot_score_from_user_info(user_info, compute_botscore):
+
+def object_field(obj, field):
     """
-    Compute botscore using botfinder using user information
-    the function findbot_rawjson from the package is used rather than the CLI
+    Returns a field of a snscrape object (Tweet or User class) as in its json format (dates are in ISO format)
     """
-    if compute_botscore:
-        return json.loads(findbot_rawjson(json.dumps(user_info)))["botScore"]
-    else:
-        return str(float("nan"))
+    value = getattr(obj, field, None)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def tweet2json(tweet, with_profile=False):
+    """
+    Returns a tweet returned by snscrape scraper (Tweet class) in dictionnary format, fields are read directly from the
+    object rather than from its json format and only the fields used to build the graph are kept (see project_tweet())
+        Parameters:
+            tweet (snscrape.modules.twitter.Tweet): tweet
+            with_profile (bool): should user fields used to compute the botscore be kept
+    """
+    return project_tweet(tweet, with_profile, get=object_field)
 
 
 def return_type_source_tweet(tweet: dict):
@@ -39,78 +51,10 @@ def return_source_tweet(tweet: dict):
         return tweet["quotedTweet"]
 
 
-def edge_from_tweet(tweet: dict, source_tweet: dict):
-    """
-    Create dictionnary from tweet (and its source tweet) information which will then feed the edge table
-    Here tweets can be either retweet or quoted tweets, it describe the connexion between two accounts through a tweet
-    """
-    return {
-        column_names.edge_source: tweet["user"]["username"],
-        column_names.edge_target: source_tweet["user"]["username"],
-        column_names.edge_source_date: source_tweet["date"],
-        column_names.edge_date: str(tweet["date"]),
-        column_names.edge_tweet_id: str(tweet["id"]),
-        column_names.edge_url_quoted: tweet["url"]
-        if return_type_source_tweet(tweet) == "has quoted"
-        else "",
-        column_names.edge_url_RT: tweet["url"]
-        if return_type_source_tweet(tweet) == "has RT"
-        else "",
-        column_names.edge_url_label: return_type_source_tweet(tweet),
-        column_names.edge_type: "arrow",
-    }
-
-
-def node_RT_quoted(tweet: dict, source_tweet: dict, compute_botscore: bool):
-    """
-    Create dictionnary containing nodes (account) information regarding an account which has retweeted
-    or quoted another tweet
-    """
-    return {
-        column_names.node_id: tweet["user"]["username"],
-        column_names.node_label: "@" + tweet["user"]["username"],
-        column_names.node_url_quoted: tweet["url"]
-        if return_type_source_tweet(tweet) == "has quoted"
-        else "",
-        column_names.node_url_RT: tweet["url"]
-        if return_type_source_tweet(tweet) == "has RT"
-        else "",
-        column_names.node_url_tweet: "",
-        column_names.node_date: str(tweet["date"]),
-        column_names.node_source_date: source_tweet["date"],
-        column_names.node_tweet_id: str(tweet["id"]),
-        column_names.node_type_tweet: return_type_source_tweet(tweet),
-        column_names.node_rt_count: tweet["retweetCount"]
-        if return_type_source_tweet(tweet) == "has quoted"
-        else 0,
-        column_names.node_botscore: compute_bot_score_from_user_info(tweet["user"], compute_botscore),
-    }
-
-
-def node_original(tweet: dict, source_tweet: dict, compute_botscore: bool):
-    """
-    Create dictionnary containing node (account) information regarding an account which has been retweeted
-    or quoted in another tweet
-    """
-    return {
-        column_names.node_id: source_tweet["user"]["username"],
-        column_names.node_label: "@" + source_tweet["user"]["username"],
-        column_names.node_url_tweet: source_tweet["url"],
-        column_names.node_url_quoted: "",
-        column_names.node_url_RT: "",
-        column_names.node_date: source_tweet["date"],
-        column_names.node_tweet_id: str(source_tweet["id"]),
-        column_names.node_rt_count: tweet["retweetCount"],
-        column_names.node_type_tweet: "original",
-        column_names.node_botscore: compute_bot_score_from_user_info(source_tweet["user"], compute_botscore),
-    }
-
-
-def return_last_tweet_snscrape(snscrape_json_path: str):
+def return_last_tweet_snscrape(snscrape_json_path):
     """
-    Returns older collected tweet in snscrape json file 
+    Returns older collected tweet in snscrape json files (last line of the file), if several files are given the
+    oldest of their last tweets is returned
     """
-    with open(snscrape_json_path, "r") as f:
-        for i,line in enumerate(f):
-            last_tweet = json.loads(line)
-    return last_tweet
\ No newline at end of file
+    last_tweets = [json.loads(read_last_line(path)) for path in expand_paths(snscrape_json_path)]
+    return min(last_tweets, key=lambda tweet: parser.parse(tweet["date"]))
\ No newline at end of file
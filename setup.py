@@ -31,12 +31,15 @@ setuptools.setup(
         "snscrape==0.4.3.20220106",
         "scikit-learn==0.24.2",
         "social-networks-bot-finder==1.2.4",
-        "numpy==1.21.5"
+        "numpy==1.21.5",
+        "scipy==1.7.3"
     ],
     dependency_links=["git+https://github.com/JustAnotherArchivist/snscrape.git"],
     python_requires="~=3.8",
     extras_require={
-        "test": ["coverage"],
+        "test": ["coverage", "pytest"],
+        "fast": ["pysimdjson", "orjson"],
+        "parquet": ["pyarrow"],
     },
     entry_points={
         "console_scripts": [
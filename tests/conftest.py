@@ -0,0 +1,202 @@
+"""
+Fixtures shared by tests: synthetic snscrape outputs (see benchmarks/generate_tweets.py), a fake snscrape scraper and
+helpers to build graphs and compare them
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.generate_tweets import generate_tweets
+from graphgenerator.config import column_names, tz
+from graphgenerator.custom_classes.GraphBuilder import GraphBuilder
+
+# directory of expected outputs
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+# date of the most recent tweet of generated snscrape outputs compared with expected outputs
+END_DATE = datetime(2022, 3, 1, 12, tzinfo=tz)
+
+# metadata fields which do not depend on the date or on the duration of the run
+METADATA_FIELDS = [
+    column_names.metadata_last_collected_tweet,
+    column_names.metadata_last_collected_date,
+    column_names.metadata_most_recent_tweet,
+    column_names.metadata_n_collected_tweets,
+    column_names.metadata_n_analysed_tweets,
+]
+
+
+def write_tweets(path, n_tweets, n_accounts, seed, end=END_DATE, n_recent=0, recent_path=None):
+    """
+    Write synthetic tweets in snscrape json lines format, if n_recent is above 0 the n_recent most recent tweets are
+    written in recent_path instead (as if they had been posted after the other ones were collected)
+    """
+    generate_tweets(path, n_tweets, n_accounts, seed=seed, end=end)
+    if n_recent:
+        with open(path) as file:
+            lines = file.readlines()
+        with open(recent_path, "w") as file:
+            file.writelines(lines[:n_recent])
+        with open(path, "w") as file:
+            file.writelines(lines[n_recent:])
+
+
+@pytest.fixture(scope="session")
+def snscrape_paths(tmp_path_factory):
+    """
+    Paths of two snscrape outputs with fixed dates: "old" (160 tweets) and "new" (the 80 tweets posted after them)
+    """
+    directory = tmp_path_factory.mktemp("snscrape")
+    paths = SimpleNamespace(old=str(directory / "old.jsonl"), new=str(directory / "new.jsonl"))
+    write_tweets(paths.old, 240, 50, seed=1, n_recent=80, recent_path=paths.new)
+    return paths
+
+
+@pytest.fixture(scope="session")
+def recent_tweets_path(tmp_path_factory):
+    """
+    Path of a snscrape output of 400 tweets posted during the last 6 days, so that they are valid for a search
+    """
+    path = str(tmp_path_factory.mktemp("recent") / "recent.jsonl")
+    write_tweets(path, 400, 80, seed=2, end=datetime.now(tz=tz).replace(microsecond=0) - timedelta(hours=1))
+    return path
+
+
+def to_object(value):
+    """
+    Returns a tweet (or a field of a tweet) in snscrape json format as an object similar to the ones returned by the
+    snscrape scraper (fields are attributes and dates are datetimes)
+    """
+    if not isinstance(value, dict):
+        return value
+    obj = SimpleNamespace(**{field: to_object(field_value) for field, field_value in value.items()})
+    for field in ["date", "created"]:
+        if isinstance(getattr(obj, field, None), str):
+            setattr(obj, field, datetime.fromisoformat(getattr(obj, field)))
+    return obj
+
+
+class FakeScraper:
+    """
+    Scraper replacing snscrape TwitterSearchScraper: it returns tweets of the snscrape output in path matching
+    since_time, until_time and max_id of the search, other terms of the search are ignored
+    If fail_after is set, an exception is raised after fail_after tweets (e.g. a rate limit)
+    """
+
+    path = None
+    fail_after = None
+    searches = []
+
+    def __init__(self, search):
+        self.search = search
+        FakeScraper.searches.append(search)
+
+    def bound(self, term):
+        match = re.search(term + r":(\d+)", self.search)
+        return int(match.group(1)) if match else None
+
+    def get_items(self):
+        since_time, until_time, max_id = self.bound("since_time"), self.bound("until_time"), self.bound("max_id")
+        n_tweets = 0
+        with open(FakeScraper.path) as file:
+            for line in file:
+                tweet = json.loads(line)
+                timestamp = datetime.fromisoformat(tweet["date"]).timestamp()
+                if (
+                    (since_time and timestamp < since_time)
+                    or (until_time and timestamp >= until_time)
+                    or (max_id and tweet["id"] > max_id)
+                ):
+                    continue
+                if FakeScraper.fail_after is not None and n_tweets >= FakeScraper.fail_after:
+                    raise Exception("Rate limit")
+                n_tweets += 1
+                yield to_object(tweet)
+
+
+@pytest.fixture
+def fake_scraper(monkeypatch):
+    """
+    Replace snscrape scraper by FakeScraper, set FakeScraper.path to choose the tweets it returns
+    """
+    sntwitter = pytest.importorskip("snscrape.modules.twitter")
+    monkeypatch.setattr(sntwitter, "TwitterSearchScraper", FakeScraper)
+    FakeScraper.path = None
+    FakeScraper.fail_after = None
+    FakeScraper.searches = []
+    return FakeScraper
+
+
+class FakeBotscoreScorer:
+    """
+    Botscore scorer giving the same botscore to all accounts
+    """
+
+    def __init__(self):
+        self.usernames = set()
+
+    def add(self, profile):
+        self.usernames.add(profile["username"])
+
+    def result(self):
+        return {username: 0.5 for username in self.usernames}
+
+    def close(self):
+        pass
+
+
+def build_graph(json_path, snscrape_json_path=None, input_graph_json={}, collect_args={}, past_tweets=False, **kwargs):
+    """
+    Run the whole pipeline (tweets are scraped if snscrape_json_path is None) and returns the graph builder, kwargs
+    are arguments of GraphBuilder
+    If past_tweets is True, tweets older than 7 days are valid (to scrape snscrape outputs with fixed dates)
+    """
+    collect_args = dict(collect_args)
+    NB = GraphBuilder(search="#test", since="2004-01-01", **kwargs)
+    if past_tweets:
+        NB.min_date_dt = datetime(2004, 1, 1, tzinfo=tz)
+    layout_algo = collect_args.pop("layout_algo", "spring")
+    community_algo = collect_args.pop("community_algo", "louvain")
+    NB.collect_tweets(
+        snscrape_json_path=snscrape_json_path,
+        input_json=input_graph_json,
+        layout_algo=layout_algo,
+        community_algo=community_algo,
+        img_path="no_img_file",
+        json_path=json_path,
+        execution_time=0,
+        **collect_args,
+    )
+    NB.clean_nodes_edges(input_graph_json)
+    NB.create_graph(layout_algo)
+    NB.find_communities(community_algo)
+    NB.export_json_output(json_path, 0)
+    return NB
+
+
+def graph_content(json_path):
+    """
+    Returns nodes, edges and metadata fields of a graph exported in json format which do not depend on the layout, on
+    communities or on the date of the run
+    """
+    with open(json_path) as file:
+        graph = json.load(file)
+    layout_fields = [column_names.node_pos_x, column_names.node_pos_y, column_names.node_pos_z, column_names.nodes_community]
+    return {
+        "edges": graph["edges"],
+        "nodes": [{key: value for key, value in node.items() if key not in layout_fields} for node in graph["nodes"]],
+        "metadata": {field: graph["metadata"][field] for field in METADATA_FIELDS},
+    }
+
+
+def expected_content(name):
+    """
+    Returns expected content (see graph_content()) saved in tests/data
+    """
+    with open(os.path.join(DATA_DIR, name)) as file:
+        return json.load(file)
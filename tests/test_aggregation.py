@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from graphgenerator.data_cleaning.aggregation import aggregate_groups
+
+
+def groupby_aggregation(df, keys, aggregations):
+    """
+    Reference implementation of aggregate_groups() with pandas groupby and a python function per group
+    """
+    functions = {"list": list, "concat": lambda values: sum(values, []), "sum": "sum", "first": "first"}
+    return df.groupby(keys).agg({column: functions[aggregation] for column, aggregation in aggregations.items()}).reset_index()
+
+
+def test_aggregate_groups():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame(
+        {
+            "source": rng.choice(["a", "b", "c", "d"], n).astype(object),
+            "target": rng.choice(["x", "y", None], n),
+            "date": [f"2022-01-{day:02d}" for day in rng.integers(1, 28, n)],
+            "urls": [[f"url_{i}"] * (i % 3) for i in range(n)],
+            "size": rng.integers(1, 5, n),
+            "label": rng.choice(["has RT", "has quoted"], n).astype(object),
+        }
+    )
+    aggregations = {"date": "list", "urls": "concat", "size": "sum", "label": "first"}
+    result = aggregate_groups(df, ["source", "target"], aggregations)
+    expected = groupby_aggregation(df, ["source", "target"], aggregations)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_aggregate_groups_empty():
+    df = pd.DataFrame({"source": [], "target": [], "date": [], "size": []})
+    result = aggregate_groups(df, ["source", "target"], {"date": "list", "size": "sum"})
+    assert list(result.columns) == ["source", "target", "date", "size"]
+    assert len(result) == 0
@@ -0,0 +1,13 @@
+from graphgenerator.data_cleaning.batches import split_pending_rows
+
+
+def test_split_pending_rows():
+    pending = []
+    # rows whose date is not after the last collected date are kept pending
+    assert split_pending_rows(pending, ["2022-01-05", "2022-01-02", "2022-01-03", "2022-01-04"], 0, "2022-01-03") == [0, 3]
+    assert pending == [("2022-01-02", 1), ("2022-01-03", 2)]
+    # pending rows are released when the last collected date goes past them, rows are returned in the store order
+    assert split_pending_rows(pending, ["2022-01-01", "2022-01-06"], 4, "2022-01-02") == [2, 5]
+    assert pending == [("2022-01-01", 4), ("2022-01-02", 1)]
+    assert split_pending_rows(pending, [], 6, "2021-12-31") == [1, 4]
+    assert pending == []
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from graphgenerator.custom_classes.CollectionCheckpoint import CollectionCheckpoint
+
+from tests.conftest import FakeBotscoreScorer, build_graph, expected_content, graph_content
+
+
+def test_resume_drops_unsaved_rows(tmp_path):
+    checkpoint = CollectionCheckpoint(str(tmp_path / "checkpoint"))
+    checkpoint.start()
+    checkpoint.add({"tweet_id": np.array([1])})
+    checkpoint.save({"n_analysed_tweets": 1})
+    checkpoint.add({"tweet_id": np.array([2])})
+    checkpoint.close()
+    assert checkpoint.exists()
+    assert checkpoint.resume()["n_analysed_tweets"] == 1
+    assert list(checkpoint.saved_chunks()) == [{"store": {"tweet_id": [1]}, "profiles": []}]
+    checkpoint.add({"tweet_id": np.array([3])}, [{"username": "account_0"}])
+    checkpoint.close()
+    assert [chunk["store"]["tweet_id"] for chunk in checkpoint.saved_chunks()] == [[1], [3]]
+    assert [chunk["profiles"] for chunk in checkpoint.saved_chunks()] == [[], [{"username": "account_0"}]]
+
+
+def test_resume_collection(tmp_path, snscrape_paths, fake_scraper, monkeypatch):
+    monkeypatch.setattr("graphgenerator.custom_classes.GraphBuilder.checkpoint_every", 20)
+    fake_scraper.path = snscrape_paths.old
+    fake_scraper.fail_after = 90
+    json_path, checkpoint_path = str(tmp_path / "output.json"), str(tmp_path / "checkpoint")
+    with pytest.raises(Exception, match="Rate limit"):
+        build_graph(json_path, maxresults=120, past_tweets=True, checkpoint_path=checkpoint_path)
+    fake_scraper.fail_after = None
+    build_graph(
+        json_path, maxresults=120, past_tweets=True, checkpoint_path=checkpoint_path, collect_args={"resume": True}
+    )
+    assert "max_id" in fake_scraper.searches[-1]
+    assert graph_content(json_path) == expected_content("expected_live.json")
+
+
+def test_resume_complete_collection(tmp_path, snscrape_paths, fake_scraper):
+    fake_scraper.path = snscrape_paths.old
+    json_path, checkpoint_path = str(tmp_path / "output.json"), str(tmp_path / "checkpoint")
+    build_graph(json_path, maxresults=120, past_tweets=True, checkpoint_path=checkpoint_path)
+    n_searches = len(fake_scraper.searches)
+    # tweets of a complete checkpoint are not scraped again
+    build_graph(
+        json_path, maxresults=120, past_tweets=True, checkpoint_path=checkpoint_path, collect_args={"resume": True}
+    )
+    assert len(fake_scraper.searches) == n_searches
+    assert graph_content(json_path) == expected_content("expected_live.json")
+
+
+def test_checkpoint_bounds_tweet_store(tmp_path, snscrape_paths, fake_scraper, monkeypatch):
+    monkeypatch.setattr("graphgenerator.custom_classes.GraphBuilder.checkpoint_every", 20)
+    spilled = []
+    add = CollectionCheckpoint.add
+    monkeypatch.setattr(
+        CollectionCheckpoint,
+        "add",
+        lambda self, arrays, profiles=[]: spilled.append(len(arrays["tweet_id"])) or add(self, arrays, profiles),
+    )
+    fake_scraper.path = snscrape_paths.old
+    json_path, checkpoint_path = str(tmp_path / "output.json"), str(tmp_path / "checkpoint")
+    NB = build_graph(
+        json_path, maxresults=120, past_tweets=True, checkpoint_path=checkpoint_path, collect_args={"batch_size": 25}
+    )
+    # rows of at most 20 analysed tweets are kept in the tweet store, they are read back to build the graph
+    assert len(spilled) > 1 and max(spilled) <= 20
+    assert len(NB.store) == 0 and sum(spilled) == NB.n_interactions()
+    assert graph_content(json_path) == expected_content("expected_live.json")
+
+
+def test_resume_collection_with_botscores(tmp_path, snscrape_paths, fake_scraper, monkeypatch):
+    monkeypatch.setattr("graphgenerator.custom_classes.GraphBuilder.checkpoint_every", 20)
+    fake_scraper.path = snscrape_paths.old
+    expected_path, json_path = str(tmp_path / "expected.json"), str(tmp_path / "output.json")
+    checkpoint_path = str(tmp_path / "checkpoint")
+    build_graph(
+        expected_path, maxresults=120, past_tweets=True, compute_botscore=True, botscore_scorer=FakeBotscoreScorer()
+    )
+    fake_scraper.fail_after = 90
+    with pytest.raises(Exception, match="Rate limit"):
+        build_graph(
+            json_path,
+            maxresults=120,
+            past_tweets=True,
+            checkpoint_path=checkpoint_path,
+            compute_botscore=True,
+            botscore_scorer=FakeBotscoreScorer(),
+        )
+    fake_scraper.fail_after = None
+    # botscores of accounts of spilled rows are computed again from the profiles saved with them
+    build_graph(
+        json_path,
+        maxresults=120,
+        past_tweets=True,
+        checkpoint_path=checkpoint_path,
+        compute_botscore=True,
+        botscore_scorer=FakeBotscoreScorer(),
+        collect_args={"resume": True},
+    )
+    assert graph_content(json_path) == graph_content(expected_path)
+
+
+def test_incremental_batches_with_checkpoint(tmp_path, fake_scraper):
+    with pytest.raises(Exception, match="Incremental batches can't be used with checkpoints"):
+        build_graph(
+            str(tmp_path / "output.json"),
+            checkpoint_path=str(tmp_path / "checkpoint"),
+            collect_args={"batch_size": 10, "incremental_batch": True},
+        )
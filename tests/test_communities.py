@@ -0,0 +1,40 @@
+import numpy as np
+
+from graphgenerator.custom_classes.SparseGraph import SparseGraph
+from graphgenerator.utils.communities import edges_weights, find_touched_nodes, parallel_louvain, remap_communities
+
+
+def two_cliques(size=8):
+    """
+    Returns a graph of two cliques of size nodes linked by a single edge
+    """
+    sources, targets = [], []
+    for offset in [0, size]:
+        for i in range(size):
+            for j in range(i + 1, size):
+                sources.append(f"n{offset + i}")
+                targets.append(f"n{offset + j}")
+    sources.append("n0")
+    targets.append(f"n{size}")
+    return SparseGraph(sources, targets, np.ones(len(sources)))
+
+
+def test_parallel_louvain():
+    graph = two_cliques()
+    communities = parallel_louvain(graph, seed=0)
+    assert len(np.unique(communities[:8])) == 1 and len(np.unique(communities[8:])) == 1
+    assert communities[0] != communities[8]
+    assert np.array_equal(communities, parallel_louvain(graph, seed=0, n_threads=2, chunk_size=5))
+    assert np.array_equal(parallel_louvain(graph, partition=communities), communities)
+
+
+def test_remap_communities():
+    communities = np.array([0, 0, 0, 1, 1, 2, 2])
+    previous = np.array([5, 5, 3, 3, 3, np.nan, np.nan])
+    # community 0 keeps id 5, community 1 keeps id 3 and community 2 is new
+    assert remap_communities(communities, previous, 6).tolist() == [5, 5, 5, 3, 3, 6, 6]
+
+
+def test_find_touched_nodes():
+    previous = edges_weights([("a", "b", 1), ("b", "c", 2)])
+    assert find_touched_nodes([("b", "a", 1), ("b", "c", 3), ("c", "d", 1)], previous) == {"b", "c", "d"}
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+
+def run_python(code):
+    """
+    Run python code in a new process (so that modules already imported by tests are not counted), returns its output
+    """
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+
+
+def test_shard_without_botscores_does_not_import_botfinder(snscrape_paths):
+    code = f"""
+import os, sys
+from graphgenerator.custom_classes.GraphBuilder import collect_shard
+shard = collect_shard(0, False, {snscrape_paths.old!r}, 0, os.path.getsize({snscrape_paths.old!r}))
+print(shard["n_tweets"], "botfinder" in sys.modules, "sklearn" in sys.modules)
+"""
+    assert run_python(code) == "160 False False"
@@ -0,0 +1,53 @@
+import threading
+from contextlib import closing
+
+import pytest
+
+from graphgenerator.utils.pipeline import iter_pipeline
+
+
+def test_order():
+    items = iter_pipeline(range(1000), [lambda x: x * 2, str], maxsize=5)
+    assert list(items) == [str(2 * x) for x in range(1000)]
+
+
+def test_errors():
+    def tweets():
+        yield from range(10)
+        raise Exception("Rate limit")
+
+    received = []
+    with pytest.raises(Exception, match="Rate limit"):
+        for item in iter_pipeline(tweets(), [lambda x: x + 1]):
+            received.append(item)
+    assert received == list(range(1, 11))
+
+    def convert(x):
+        if x == 5:
+            raise ValueError("Invalid tweet")
+        return x
+
+    received.clear()
+    with pytest.raises(ValueError, match="Invalid tweet"):
+        for item in iter_pipeline(range(10), [convert]):
+            received.append(item)
+    assert received == list(range(5))
+
+
+def test_close():
+    closed = threading.Event()
+
+    def tweets():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.set()
+
+    with closing(iter_pipeline(tweets(), [lambda x: x], maxsize=10)) as items:
+        for item in items:
+            if item == 20:
+                break
+    assert closed.wait(5)
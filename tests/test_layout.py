@@ -0,0 +1,39 @@
+import numpy as np
+
+from graphgenerator.custom_classes.SparseGraph import SparseGraph
+from graphgenerator.utils.layout import multilevel_layout, place_new_nodes
+
+
+def random_graph(n_nodes, n_edges, seed=0):
+    rng = np.random.default_rng(seed)
+    sources, targets = rng.integers(0, n_nodes, n_edges), rng.integers(0, n_nodes, n_edges)
+    return SparseGraph(sources.astype(str), targets.astype(str), rng.integers(1, 5, n_edges))
+
+
+def test_multilevel_layout():
+    graph = random_graph(3000, 6000)
+    pos = multilevel_layout(graph, seed=1, min_coarse_size=200, iterations=20)
+    assert pos.shape == (len(graph), 2)
+    assert np.isfinite(pos).all()
+    assert np.abs(pos).max() <= 1 + 1e-9
+    assert np.array_equal(pos, multilevel_layout(graph, seed=1, min_coarse_size=200, iterations=20))
+    assert multilevel_layout(graph, dim=3, seed=1, iterations=5).shape == (len(graph), 3)
+
+
+def test_fixed_nodes():
+    graph = random_graph(300, 600)
+    pos = multilevel_layout(graph, seed=1)
+    fixed = np.arange(len(graph)) % 2 == 0
+    initial = np.where(fixed[:, None], pos, np.nan)
+    new_pos = multilevel_layout(graph, pos=initial, fixed=fixed, seed=2, iterations=10)
+    assert np.array_equal(new_pos[fixed], pos[fixed])
+    assert np.isfinite(new_pos).all()
+
+
+def test_place_new_nodes():
+    graph = SparseGraph(["a", "b", "c", "e"], ["b", "c", "d", "f"], [1, 1, 1, 1])
+    pos = np.array([[0.0, 0.0], [np.nan, np.nan], [2.0, 2.0], [np.nan, np.nan], [np.nan, np.nan], [np.nan, np.nan]])
+    placed = place_new_nodes(graph, pos, jitter=0, seed=0)
+    # b is between a and c, d next to c, e and f have no placed neighbour
+    assert placed[:4].tolist() == [[0, 0], [1, 1], [2, 2], [2, 2]]
+    assert np.isnan(placed[4:]).all()
@@ -0,0 +1,48 @@
+import json
+import tracemalloc
+
+import pytest
+
+from graphgenerator.config import column_names
+from graphgenerator.custom_classes.MultiSearchBuilder import MultiSearchBuilder
+
+from tests.conftest import build_graph, graph_content
+
+
+@pytest.fixture
+def stop_tracemalloc():
+    """
+    Stop tracemalloc started by graph builders tracing memory, so that it does not slow the following tests down
+    """
+    yield
+    tracemalloc.stop()
+
+
+def test_memory_not_traced_while_searches_are_collected(tmp_path, recent_tweets_path, fake_scraper, stop_tracemalloc):
+    fake_scraper.path = recent_tweets_path
+    MB = MultiSearchBuilder(["#a", "#b"], "2004-01-01", n_workers=2, trace_memory=True)
+    MB.collect_tweets()
+    MB.build_graphs("spring", "louvain", str(tmp_path / "output.json"), metrics_path=str(tmp_path / "metrics.json"))
+    for search, path in MB.graph_paths(str(tmp_path / "metrics.json")).items():
+        assert MB.graph_builders[search].metrics.trace_memory
+        with open(path) as file:
+            records = {record["stage"]: record for record in json.load(file)["stages"]}
+        assert records["collect_tweets"]["memory_peak"] is None
+        assert records["clean_nodes_edges"]["memory_peak"] > 0
+
+
+def test_merged_graph(tmp_path, recent_tweets_path, fake_scraper):
+    # the fake scraper ignores searches: both searches collect the same tweets, which are kept once in the merged graph
+    fake_scraper.path = recent_tweets_path
+    json_path, merged_path = str(tmp_path / "output.json"), str(tmp_path / "merged.json")
+    NB = build_graph(json_path)
+    MB = MultiSearchBuilder(["#a", "#b"], "2004-01-01", n_workers=2, merge=True)
+    MB.collect_tweets()
+    MB.build_graphs("spring", "louvain", merged_path)
+    with open(merged_path) as file:
+        metadata = json.load(file)["metadata"]
+    assert metadata[column_names.metadata_n_analysed_tweets] == 2 * (NB.n_analysed_tweets + 1) - 1
+    content, merged_content = graph_content(json_path), graph_content(merged_path)
+    for content_ in [content, merged_content]:
+        content_["metadata"].pop(column_names.metadata_n_analysed_tweets)
+    assert merged_content == content
@@ -0,0 +1,184 @@
+"""
+Tests of the whole pipeline: graphs built from snscrape outputs or from scraped tweets are compared with expected
+outputs (saved in tests/data, built with the first version of graphgenerator, see conftest.py), and the different ways
+to collect the same tweets must build the same graph
+"""
+
+import json
+import os
+
+import pytest
+
+from graphgenerator.config import column_names
+from graphgenerator.data_cleaning.edges import input_graph_json2edge_df
+from graphgenerator.data_cleaning.nodes import input_graph_json2positions
+from graphgenerator.utils.graph_files import batch_delta_path, read_input_graph
+
+from tests.conftest import FakeBotscoreScorer, build_graph, expected_content, graph_content
+
+
+def test_snscrape_output(tmp_path, snscrape_paths):
+    json_path = str(tmp_path / "output.json")
+    build_graph(json_path, snscrape_paths.old)
+    assert graph_content(json_path) == expected_content("expected_old.json")
+
+
+def test_update_input_graph(tmp_path, snscrape_paths):
+    input_path, json_path = str(tmp_path / "input.json"), str(tmp_path / "output.json")
+    build_graph(input_path, snscrape_paths.old)
+    build_graph(json_path, snscrape_paths.new, read_input_graph(input_path))
+    assert graph_content(json_path) == expected_content("expected_update.json")
+
+
+def test_update_parquet_input_graph(tmp_path, snscrape_paths):
+    # the graph exported in parquet format for input.json is in directory input.parquet
+    input_path, json_path = str(tmp_path / "input.json"), str(tmp_path / "output.json")
+    build_graph(input_path, snscrape_paths.old, output_format="parquet")
+    assert not os.path.exists(input_path)
+    build_graph(json_path, snscrape_paths.new, read_input_graph(str(tmp_path / "input.parquet")))
+    assert graph_content(json_path) == expected_content("expected_update.json")
+
+
+def test_scraped_tweets(tmp_path, snscrape_paths, fake_scraper):
+    fake_scraper.path = snscrape_paths.old
+    json_path = str(tmp_path / "output.json")
+    build_graph(json_path, maxresults=120, past_tweets=True)
+    assert graph_content(json_path) == expected_content("expected_live.json")
+
+
+def test_batches(tmp_path, snscrape_paths, fake_scraper):
+    fake_scraper.path = snscrape_paths.old
+    json_path = str(tmp_path / "output.json")
+    build_graph(json_path, maxresults=120, past_tweets=True, collect_args={"batch_size": 25})
+    assert graph_content(json_path) == expected_content("expected_live.json")
+
+
+def test_incremental_batches(tmp_path, snscrape_paths, fake_scraper):
+    fake_scraper.path = snscrape_paths.old
+    json_path = str(tmp_path / "output.json")
+    build_graph(
+        json_path, maxresults=120, past_tweets=True, collect_args={"batch_size": 25, "incremental_batch": True}
+    )
+    assert graph_content(json_path) == expected_content("expected_live.json")
+
+
+def test_incremental_batches_update_input_graph(tmp_path, snscrape_paths, fake_scraper, monkeypatch):
+    input_path, batch_path, json_path = [str(tmp_path / name) for name in ["input.json", "batch.json", "output.json"]]
+    build_graph(input_path, snscrape_paths.old)
+    input_graph_json = read_input_graph(input_path)
+    fake_scraper.path = snscrape_paths.new
+    build_graph(json_path, input_graph_json=input_graph_json, past_tweets=True)
+    # tables of the input graph are read once, not at each batch
+    calls = []
+    for name, function in [
+        ("graphgenerator.custom_classes.GraphBuilder.input_graph_json2positions", input_graph_json2positions),
+        ("graphgenerator.custom_classes.IncrementalBatch.input_graph_json2edge_df", input_graph_json2edge_df),
+    ]:
+        monkeypatch.setattr(name, lambda *args, function=function: calls.append(function) or function(*args))
+    build_graph(
+        batch_path,
+        input_graph_json=input_graph_json,
+        past_tweets=True,
+        collect_args={"batch_size": 10, "incremental_batch": True},
+    )
+    assert graph_content(batch_path) == graph_content(json_path)
+    assert len(calls) == 2
+
+
+def test_incremental_batch_deltas(tmp_path, snscrape_paths, fake_scraper):
+    fake_scraper.path = snscrape_paths.old
+    json_path = str(tmp_path / "output.json")
+    NB = build_graph(
+        json_path, maxresults=120, past_tweets=True, collect_args={"batch_size": 25, "incremental_batch": True}
+    )
+    # batches only append deltas, the graph is built and exported once at the end of the collection
+    stages = [record["stage"] for record in NB.metrics.to_dict()["stages"]]
+    assert stages.count("export_batch_delta") == 4
+    assert [stages.count(stage) for stage in ["clean_nodes_edges", "create_graph", "export_json_output"]] == [1, 1, 1]
+    with open(batch_delta_path(json_path)) as file:
+        deltas = [json.loads(line) for line in file]
+    assert [delta["metadata"][column_names.metadata_n_collected_tweets] for delta in deltas] == [25, 50, 75, 100]
+    # a delta replaces the edges and accounts changed by its batch, later batches can only add tweets to them
+    graph = graph_content(json_path)
+    edges = {(edge["source"], edge["target"], edge["type"]): edge for edge in graph["edges"]}
+    nodes = {node["id"]: node for node in graph["nodes"]}
+    for delta in deltas:
+        assert len(delta["edges"]) < len(edges) and len(delta["nodes"]) < len(nodes)
+        for edge in delta["edges"]:
+            metadata = edges[(edge["source"], edge["target"], edge["type"])]["metadata"]
+            assert set(edge["metadata"]["retweets"]) <= set(metadata["retweets"])
+        for node in delta["nodes"]:
+            assert set(node["metadata"]["retweets"]) <= set(nodes[node["id"]]["metadata"]["retweets"])
+
+def test_several_snscrape_outputs(tmp_path, snscrape_paths):
+    # files are read from the most recent to the oldest one whatever their order
+    json_path, merged_path = str(tmp_path / "output.json"), str(tmp_path / "merged.json")
+    build_graph(json_path, [snscrape_paths.old, snscrape_paths.new])
+    with open(str(tmp_path / "merged.jsonl"), "w") as merged:
+        for path in [snscrape_paths.new, snscrape_paths.old]:
+            with open(path) as file:
+                merged.write(file.read())
+    build_graph(merged_path, str(tmp_path / "merged.jsonl"))
+    assert graph_content(json_path) == graph_content(merged_path)
+
+
+def test_snscrape_workers(tmp_path, snscrape_paths):
+    json_path = str(tmp_path / "output.json")
+    build_graph(json_path, snscrape_paths.old, collect_args={"snscrape_workers": 3})
+    assert graph_content(json_path) == expected_content("expected_old.json")
+
+
+def test_snscrape_workers_update_input_graph(tmp_path, snscrape_paths):
+    input_path, json_path = str(tmp_path / "input.json"), str(tmp_path / "output.json")
+    build_graph(input_path, snscrape_paths.old, collect_args={"snscrape_workers": 3})
+    build_graph(json_path, snscrape_paths.new, read_input_graph(input_path), collect_args={"snscrape_workers": 2})
+    assert graph_content(json_path) == expected_content("expected_update.json")
+
+
+@pytest.mark.parametrize("maxresults", [0, 150, 250])
+def test_time_slices(tmp_path, recent_tweets_path, fake_scraper, maxresults):
+    # with maxresults, the most recent slices are kept and the slice reaching maxresults is cut
+    fake_scraper.path = recent_tweets_path
+    json_path, sliced_path = str(tmp_path / "output.json"), str(tmp_path / "sliced.json")
+    build_graph(json_path, maxresults=maxresults)
+    build_graph(sliced_path, time_slices=3, maxresults=maxresults)
+    assert graph_content(sliced_path) == graph_content(json_path)
+
+
+def test_parquet_output(tmp_path, snscrape_paths):
+    json_path, parquet_path = str(tmp_path / "output.json"), str(tmp_path / "output")
+    NB = build_graph(json_path, snscrape_paths.old)
+    NB.output_format = "parquet"
+    NB.export_json_output(parquet_path, 0)
+    with open(json_path) as file:
+        graph = json.load(file)
+    parquet_graph = read_input_graph(parquet_path)
+    assert parquet_graph["metadata"] == graph["metadata"]
+    for key in ["nodes", "edges"]:
+        records = parquet_graph[key].to_dict("records")
+        assert len(records) == len(graph[key])
+        for record, expected in zip(records, graph[key]):
+            expected = dict(expected, **expected.pop("metadata"))
+            assert set(record) == set(expected)
+            assert all(record[field] == value or str(record[field]) == str(value) for field, value in expected.items())
+
+
+def test_update_input_graph_with_botscores(tmp_path, snscrape_paths):
+    # accounts of the input graph have no botscore, accounts found again get a botscore: they have two rows in nodes
+    input_path, json_path = str(tmp_path / "input.json"), str(tmp_path / "output.json")
+    build_graph(input_path, snscrape_paths.old)
+    NB = build_graph(
+        json_path,
+        snscrape_paths.new,
+        read_input_graph(input_path),
+        compute_botscore=True,
+        botscore_scorer=FakeBotscoreScorer(),
+        img_renderer="raster",
+        img_size=200,
+    )
+    NB.export_img_graph(str(tmp_path / "graph.png"), background=False)
+    with open(json_path) as file:
+        nodes = json.load(file)["nodes"]
+    assert len(nodes) > len(NB.graph)
+    assert len(nodes) == len(NB.nodes) and {node["id"] for node in nodes} == set(NB.graph.nodes.tolist())
+
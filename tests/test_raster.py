@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from graphgenerator.config.config_image import community_colours
+from graphgenerator.utils.raster import export_raster_image, hex2rgb, pixel_coordinates, render_graph
+
+from tests.conftest import build_graph
+
+POSITIONS = np.array([[-1.0, -1.0], [1.0, 1.0], [1.0, -1.0]])
+SOURCES, TARGETS = np.array([0, 1]), np.array([1, 2])
+COMMUNITIES, SIZES = np.array([0, 1, 1]), np.array([1.0, 4.0, 2.0])
+
+
+def test_pixel_coordinates():
+    columns, rows = pixel_coordinates(POSITIONS, 101, margin=0)
+    assert columns.tolist() == [0, 100, 100]
+    # rows go downwards
+    assert rows.tolist() == [100, 0, 100]
+
+
+def test_render_graph():
+    image = render_graph(POSITIONS, SOURCES, TARGETS, COMMUNITIES, SIZES, 200)
+    assert image.shape == (200, 200, 3) and image.dtype == np.float32
+    assert (image >= 0).all() and (image <= 1).all()
+    # corners are blank and nodes are drawn with the colour of their community
+    assert (image[0, 0] == 1).all()
+    columns, rows = pixel_coordinates(POSITIONS, 200)
+    palette = hex2rgb(community_colours)
+    for node in range(3):
+        pixel = image[int(round(rows[node])), int(round(columns[node]))]
+        expected = palette[COMMUNITIES[node]]
+        assert np.linalg.norm(pixel - expected) < np.linalg.norm(pixel - 1)
+
+
+def test_export_raster_image(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    pytest.importorskip("matplotlib")
+    img_path = str(tmp_path / "graph.png")
+    labels = np.array(["@a", "@b", "@c"], dtype=object)
+    export_raster_image(img_path, POSITIONS, SOURCES, TARGETS, COMMUNITIES, SIZES, labels, 300, n_labels=2)
+    with Image.open(img_path) as image:
+        assert image.format == "PNG" and image.size == (300, 300)
+
+
+def test_background_export(tmp_path, snscrape_paths):
+    NB = build_graph(str(tmp_path / "output.json"), snscrape_paths.old, img_renderer="raster", img_size=200)
+    NB.export_img_graph(str(tmp_path / "graph.png"), background=True)
+    NB.wait_img_export()
+    records = {record["stage"]: record for record in NB.metrics.to_dict()["stages"]}
+    assert records["render_img"]["background"] and records["render_img"]["n_nodes"] == len(NB.nodes)
+    assert records["render_img"]["wall_time"] > 0 and records["render_img"]["thread_cpu_time"] > 0
+    assert (tmp_path / "graph.png").exists()
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from graphgenerator.custom_classes.GraphBuilder import GraphBuilder, collect_shard
+from graphgenerator.data_cleaning.aggregation import explode_groups
+from graphgenerator.data_cleaning.edges import clean_edges
+from graphgenerator.data_cleaning.nodes import concat_clean_nodes
+from graphgenerator.data_cleaning.shards import merge_shard_edges, merge_shard_nodes
+from graphgenerator.utils.snscrape_reader import split_files
+
+
+@pytest.mark.parametrize("n_shards", [1, 2, 5])
+def test_merge_shards(snscrape_paths, n_shards):
+    # edges and nodes aggregated by shards are merged as if all rows were cleaned at once, whatever the limit date
+    NB = GraphBuilder(search="", since="2004-01-01")
+    NB.collect_snscrape_tweets(snscrape_paths.old)
+    shards = [collect_shard(1, False, *shard) for shard in split_files([snscrape_paths.old], n_shards)]
+    dates = sorted(NB.store.source_date)
+    for limit_date in [NB.last_collected_date, dates[len(dates) // 2]]:
+        edges = clean_edges(NB.store.edges_dataframe(), limit_date, {})
+        assert merge_shard_edges([shard["edges"] for shard in shards], limit_date, {}).equals(edges)
+        nodes = concat_clean_nodes(
+            NB.store.nodes_RT_quoted_dataframe(), NB.store.nodes_original_dataframe(), limit_date, {}
+        )
+        assert merge_shard_nodes([shard["nodes"] for shard in shards], limit_date, {}).equals(nodes)
+
+
+def test_explode_groups():
+    groups = pd.DataFrame({"key": ["a", "b", "c"], "x": [[1, 2], [], [3]], "y": [["u", "v"], [], ["w"]], "n": [2, 0, 1]})
+    expected = groups.explode(["x", "y"]).dropna(subset=["x"]).reset_index(drop=True)
+    assert explode_groups(groups, ["x", "y"]).equals(expected)
+    assert explode_groups(groups.iloc[[1]], ["x", "y"]).empty
@@ -0,0 +1,48 @@
+import networkx as nx
+import numpy as np
+
+from graphgenerator.custom_classes.SparseGraph import SparseGraph
+
+SOURCES = ["a", "b", "c", "a", "d", "e", "b", "e"]
+TARGETS = ["b", "c", "a", "b", "d", "a", "a", "f"]
+WEIGHTS = [1, 2, 3, 4, 5, 6, 7, 8]
+
+
+def reference_graph():
+    """
+    Returns the networkx graph built from the edges, as in the first version of graphgenerator
+    """
+    G = nx.Graph()
+    G.add_weighted_edges_from(zip(SOURCES, TARGETS, WEIGHTS))
+    return G
+
+
+def test_nodes_and_edges():
+    graph, G = SparseGraph(SOURCES, TARGETS, WEIGHTS), reference_graph()
+    assert graph.nodes.tolist() == list(G.nodes)
+    assert len(graph) == graph.number_of_nodes() == G.number_of_nodes()
+    edges = {(frozenset((source, target)), w) for source, target, w in graph.named_edges()}
+    assert edges == {(frozenset((source, target)), w) for source, target, w in G.edges(data="weight")}
+    assert graph.index(["c", "z"]).tolist() == [2, -1]
+
+
+def test_neighbours():
+    graph, G = SparseGraph(SOURCES, TARGETS, WEIGHTS), reference_graph()
+    indptr, indices = graph.neighbours()
+    for node, name in enumerate(graph.nodes):
+        assert graph.nodes[indices[indptr[node]:indptr[node + 1]]].tolist() == list(G.neighbors(name))
+
+
+def test_adjacency():
+    graph, G = SparseGraph(SOURCES, TARGETS, WEIGHTS), reference_graph()
+    G.remove_edges_from(nx.selfloop_edges(G))
+    expected = nx.to_numpy_array(G, nodelist=graph.nodes.tolist())
+    assert np.array_equal(graph.adjacency().toarray(), expected)
+    assert np.array_equal(graph.adjacency("size").toarray(), expected > 0)
+
+
+def test_networkx():
+    graph, G = SparseGraph(SOURCES, TARGETS, WEIGHTS), reference_graph()
+    assert nx.utils.graphs_equal(graph.to_networkx(), G)
+    values = graph.to_dict(np.arange(len(graph)))
+    assert np.array_equal(graph.from_dict(values), np.arange(len(graph)))
@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from graphgenerator.custom_classes.StageMetrics import StageMetrics
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_background_stage():
+    metrics = StageMetrics()
+
+    def background():
+        with metrics.measure_background("background") as record:
+            busy(0.1)
+            record["n_nodes"] = 1
+
+    with metrics.measure("outer"):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(background)
+            time.sleep(0.2)
+        future.result()
+    with metrics.measure("after"):
+        pass
+    records = {record["stage"]: record for record in metrics.to_dict()["stages"]}
+    assert [record["stage"] for record in metrics.to_dict()["stages"]] == ["outer", "background", "after"]
+    assert records["background"]["n_nodes"] == 1 and records["background"]["memory_peak"] is None
+    # CPU time of the process includes the background thread, CPU time of the thread running outer does not
+    assert records["background"]["thread_cpu_time"] > 0.05
+    assert records["outer"]["cpu_time"] > 0.05 and records["outer"]["thread_cpu_time"] < 0.05
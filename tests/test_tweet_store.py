@@ -0,0 +1,88 @@
+from graphgenerator.config import column_names
+from graphgenerator.custom_classes.TweetStore import TweetStore
+
+
+def make_tweet(tweet_id, username):
+    """
+    Returns a tweet in dictionnary format with the fields used by TweetStore
+    """
+    return {
+        "id": tweet_id,
+        "url": f"https://twitter.com/{username}/status/{tweet_id}",
+        "date": f"2022-01-01T00:00:{tweet_id % 60:02d}+00:00",
+        "retweetCount": tweet_id % 7,
+        "user": {"username": username},
+    }
+
+
+def interactions(n, offset=0):
+    """
+    Returns n (tweet, source tweet, is_quote) interactions between a few accounts
+    """
+    result = []
+    for i in range(offset, offset + n):
+        source = make_tweet(1000 + i % 5, f"account_{i % 3}")
+        result.append((make_tweet(2000 + i, f"account_{3 + i % 4}"), source, i % 4 == 0))
+    return result
+
+
+def fill(store, rows):
+    for tweet, source_tweet, is_quote in rows:
+        store.add_interaction(tweet, source_tweet, is_quote)
+        if not store.has_original(source_tweet["id"]):
+            store.add_original(tweet, source_tweet)
+    return store
+
+
+def assert_same_store(store, expected):
+    assert store.edges_dataframe().equals(expected.edges_dataframe())
+    assert store.nodes_RT_quoted_dataframe().equals(expected.nodes_RT_quoted_dataframe())
+    assert store.nodes_original_dataframe().equals(expected.nodes_original_dataframe())
+
+
+def test_original_tweets_are_stored_once():
+    store = fill(TweetStore(), interactions(20))
+    assert len(store) == 20
+    assert store.n_originals() == 5
+    assert store.has_original(1000) and store.has_original("1004") and not store.has_original(1005)
+
+
+def test_extend():
+    store = fill(TweetStore(), interactions(12))
+    store.extend(fill(TweetStore(), interactions(20, 12)))
+    assert_same_store(store, fill(TweetStore(), interactions(32)))
+
+
+def test_head():
+    rows = interactions(20)
+    assert_same_store(fill(TweetStore(), rows).head(3), fill(TweetStore(), rows[:3]))
+
+
+def test_without_known_tweets():
+    store = fill(TweetStore(), interactions(20))
+    other = fill(TweetStore(), interactions(10, 5))
+    store.extend(other.without_known_tweets(store))
+    assert_same_store(store, fill(TweetStore(), interactions(20)))
+
+
+def test_dataframes():
+    tweet, source_tweet, _ = interactions(1)[0]
+    store = fill(TweetStore(), [(tweet, source_tweet, True)])
+    edge = store.edges_dataframe().iloc[0]
+    assert (edge[column_names.edge_source], edge[column_names.edge_target]) == ("account_3", "account_0")
+    assert (edge[column_names.edge_url_quoted], edge[column_names.edge_url_RT]) == (tweet["url"], "")
+    assert edge[column_names.edge_tweet_id] == "2000"
+    original = store.nodes_original_dataframe().iloc[0]
+    assert original[column_names.node_label] == "@account_0"
+    assert original[column_names.node_tweet_id] == "1000"
+
+
+def test_extend_arrays():
+    store, expected = fill(TweetStore(), interactions(12)), fill(TweetStore(), interactions(12))
+    other = fill(TweetStore(), interactions(20, 7))
+    store.extend_arrays(other.to_arrays())
+    expected.extend(other)
+    assert_same_store(store, expected)
+    assert store.original_ids == expected.original_ids
+    store.extend_arrays(TweetStore().to_arrays())
+    assert_same_store(store, expected)